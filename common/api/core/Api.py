@@ -25,6 +25,8 @@ from common.api.decorators.log_api_call import log_api_call
 from common.api.enums.ApiUrl import ApiUrl
 from common.api.enums.EndpointTags import EndpointTags
 from common.api.data_models.Connection import Connection
+from common.lib.data_models.WindowState import WindowState
+from common.lib.data_models.LatencyReport import LatencyReport
 from common.api.data_models.TransactionResp import TransactionResp
 from common.api.enums.ApiRequestType import ApiRequestType
 from common.api.exceptions.TerminalApiError import TerminalApiError
@@ -255,6 +257,26 @@ class Api(QObject):
         def get_connection():
             return self.backend.get_connection()
 
+        @api.get(ApiUrl.GET_WINDOW, response_model=WindowState, tags=[EndpointTags.CONNECTION])
+        @log_api_call
+        def get_window_state():
+            return self.backend.get_window_state()
+
+        @api.get(ApiUrl.GET_LATENCY, response_model=LatencyReport, tags=[EndpointTags.METRICS])
+        @log_api_call
+        def get_latency_report(previous: bool = False):
+            if not (report := self.backend.get_latency_report(previous=previous)):
+                raise TerminalApiError(http_status=HTTPStatus.NOT_FOUND, detail="No finished latency interval yet")
+
+            return report
+
+        # The latency recorder is thread-safe, the reset doesn't need the PyQt signal
+
+        @api.post(ApiUrl.RESET_LATENCY, response_model=LatencyReport, tags=[EndpointTags.METRICS])
+        @log_api_call
+        def reset_latency():
+            return self.backend.reset_latency()
+
         @api.get(ApiUrl.LIVE_LOG, response_class=HTMLResponse, tags=[EndpointTags.TOOLS])
         @log_api_call
         def get_live_log():
@@ -1,6 +1,5 @@
 from contextlib import suppress
 from http import HTTPStatus
-from time import sleep
 from datetime import datetime
 from copy import deepcopy
 from typing import Any
@@ -27,6 +26,8 @@ from common.lib.data_models.EpaySpecificationModel import EpaySpecModel
 from common.lib.core.FieldsGenerator import FieldsGenerator
 from common.api.data_models.TransValidationErrors import TransValidationErrors
 from common.api.data_models.Connection import Connection
+from common.lib.data_models.WindowState import WindowState
+from common.lib.data_models.LatencyReport import LatencyReport
 from common.api.enums.ApiModes import ApiModes
 from common.api.data_models.ApiRequests import ApiTransactionRequest, ApiRequest, ConfigAction, ReversalRequest
 from common.api.enums.ApiUrl import ApiUrl
@@ -237,6 +238,18 @@ class SignalApi(QObject):
             port=self.terminal.connector.get_connected_port()
         )
 
+    def get_window_state(self) -> WindowState:
+        return self.terminal.trans_queue.get_window_state()
+
+    def get_latency_report(self, previous: bool = False) -> LatencyReport | None:
+        if previous:
+            return self.terminal.trans_queue.latency.get_previous_report()
+
+        return self.terminal.trans_queue.get_latency_report()
+
+    def reset_latency(self) -> LatencyReport:  # Returns the report of the finished interval
+        return self.terminal.trans_queue.latency.reset()
+
     def show_openapi_doc(self):
         open_url(f"{ApiUrl.BASE % self.config.api.port}{ApiUrl.SWAGGER}")
 
@@ -246,7 +259,7 @@ class SignalApi(QObject):
     def get_transactions(self) -> dict[str, Transaction]:
         transactions: dict[str, Transaction] = dict()
 
-        for transaction in self.terminal.trans_queue.queue:
+        for transaction in self.terminal.trans_queue.get_transactions():
             transactions[transaction.trans_id] = self.clean_transaction(transaction)
 
         return transactions
@@ -318,6 +331,10 @@ class SignalApi(QObject):
             self.send_response(request, HTTPStatus.UNPROCESSABLE_ENTITY, error=reversal_building_error)
             return
 
+        if self.is_window_full():
+            self.send_response(request, HTTPStatus.TOO_MANY_REQUESTS, error="The in-flight window is full")
+            return
+
         self.send_transaction.emit(request.transaction)
 
     @staticmethod
@@ -374,7 +391,7 @@ class SignalApi(QObject):
                 if self.terminal.connector.error() is not QTcpSocket.SocketError.UnknownSocketError:
                     break
 
-            sleep(0.01)
+            self.terminal.connector.wait_for_events(0.01)
 
         if not self.terminal.connector.is_connected():
             self.send_response(request, HTTPStatus.BAD_GATEWAY, error=self.terminal.connector.errorString())
@@ -401,11 +418,18 @@ class SignalApi(QObject):
                 error="Cannot send the transaction while the host connection is in progress"
             )
 
+        if self.is_window_full():
+            self.send_response(request, HTTPStatus.TOO_MANY_REQUESTS, error="The in-flight window is full")
+            return
+
         with self.lock:
             self.api_tasks[request.request_id] = request
 
         self.send_transaction.emit(request.transaction)
 
+    def is_window_full(self) -> bool:  # Otherwise the request waits in the queue of the window
+        return self.config.api.reject_when_window_full and not self.terminal.trans_queue.window.can_send()
+
     def send_response(self, request: ApiRequest, status: HTTPStatus, message: Any = None, error: error_type = None):
         if isinstance(request, TransactionResp):
             self.terminal_response.emit(request)
@@ -500,7 +524,7 @@ class SignalApi(QObject):
         return message
 
     def clean_transaction(self, transaction: Transaction) -> Transaction:
-        transaction: Transaction = transaction.model_copy(deep=True)
+        transaction: Transaction = transaction.model_copy(update={"data_fields": dict(transaction.data_fields)})
 
         with suppress(Exception):
             transaction = self.terminal.parser.hide_secret_fields(transaction) if self.config.api.hide_secrets else transaction
@@ -5,6 +5,9 @@ class ApiUrl(StrEnum):
     BASE = "http://127.0.0.1:%s"
     API = "/api"
     GET_CONNECTION = "/connection"
+    GET_WINDOW = "/connection/window"
+    GET_LATENCY = "/metrics/latency"
+    RESET_LATENCY = "/metrics/latency/reset"
     GET_SPECIFICATION = "/specification"
     GET_TRANSACTIONS = "/transactions"
     GET_TRANSACTION = "/transactions/{trans_id}"
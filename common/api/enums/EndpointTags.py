@@ -7,3 +7,4 @@ class EndpointTags(StrEnum):
     CONNECTION = "Connection"
     TRANSACTIONS = "Transactions"
     TOOLS = "Tools"
+    METRICS = "Metrics"
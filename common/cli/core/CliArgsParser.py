@@ -2,6 +2,8 @@ from argparse import ArgumentParser
 from common.cli.data_models.CliConfig import CliConfig
 from common.lib.data_models.Config import Config
 from common.lib.enums.TermFilesPath import TermFilesPath
+from common.lib.enums.ConnectorType import ConnectorType
+from common.cli.enums.LoadShape import LoadShape
 from common.lib.constants.LogDefinition import LOG_LEVEL, DebugLevels
 
 
@@ -67,6 +69,29 @@ class CliArgsParser(ArgumentParser):
         self.add_argument("-s", "--specification", action="store", default=TermFilesPath.SPECIFICATION,
                           help="Set custom Specification JSON file path")
 
+        self.add_argument("--connector", type=str, default=self.config.host.connector_type, action="store",
+                          choices=list(ConnectorType), help="Host connector type. Default set in the config")
+
+        self.add_argument("--rate", type=float, default=None,
+                          help="Run load mode: send the transaction files as templates with the rate (TPS)")
+
+        self.add_argument("--duration", type=float, default=None, help="Load mode duration (seconds)")
+
+        self.add_argument("--count", type=int, default=None, help="Load mode number of transactions to send")
+
+        self.add_argument("--concurrency", type=int, default=None,
+                          help="Load mode max transactions waiting for response, the others are dropped")
+
+        self.add_argument("--shape", type=str, default=LoadShape.CONSTANT, choices=list(LoadShape),
+                          help="Load mode shape of the rate over the duration")
+
+        self.add_argument("--start-rate", type=float, default=0, help="Load mode initial rate for the ramp and step")
+
+        self.add_argument("--steps", type=int, default=5, help="Load mode number of the steps of the step shape")
+
+        self.add_argument("--spike-factor", type=float, default=5,
+                          help="Load mode rate multiplier of the spike in the middle of the duration")
+
     def parse_arguments(self) -> CliConfig:
         cli_arguments = self.parse_args()
         cli_config = CliConfig.model_validate(cli_arguments.__dict__)
@@ -0,0 +1,241 @@
+from time import perf_counter
+from typing import Callable
+from itertools import cycle
+from loguru import logger
+from common.lib.core.Terminal import Terminal
+from common.lib.core.LatencyHistogram import LatencyHistogram
+from common.lib.core.CompiledTemplate import CompiledTemplate
+from common.lib.data_models.Transaction import Transaction
+from common.lib.data_models.TransactionRecord import TransactionRecord
+from common.lib.data_models.LatencyReport import LatencyStats
+from common.cli.data_models.CliConfig import CliConfig
+from common.cli.data_models.LoadSummary import LoadSummary
+from common.cli.enums.LoadShape import LoadShape
+
+
+"""
+
+ Open-loop load generator of the CLI
+
+ Sends the template transactions one by one with the target rate, regardless of the responses. The rate is set by the
+ load shape over the duration
+
+ constant    The rate all the time
+ ramp        From the start rate to the rate, linear
+ step        From the start rate to the rate by the equal steps
+ spike       The rate, multiplied by the spike factor in the middle tenth of the duration
+
+ The pacing doesn't drift: the number of the transactions due is calculated from the time passed since the start, so
+ a late tick sends all the transactions it owes. With --concurrency the in-flight window is limited, the transactions
+ which don't fit the window are dropped and counted, the generator never waits for the host
+
+ The templates are compiled once, each message is a copy of the encoded template with the generated fields and the
+ transaction ID patched in place, see CompiledTemplate
+
+ The run is finished by the duration or by the count, then the generator waits for the responses of the transactions
+ in flight up to the timeout and returns the summary
+
+ Usage example
+
+ generator = LoadGenerator(terminal, templates, cli_config, send=trans_queue.put_transaction, wait=terminal.wait)
+ summary = generator.run()
+
+"""
+
+
+class LoadGenerator:
+    TICK_SECONDS: float = 0.001
+    SPIKE_START: float = 0.45  # Part of the duration
+    SPIKE_END: float = 0.55
+    _terminal: Terminal
+    _templates: list[CompiledTemplate]
+    _cli_config: CliConfig
+    _send: Callable[[TransactionRecord], None]
+    _wait: Callable[[float], None]
+    _summary: LoadSummary
+    _in_flight: set[str]
+    _latency: LatencyHistogram
+
+    @property
+    def duration(self) -> float:  # When only the count is set the duration is the one of sending the count by the shape
+        if self._cli_config.duration:
+            return self._cli_config.duration
+
+        return self._cli_config.count / self.get_mean_rate()
+
+    def __init__(self, terminal: Terminal, templates: list[Transaction], cli_config: CliConfig,
+                 send: Callable[[TransactionRecord], None], wait: Callable[[float], None]):
+
+        if not templates:
+            raise ValueError("No template transactions to send")
+
+        if not cli_config.rate or cli_config.rate <= 0:
+            raise ValueError("The rate must be a positive number")
+
+        if not (cli_config.duration or cli_config.count):
+            raise ValueError("Set the load duration or the count of transactions")
+
+        self._terminal = terminal
+        self._templates = [
+            CompiledTemplate(template, set_trans_id=terminal.config.fields.send_internal_id) for template in templates
+        ]
+        self._cli_config = cli_config
+        self._send = send
+        self._wait = wait
+        self._in_flight = set()
+        self._latency = LatencyHistogram()
+        self._summary = LoadSummary(shape=cli_config.shape)
+
+    def get_mean_rate(self) -> float:  # The integral of each shape over the duration is the mean rate by duration
+        rate: float = self._cli_config.rate
+        start_rate: float = self._cli_config.start_rate
+
+        match self._cli_config.shape:
+            case LoadShape.RAMP:
+                return (start_rate + rate) / 2
+
+            case LoadShape.STEP:
+                steps: int = max(self._cli_config.steps, 1)
+                return sum(start_rate + (rate - start_rate) * step / steps for step in range(1, steps + 1)) / steps
+
+            case LoadShape.SPIKE:
+                return rate * (1 + (self._cli_config.spike_factor - 1) * (self.SPIKE_END - self.SPIKE_START))
+
+            case _:
+                return rate
+
+    def get_due_count(self, elapsed: float) -> int:  # Transactions to be sent since the start, the integral of the rate
+        if not self._cli_config.duration and elapsed >= self.duration:  # No rounding error at the end of the count
+            return self._cli_config.count
+
+        elapsed: float = min(elapsed, self.duration)
+        rate: float = self._cli_config.rate
+        start_rate: float = self._cli_config.start_rate
+
+        match self._cli_config.shape:
+            case LoadShape.RAMP:
+                due: float = start_rate * elapsed + (rate - start_rate) * elapsed ** 2 / (2 * self.duration)
+
+            case LoadShape.STEP:
+                steps: int = max(self._cli_config.steps, 1)
+                step_length: float = self.duration / steps
+                completed: int = min(int(elapsed / step_length), steps)
+                step_rates: list[float] = [
+                    start_rate + (rate - start_rate) * step / steps for step in range(1, steps + 1)
+                ]
+                due: float = sum(step_rates[:completed]) * step_length
+
+                if completed < steps:
+                    due += step_rates[completed] * (elapsed - completed * step_length)
+
+            case LoadShape.SPIKE:
+                spike: float = max(min(elapsed, self.SPIKE_END * self.duration) - self.SPIKE_START * self.duration, 0)
+                due: float = rate * elapsed + (self._cli_config.spike_factor - 1) * rate * spike
+
+            case _:
+                due: float = rate * elapsed
+
+        if self._cli_config.count:
+            due = min(due, self._cli_config.count)
+
+        return int(due)
+
+    def run(self) -> LoadSummary:
+        self.connect_signals()
+
+        logger.info(f"Load started: {self._cli_config.shape} shape, rate {self._cli_config.rate} TPS, "
+                    f"duration {self.duration:.1f} seconds")
+
+        capacity: int = self._terminal.trans_queue.window.capacity
+
+        if self._cli_config.concurrency:
+            self._terminal.trans_queue.window.capacity = self._cli_config.concurrency
+
+        templates = cycle(self._templates)
+        total: int = self.get_due_count(self.duration)
+        started: float = perf_counter()
+        attempts: int = int()
+
+        while attempts < total:
+            due: int = self.get_due_count(perf_counter() - started)
+
+            while attempts < due:
+                attempts += 1
+                self.send_transaction(next(templates))
+
+            self._wait(self.TICK_SECONDS)
+
+        sending_finished: float = perf_counter()
+
+        while self._in_flight and perf_counter() - sending_finished < self._cli_config.timeout:
+            self._wait(self.TICK_SECONDS)
+
+        self.disconnect_signals()
+        self._terminal.trans_queue.window.capacity = capacity
+
+        return self.get_summary(perf_counter() - started, sending_finished - started)
+
+    def send_transaction(self, template: CompiledTemplate) -> None:
+        if not self._terminal.trans_queue.window.can_send():
+            self._summary.dropped += 1
+            return
+
+        request: TransactionRecord = template.build()
+        self._in_flight.add(request.trans_id)
+        self._summary.sent += 1
+        self._send(request)
+
+    def process_response(self, response: Transaction) -> None:
+        if not response.matched or response.match_id not in self._in_flight:
+            return
+
+        self._in_flight.discard(response.match_id)
+        self._summary.responses += 1
+        response_code = response.data_fields.get(self._terminal.spec.FIELD_SET.FIELD_039_AUTHORIZATION_RESPONSE_CODE)
+        response_code: str = str(response_code) if response_code is not None else "None"
+        self._summary.response_codes[response_code] = self._summary.response_codes.get(response_code, int()) + 1
+
+        if response.resp_time_seconds is not None:
+            self._latency.record(response.resp_time_seconds)
+
+    def process_timeout(self, request: Transaction, *args) -> None:
+        if request.trans_id not in self._in_flight:
+            return
+
+        self._in_flight.discard(request.trans_id)
+        self._summary.timeouts += 1
+
+    def process_error(self, request: Transaction) -> None:
+        if request.trans_id not in self._in_flight:
+            return
+
+        self._in_flight.discard(request.trans_id)
+        self._summary.errors += 1
+
+    def connect_signals(self) -> None:
+        self._terminal.trans_queue.incoming_transaction.connect(self.process_response)
+        self._terminal.trans_queue.transaction_timeout.connect(self.process_timeout)
+        self._terminal.trans_queue.socket_error.connect(self.process_error)
+
+    def disconnect_signals(self) -> None:
+        self._terminal.trans_queue.incoming_transaction.disconnect(self.process_response)
+        self._terminal.trans_queue.transaction_timeout.disconnect(self.process_timeout)
+        self._terminal.trans_queue.socket_error.disconnect(self.process_error)
+
+    def get_summary(self, elapsed: float, sending_time: float) -> LoadSummary:
+        summary: LoadSummary = self._summary
+        summary.elapsed_seconds = round(elapsed, 3)
+        summary.target_tps = round(self.get_due_count(self.duration) / self.duration, 2)
+        summary.achieved_tps = round(summary.sent / sending_time, 2) if sending_time else float()
+        summary.response_tps = round(summary.responses / elapsed, 2) if elapsed else float()
+        summary.unanswered = len(self._in_flight)
+
+        if not self._latency.count:
+            return summary
+
+        stats: LatencyStats = self._latency.get_stats()
+        summary.latency_ms = {
+            "p50": stats.p50_ms, "p90": stats.p90_ms, "p99": stats.p99_ms, "p99.9": stats.p99_9_ms, "max": stats.max_ms
+        }
+
+        return summary
@@ -1,6 +1,5 @@
 from sys import exit
 from glob import glob
-from time import sleep
 from uuid import uuid4
 from os import listdir, path, system, getpid, kill
 from os.path import normpath, basename, isfile, abspath
@@ -9,11 +8,16 @@ from datetime import datetime, timezone
 from signal import signal, SIGINT, SIGTERM
 from PyQt6.QtCore import QCoreApplication, QTimer, pyqtSignal
 from common.lib.data_models.Transaction import Transaction
+from common.lib.data_models.TransactionRecord import TransactionRecord
 from common.lib.data_models.Config import Config
 from common.lib.enums.TextConstants import TextConstants
 from common.cli.data_models.CliConfig import CliConfig
 from common.cli.core.CliArgsParser import CliArgsParser
+from common.cli.core.LoadGenerator import LoadGenerator
+from common.cli.data_models.LoadSummary import LoadSummary
 from common.lib.core.Terminal import Terminal
+from common.lib.core.CompiledTemplate import CompiledTemplate
+from common.lib.enums.ConnectorType import ConnectorType
 from common.lib.enums.TermFilesPath import TermFilesPath
 from common.lib.data_models.License import LicenseInfo
 from common.lib.exceptions.exceptions import LicenseRejected
@@ -30,6 +34,11 @@ from common.api.enums.ApiModes import ApiModes
  Extends Terminal with command-line argument handling, license management, file-based transaction processing, 
  and REST API hosting
  
+ With --rate the CLI runs the load mode: the files are sent as templates with the rate and the shape set by the
+ load flags, the per-transaction log is off and the load summary is printed at the end
+
+ The latency percentiles of the matched transactions per MTI and per response code are printed before the finish
+
  Use "signal.exe --help" to get the all the params description
 
 """
@@ -39,13 +48,21 @@ class SignalCli(Terminal):
     _cli_config: CliConfig = None
     _finished: pyqtSignal = pyqtSignal()
     _job_id: str = str(uuid4())
+    _load_mode: bool = False
+    _finished_ids: set[str]  # The requests matched, timed out or failed, see wait_response
+    EVENTS_PROCESSING_INTERVAL: float = 0.01
 
     def __init__(self, config: Config):
+        cli_args_parser: CliArgsParser = CliArgsParser(config, description=TextConstants.CLI_DESCRIPTION)
+        self._cli_config = cli_args_parser.parse_arguments()
+        config.host.connector_type = self._cli_config.connector  # The connector is created by the Terminal
+
         super(SignalCli, self).__init__(config)
         self.config: Config = config
         self.api = SignalApi(self.config, terminal=self)
         self.application = QCoreApplication([])
         self.run_timer = QTimer()
+        self._finished_ids = set()
         self.connect_all()
         self.setup()
 
@@ -56,10 +73,6 @@ class SignalCli(Terminal):
         self.api.open_connection.connect(self.reconnect)
         self.api.send_transaction.connect(self.send)
 
-        cli_args_parser: CliArgsParser = CliArgsParser(self.config, description=TextConstants.CLI_DESCRIPTION)
-
-        self._cli_config = cli_args_parser.parse_arguments()
-
         try:
             self.parse_cli_config(self._cli_config)
 
@@ -105,10 +118,23 @@ class SignalCli(Terminal):
         self.run_timer.timeout.connect(self.main)
         self._finished.connect(self.application.quit)
 
+        for finishing_signal in (
+            self.trans_queue.incoming_transaction,
+            self.trans_queue.transaction_timeout,
+            self.trans_queue.socket_error,
+        ):
+            finishing_signal.connect(self.set_request_finished)
+
     def run_application(self):
         self.run_timer.setSingleShot(True)
         self.run_timer.start(0)
-        self.application.exec()
+
+        if self.config.host.connector_type != ConnectorType.ASYNCIO:
+            self.application.exec()
+            return
+
+        while True:  # The asyncio loop serves the connection, the Qt events are processed between the waits
+            self.wait(self.EVENTS_PROCESSING_INTERVAL)
 
     def main(self):
 
@@ -141,6 +167,14 @@ class SignalCli(Terminal):
             except Exception as print_error:
                 logger.error(print_error)
 
+        if self._cli_config.rate is not None:
+
+            if self._cli_config.api_mode:
+                logger.error("Mutually exclusive flags --rate and --api-mode are set")
+                self.finish(100)
+
+            self.run_load()
+
         if self._cli_config.api_mode:
 
             if files := self.get_files_to_process():
@@ -156,18 +190,28 @@ class SignalCli(Terminal):
 
             self.finish()
 
+        templates: dict[str, CompiledTemplate | None] = dict()  # The repeated files are parsed and encoded once
+
         while True:
             for file in filenames:
                 logger.info(str())
                 logger.info(f"Processing file {basename(file)}")
 
-                try:
-                    transaction: Transaction = self.parser.parse_file(file)
-                except Exception as parsing_error:
-                    logger.error(parsing_error)
-                    continue
+                if template := templates.get(file):
+                    if not (transaction := self.send_compiled(template)):
+                        continue
 
-                self.send(transaction)
+                else:
+                    try:
+                        transaction: Transaction = self.parser.parse_file(file)
+                    except Exception as parsing_error:
+                        logger.error(parsing_error)
+                        continue
+
+                    if self._cli_config.repeat and file not in templates:
+                        templates[file] = self.compile_template(transaction)
+
+                    self.send(transaction)
 
                 if not self._cli_config.parallel:
                     self.wait_response(transaction)
@@ -179,8 +223,86 @@ class SignalCli(Terminal):
             if not self._cli_config.repeat:
                 break
 
+        while self.trans_queue.window.pending:  # The requests held by the in-flight window are not sent yet
+            self.wait(0.1)
+
+        self.log_printer.print_latency_report(self.trans_queue.get_latency_report())
+        self.finish()
+
+    def run_load(self):
+        templates: list[Transaction] = list()
+
+        for file in self.get_files_to_process():
+            try:
+                transaction: Transaction = self.parser.parse_file(file)
+
+                if self.config.validation.validation_enabled and self.config.validation.validate_outgoing:
+                    self.trans_validator.validate_transaction(transaction)  # Once per template, not per message
+
+            except DataValidationWarning as validation_warning:
+                [logger.warning(warn) for warn in str(validation_warning).splitlines()]
+
+            except Exception as template_error:
+                logger.error(f"Template {basename(file)} is skipped: {template_error}")
+                continue
+
+            templates.append(transaction)
+
+        try:
+            generator: LoadGenerator = LoadGenerator(
+                self, templates, self._cli_config, send=self.trans_queue.put_transaction, wait=self.wait
+            )
+
+        except ValueError as load_error:
+            logger.error(f"Cannot run load mode: {load_error}")
+            self.finish(100)
+
+        self._load_mode = True
+
+        try:
+            summary: LoadSummary = generator.run()
+        finally:
+            self._load_mode = False
+
+        self.print_load_summary(summary)
+        self.log_printer.print_latency_report(self.trans_queue.get_latency_report())
         self.finish()
 
+    def print_load_summary(self, summary: LoadSummary):
+        rows: list[str] = [
+            "Load summary",
+            "",
+            f"Shape             {summary.shape}",
+            f"Elapsed seconds   {summary.elapsed_seconds}",
+            f"Target TPS        {summary.target_tps}",
+            f"Achieved TPS      {summary.achieved_tps}",
+            f"Response TPS      {summary.response_tps}",
+            f"Sent              {summary.sent}",
+            f"Dropped           {summary.dropped}",
+            f"Responses         {summary.responses}",
+            f"Timeouts          {summary.timeouts}",
+            f"Errors            {summary.errors}",
+            f"Unanswered        {summary.unanswered}",
+        ]
+
+        rows.extend(f"Response code {code:<4}{number}" for code, number in sorted(summary.response_codes.items()))
+        rows.extend(f"Latency {name:<10}{value} ms" for name, value in summary.latency_ms.items())
+
+        logger.info(str())
+        self.log_printer.print_multi_row("\n".join(rows))
+
+    def transaction_sent(self, request: Transaction) -> None:
+        if self._load_mode:  # Thousands of transactions, the summary is printed instead
+            return
+
+        Terminal.transaction_sent(self, request)
+
+    def transaction_received(self, response: Transaction) -> None:
+        if self._load_mode:
+            return
+
+        Terminal.transaction_received(self, response)
+
     def finish(self, code=0, mark=True):
         if mark:
             logger.info(LogMarks.FINISH % self._job_id)
@@ -231,6 +353,38 @@ class SignalCli(Terminal):
             logger.error(transaction.error)
             return
 
+    def compile_template(self, transaction: Transaction) -> CompiledTemplate | None:
+        if self.spec.is_reversal(transaction.message_type):  # The reversal ID suffix changes the ID length
+            return
+
+        try:
+            return CompiledTemplate(transaction, set_trans_id=self.config.fields.send_internal_id)
+
+        except Exception as compiling_error:
+            logger.debug(f"The file will be parsed for each repeat, template compiling error: {compiling_error}")
+
+    def send_compiled(self, template: CompiledTemplate) -> TransactionRecord | None:
+        if self.connector.connection_in_progress():
+            logger.error("Cannot send the transaction while the host connection is in progress")
+            return
+
+        try:
+            request: TransactionRecord = template.build()
+        except ValueError as building_error:
+            logger.error(f"Transaction building error: {building_error}")
+            return
+
+        logger.info(f"Processing transaction ID [{request.trans_id}]")
+
+        try:
+            self.trans_queue.put_transaction(request)
+
+        except Exception as sending_error:
+            logger.error(f"Transaction sending error: {sending_error}")
+            return
+
+        return request
+
     def show_license_dialog(self) -> None:
         license_info: LicenseInfo = self.get_license_info()
 
@@ -331,15 +485,32 @@ class SignalCli(Terminal):
         self.connector.config.host.port = int(cli_config.port) if cli_config.port else self.config.host.port
         self.config.debug.level = cli_config.log_level if cli_config.log_level else self.config.debug.level
 
-    def wait_response(self, request: Transaction):
-        while not request.matched:
-            if (datetime.now() - request.sending_time).total_seconds() > self._cli_config.timeout:
+    def set_request_finished(self, transaction: Transaction, *_) -> None:
+        if self._load_mode or self._cli_config.parallel:  # No one waits for the response
+            return
+
+        self._finished_ids.add(transaction.match_id if transaction.matched else transaction.trans_id)
+
+    def wait_response(self, request: Transaction | TransactionRecord):
+
+        # Waits until the request is matched, timed out or failed. The finished requests are collected from the queue
+        # signals, the store can drop the matched request, see the retention policy
+
+        started: datetime = datetime.now()
+
+        while request.trans_id not in self._finished_ids:
+            if request.success is False:  # Not sent at all
+                return
+
+            if (datetime.now() - started).total_seconds() > self._cli_config.timeout:
                 return
 
             self.wait(0.1)
 
+        self._finished_ids.discard(request.trans_id)
+
     def wait(self, sec):
-        sleep(sec)
+        self.connector.wait_for_events(sec)
         self.application.processEvents()
 
     @staticmethod
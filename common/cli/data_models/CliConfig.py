@@ -1,6 +1,8 @@
 from pydantic import BaseModel, DirectoryPath, IPvAnyAddress
 from common.lib.constants.LogDefinition import DebugLevels
 from common.lib.enums.TermFilesPath import TermFilesPath
+from common.lib.enums.ConnectorType import ConnectorType
+from common.cli.enums.LoadShape import LoadShape
 
 
 class CliConfig(BaseModel):
@@ -24,3 +26,12 @@ class CliConfig(BaseModel):
     api_mode: bool = False
     no_print: bool = False
     specification: str = TermFilesPath.SPECIFICATION
+    connector: ConnectorType = ConnectorType.QT
+    rate: float | None = None
+    duration: float | None = None
+    count: int | None = None
+    concurrency: int | None = None
+    shape: LoadShape = LoadShape.CONSTANT
+    start_rate: float = 0
+    steps: int = 5
+    spike_factor: float = 5
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from common.cli.enums.LoadShape import LoadShape
+
+
+class LoadSummary(BaseModel):
+    shape: LoadShape = LoadShape.CONSTANT
+    elapsed_seconds: float = float()
+    target_tps: float = float()  # Average of the load shape
+    sent: int = int()
+    dropped: int = int()  # Not sent, the in-flight window was full
+    responses: int = int()
+    timeouts: int = int()
+    errors: int = int()
+    unanswered: int = int()  # No response or timeout before the end of the run
+    achieved_tps: float = float()
+    response_tps: float = float()
+    response_codes: dict[str, int] = dict()
+    latency_ms: dict[str, float] = dict()
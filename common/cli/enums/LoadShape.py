@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class LoadShape(StrEnum):
+    CONSTANT = "constant"
+    RAMP = "ramp"
+    STEP = "step"
+    SPIKE = "spike"
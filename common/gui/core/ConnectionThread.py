@@ -1,19 +1,19 @@
-from PyQt6.QtCore import QObject, QThread, QCoreApplication
+from PyQt6.QtCore import QObject, QThread, Qt, pyqtSignal
 from common.lib.core.Connector import Connector
 from common.lib.data_models.Config import Config
 from common.lib.interfaces.ConnectorInterface import ConnectionInterface
 from common.lib.interfaces.MetaClasses import QObjectAbcMeta
-from contextlib import suppress
 
 
 """
 
  Separate thread for TCP socket. Should be used for GUI to not freeze the MainWindow while the connection is in progress
- Processes event loop in a while-true cycle until property self.stop will be set as True. For non-GUI mode better to use 
- a native connector, which blocks the work while the connection is in progress, otherwise, work will be continued when 
- the connection is not yet established.
+ The connector lives in the thread and is served by the thread's own Qt event loop (QThread.exec), the socket data is
+ processed as soon as it comes, with no polling. For non-GUI mode better to use a native connector, which blocks the
+ work while the connection is in progress, otherwise, work will be continued when the connection is not yet established.
  
- No direct interaction or call is possible. Using a separate stream the connector can interact through pyqtSignals only 
+ No direct interaction or call is possible. Using a separate stream the connector can interact through pyqtSignals only,
+ the signals connected to the connector slots are delivered by the queued connections 
 
  The connector Implements ConnectionInterface - metaclass, which describes the functions kit. In case of changing the 
  code, change the interface first 
@@ -24,21 +24,18 @@ from contextlib import suppress
 class ConnectionThread(ConnectionInterface, QObject, metaclass=QObjectAbcMeta):
     thread: QThread
     stop: bool = False
+    stop_requested: pyqtSignal = pyqtSignal()
+    config_changed: pyqtSignal = pyqtSignal(Config)
     _config: Config
 
     @property
     def config(self):
-        try:
-            return self.connector.config
-        except AttributeError:
-            return self._config
+        return self._config
 
     @config.setter
-    def config(self, config):
+    def config(self, config):  # The connector timer and decoder are reconfigured in the connector thread
         self._config = config
-
-        with suppress(AttributeError):
-            self.connector.config = config
+        self.config_changed.emit(config)
 
     @property
     def get_connected_host(self):
@@ -122,19 +119,18 @@ class ConnectionThread(ConnectionInterface, QObject, metaclass=QObjectAbcMeta):
         self.connector: Connector = Connector(self.config)
         self.thread: QThread = QThread()
         self.connector.moveToThread(self.thread)
-        self.thread.started.connect(self.run)
+        self.stop_requested.connect(self.connector.disconnect_sv, Qt.ConnectionType.BlockingQueuedConnection)
+        self.config_changed.connect(self.connector.set_config, Qt.ConnectionType.QueuedConnection)
         self.thread.start()  # Once the connector started no more direct call can be made
 
-    def run(self):
-        while not self.stop:  # Main endless cycle
-            QCoreApplication.processEvents()  # Processes events instead of direct interaction
-            QThread.msleep(10)
-
-        self.thread.terminate()
-        self.disconnect_sv()
+    def stop_thread(self):  # The connection is dropped in the connector thread, then the thread event loop is finished
+        if self.stop:
+            return
 
-    def stop_thread(self):  # Once the self.stop become True the connection will be dropped and the thread terminated
         self.stop = True
+        self.stop_requested.emit()
+        self.thread.quit()
+        self.thread.wait()
 
     def is_connected(self):
         return self.connector.state() == self.connector.SocketState.ConnectedState
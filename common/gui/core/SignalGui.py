@@ -76,6 +76,8 @@ class SignalGui(Terminal):
     trans_timer: TransactionTimer
     set_remote_spec: pyqtSignal = pyqtSignal()
     _run_timer: QTimer
+    _latency_timer: QTimer
+    LATENCY_REFRESH_INTERVAL_MS: int = 1000
     _generated_echo_test_transactions: list[Transaction]
 
     def set_json_view_focus(function: callable):
@@ -102,6 +104,7 @@ class SignalGui(Terminal):
         self.trans_timer = TransactionTimer(KeepAlive.TransTypes.TRANS_TYPE_TRANSACTION)
         self._generated_echo_test_transactions = list()
         self._run_timer = QTimer()
+        self._latency_timer = QTimer()
         self.connect_widgets()
         self.setup()
 
@@ -109,6 +112,7 @@ class SignalGui(Terminal):
         QDir.addSearchPath(GuiDirs.STYLE_DIR.name, GuiDirs.STYLE_DIR)
         self._run_timer.setSingleShot(True)
         self._run_timer.start(int())
+        self._latency_timer.start(self.LATENCY_REFRESH_INTERVAL_MS)
         self.logger.add_wireless_handler(self.wireless_handler)
 
     def on_startup(self) -> None:  # Runs on startup to make all the preparation activity, then shows MainWindow
@@ -198,6 +202,7 @@ class SignalGui(Terminal):
             self.api.api_stopped: lambda: window.process_api_mode_change(ApiModes.STOP),
             self.api.send_transaction: lambda transaction: self.send(transaction, is_api_call=True),
             self._run_timer.timeout: self.on_startup,
+            self._latency_timer.timeout: lambda: window.set_latency_report(self.trans_queue.get_latency_report()),
 
         }
 
@@ -0,0 +1,33 @@
+from PyQt6.QtWidgets import QLabel
+from common.lib.data_models.LatencyReport import LatencyReport, LatencyStats
+
+
+class LatencyStatus(QLabel):  # Status bar widget, the total percentiles and the tooltip with the breakdown
+    NO_DATA: str = "Latency: no responses"
+
+    def __init__(self):
+        super().__init__()
+        self.setText(self.NO_DATA)
+
+    def set_report(self, report: LatencyReport):
+        if not report.total.count:
+            self.setText(self.NO_DATA)
+            self.setToolTip(str())
+            return
+
+        stats: LatencyStats = report.total
+
+        self.setText(
+            f"Latency ms  p50 {stats.p50_ms:.1f}  p90 {stats.p90_ms:.1f}  p99 {stats.p99_ms:.1f}  "
+            f"p99.9 {stats.p99_9_ms:.1f}  max {stats.max_ms:.1f}  ({stats.count})"
+        )
+
+        rows: list[str] = [f"Since {report.interval_started:%T}, p50 / p99 / max ms"]
+        rows.extend(self.get_row(f"MTI {mti}", stats) for mti, stats in report.by_message_type.items())
+        rows.extend(self.get_row(f"Response code {code}", stats) for code, stats in report.by_response_code.items())
+
+        self.setToolTip("\n".join(rows))
+
+    @staticmethod
+    def get_row(name: str, stats: LatencyStats) -> str:
+        return f"{name}: {stats.p50_ms:.1f} / {stats.p99_ms:.1f} / {stats.max_ms:.1f} ({stats.count})"
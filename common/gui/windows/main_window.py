@@ -10,6 +10,7 @@ from common.lib.enums import KeepAlive
 from common.lib.enums.TextConstants import TextConstants
 from common.lib.core.EpaySpecification import EpaySpecification
 from common.lib.data_models.Config import Config
+from common.lib.data_models.LatencyReport import LatencyReport
 from common.gui.forms.mainwindow import Ui_MainWindow
 from common.gui.decorators.window_settings import set_window_icon
 from common.gui.enums import ButtonActions, MainFieldSpec as FieldsSpec
@@ -20,6 +21,7 @@ from common.gui.enums.Buttons import Buttons
 from common.gui.enums.ConnectionStatus import ConnectionStatus
 from common.gui.enums.ConnectionStatus import ConnectionIcon
 from common.gui.core.tab_view.TabView import TabView
+from common.gui.core.widgets.LatencyStatus import LatencyStatus
 from common.gui.enums.ToolBarElements import ToolBarElements
 from common.gui.tools.create_gui_elements import create_button, create_vertical_line
 
@@ -131,6 +133,8 @@ class MainWindow(Ui_MainWindow, QMainWindow):
         self._tab_view.setMaximumHeight(520)
         self.TabViewLayout.addWidget(self._tab_view)
         self.process_api_mode_change(ApiModes.NOT_RUN)
+        self.LatencyStatus: LatencyStatus = LatencyStatus()
+        self.statusbar.addPermanentWidget(self.LatencyStatus)
 
     def _add_control_buttons(self) -> None:
 
@@ -647,6 +651,9 @@ class MainWindow(Ui_MainWindow, QMainWindow):
         self.ConnectionStatus.setText(text)
         self.ConnectionStatusLabel.setPixmap(QPixmap(icon))
 
+    def set_latency_report(self, report: LatencyReport) -> None:
+        self.LatencyStatus.set_report(report)
+
     def set_bitmap(self, bitmap: str = str()) -> None:
         self._tab_view.bit_map.setText(bitmap)
 
@@ -271,7 +271,7 @@ class SpecWindow(Ui_SpecificationWindow, QDialog):
         self.reload()
 
     def set_mti_list(self, mti_list):
-        self.spec.spec.mti = mti_list
+        self.spec.mti = mti_list
 
     def set_mti(self):
         mti_window = MtiSpecWindow()
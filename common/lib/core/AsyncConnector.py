@@ -0,0 +1,341 @@
+from threading import Thread
+from socket import gaierror, IPPROTO_TCP, TCP_NODELAY
+from asyncio import (
+    AbstractEventLoop, StreamReader, StreamWriter, Task, TimerHandle, new_event_loop, get_running_loop, open_connection,
+    run_coroutine_threadsafe, wait_for,
+)
+from loguru import logger
+from PyQt6.QtCore import QObject, QEventLoop, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QTcpSocket
+from common.lib.data_models.Config import Config
+from common.lib.core.Connector import Connector
+from common.lib.core.FrameDecoder import FrameDecoder
+from common.lib.interfaces.MetaClasses import QObjectAbcMeta
+from common.lib.interfaces.ConnectorInterface import ConnectionInterface
+
+
+"""
+
+ Asyncio connector, the alternative of the Qt socket connector for the headless mode
+
+ The connection is served by the asyncio StreamReader and StreamWriter. The event loop runs forever in its own daemon
+ thread, see create_loop, so an incoming frame is read and decoded as soon as it comes, whatever the main thread does.
+ The loop thread never sleeps and never waits for the main thread
+
+ The connector has the same set of pyqtSignals as the Qt connector. The signals are emitted in the loop thread and
+ delivered to the main thread slots by the queued connections, so the terminal gets them while it processes the Qt
+ events. The calls of the main thread, e.g. sending, are passed to the loop thread, the connection and disconnection
+ calls block until they are done. The state and the errors are reported by the QTcpSocket enums, the terminal reads
+ them in the same way for both connectors
+
+ wait_for_events runs the Qt event loop of the main thread for the given time, it returns the control as the time
+ passes, the signals of the loop thread and the Qt timers (timeouts, keep-alive) are processed meanwhile. The
+ connector is selected by the host.connector_type config param or by the --connector CLI flag
+
+ Usage example
+
+ connector = AsyncConnector(config)
+ connector.incoming_transaction_data.connect(process_frames)
+ connector.connect_sv(host, port)
+ connector.wait_for_events(0.1)
+
+"""
+
+
+class AsyncConnector(QObject, ConnectionInterface, metaclass=QObjectAbcMeta):
+    READ_CHUNK_SIZE: int = 64 * 1024
+    CONNECTION_TIMEOUT: float = 10
+    SocketState = QTcpSocket.SocketState
+    SocketError = QTcpSocket.SocketError
+    incoming_transaction_data: pyqtSignal = pyqtSignal(list)
+    transaction_sent: pyqtSignal = pyqtSignal(str)
+    got_remote_spec: pyqtSignal = pyqtSignal(str)
+    sending_error: pyqtSignal = pyqtSignal(str, str)
+    connected: pyqtSignal = pyqtSignal()
+    disconnected: pyqtSignal = pyqtSignal()
+    errorOccurred: pyqtSignal = pyqtSignal(QTcpSocket.SocketError)
+    stateChanged: pyqtSignal = pyqtSignal(QTcpSocket.SocketState)
+    _config: Config = None
+    _frame_decoder: FrameDecoder
+    _loop: AbstractEventLoop
+    _reader: StreamReader | None = None
+    _writer: StreamWriter | None = None
+    _reader_task: Task | None = None
+    _state: QTcpSocket.SocketState = QTcpSocket.SocketState.UnconnectedState
+    _error: QTcpSocket.SocketError = QTcpSocket.SocketError.UnknownSocketError
+    _error_string: str = str()
+    _host: str = str()
+    _port: int = int()
+    _write_buffer: list[bytes]
+    _buffered_ids: list[str]
+    _flush_handle: TimerHandle | None = None
+
+    get_remote_spec = Connector.get_remote_spec  # Same remote spec loading, the result is emitted by got_remote_spec
+
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, config):  # The frame decoder is reconfigured in the loop thread, where it decodes the data
+        self._config = config
+        self.loop.call_soon_threadsafe(self._set_decoder_config, config)
+
+    @property
+    def loop(self) -> AbstractEventLoop:
+        return self._loop
+
+    def __init__(self, config: Config, loop: AbstractEventLoop | None = None):
+        QObject.__init__(self)
+        self._frame_decoder = FrameDecoder()
+        self._write_buffer = list()
+        self._buffered_ids = list()
+        self._loop = loop if loop is not None else self.create_loop()
+        self.config = config
+
+    @staticmethod
+    def create_loop() -> AbstractEventLoop:  # The loop runs in its own daemon thread, the connectors can share it
+        loop: AbstractEventLoop = new_event_loop()
+        Thread(target=loop.run_forever, name="AsyncConnector loop", daemon=True).start()
+
+        return loop
+
+    def state(self) -> QTcpSocket.SocketState:
+        return self._state
+
+    def error(self) -> QTcpSocket.SocketError:
+        return self._error
+
+    def errorString(self) -> str:
+        return self._error_string
+
+    def is_connected(self) -> bool:
+        return self._state == self.SocketState.ConnectedState
+
+    def connection_in_progress(self) -> bool:
+        return self._state in (self.SocketState.HostLookupState, self.SocketState.ConnectingState)
+
+    def get_connected_host(self) -> str:
+        return self._host if self.is_connected() else str()
+
+    def get_connected_port(self) -> int:
+        return self._port if self.is_connected() else int()
+
+    def wait_for_events(self, seconds: float) -> None:  # Processes the signals of the loop thread, no sleep
+        event_loop: QEventLoop = QEventLoop()
+        QTimer.singleShot(int(seconds * 1000), event_loop.quit)
+        event_loop.exec()
+
+    def send_transaction_data(self, trans_id: str, frame: bytes | bytearray):  # The message with the header
+        if not self.is_connected():
+            logger.warning("Host disconnected. Trying to establish the connection")
+
+            try:
+                self.reconnect_sv()
+            except Exception as connection_error:
+                self.sending_error.emit(trans_id, str(connection_error))
+                return
+
+        if not self.is_connected():
+            self.sending_error.emit(trans_id, "Cannot connect to host")
+            return
+
+        self.loop.call_soon_threadsafe(self._write, trans_id, frame)
+
+    def _write(self, trans_id: str, frame: bytes | bytearray):  # Runs in the loop thread
+        if self._writer is None:
+            self.sending_error.emit(trans_id, "Host disconnected")
+            return
+
+        if self.config.host.write_coalescing:
+            self.buffer_transaction_data(trans_id, frame)
+            return
+
+        try:
+            self._writer.write(frame)
+        except Exception as sending_error:
+            self.sending_error.emit(trans_id, f"Cannot send transaction data: {sending_error}")
+            return
+
+        logger.debug(f"bytes sent {len(frame)}")
+
+        self.transaction_sent.emit(trans_id)
+
+    def buffer_transaction_data(self, trans_id: str, frame: bytes | bytearray):
+        self._write_buffer.append(frame)
+        self._buffered_ids.append(trans_id)
+
+        if self._flush_handle is None:
+            self._flush_handle = self.loop.call_later(
+                self.config.host.write_coalescing_budget_us / 1_000_000, self.flush_write_buffer
+            )
+
+    def flush_write_buffer(self):  # All the gathered messages are written by one call
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._buffered_ids:
+            return
+
+        chunks, self._write_buffer = self._write_buffer, list()
+        trans_ids, self._buffered_ids = self._buffered_ids, list()
+
+        try:
+            self._writer.writelines(chunks)
+
+        except Exception as sending_error:
+            for trans_id in trans_ids:
+                self.sending_error.emit(trans_id, f"Cannot send transaction data: {sending_error}")
+
+            return
+
+        logger.debug(f"bytes sent {sum(map(len, chunks))}, messages {len(trans_ids)}")
+
+        for trans_id in trans_ids:
+            self.transaction_sent.emit(trans_id)
+
+    def connect_sv(self, host: str | None = None, port: int | None = None):
+        if host is None:
+            host = self.config.host.host
+
+        if port is None:
+            port = self.config.host.port
+
+        for item in host, port:
+            if item in (str(), None):
+                logger.error("Lost SV host address or port number. Check the configuration.")
+                logger.error("Connection is not established")
+                return
+
+        port = int(port)
+
+        logger.info(f"Connecting to {host}:{port}")
+
+        if self._in_loop_thread():
+            self.loop.create_task(self._connect(host, port))
+            return
+
+        run_coroutine_threadsafe(self._connect(host, port), self.loop).result()
+
+        if not self.is_connected():
+            return self.error()
+
+    def disconnect_sv(self):
+        if not self.is_connected():
+            return
+
+        if self._in_loop_thread():
+            self.loop.create_task(self._disconnect())
+            return
+
+        run_coroutine_threadsafe(self._disconnect(), self.loop).result()
+
+    def reconnect_sv(self, host: str | None = None, port: str | None = None):
+        self.disconnect_sv()
+
+        if not self._state == self.SocketState.UnconnectedState:
+            logger.error("Cannot disconnect the host")
+            return
+
+        try:
+            self.connect_sv(host, port)
+
+        except Exception as connection_error:
+            logger.error(f"SV connection error: {connection_error}")
+
+    async def _connect(self, host: str, port: int) -> None:
+        self._set_state(self.SocketState.ConnectingState)
+        self._frame_decoder.reset()
+
+        try:
+            self._reader, self._writer = await wait_for(open_connection(host, port), self.CONNECTION_TIMEOUT)
+
+        except Exception as connection_error:
+            self._set_state(self.SocketState.UnconnectedState)
+            self._set_error(connection_error)
+            return
+
+        self._writer.get_extra_info("socket").setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+        self._host, self._port = host, port
+        self._error, self._error_string = self.SocketError.UnknownSocketError, str()
+        self._reader_task = self.loop.create_task(self._read())
+        self._set_state(self.SocketState.ConnectedState)
+        self.connected.emit()
+
+    async def _disconnect(self) -> None:
+        self.flush_write_buffer()
+        self._set_state(self.SocketState.ClosingState)
+
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+        self._writer.close()
+
+        try:
+            await self._writer.wait_closed()
+        except Exception as closing_error:
+            logger.debug(f"Connection closing error: {closing_error}")
+
+        self._close()
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                data: bytes = await self._reader.read(self.READ_CHUNK_SIZE)
+
+            except Exception as reading_error:
+                self._set_error(reading_error)
+                data = bytes()
+
+            if not data:
+                break
+
+            if frames := self._frame_decoder.decode(data):  # All the frames of the read are emitted at once
+                self.incoming_transaction_data.emit(frames)
+
+        self._reader_task = None  # The task is finished, there is nothing to cancel
+        self._writer.close()
+        self._close()
+
+    def _close(self) -> None:
+        self._reader = self._writer = self._reader_task = None
+
+        if self._state == self.SocketState.UnconnectedState:
+            return
+
+        self._set_state(self.SocketState.UnconnectedState)
+        self.disconnected.emit()
+
+    def _set_state(self, state: QTcpSocket.SocketState) -> None:
+        if state == self._state:
+            return
+
+        self._state = state
+        self.stateChanged.emit(state)
+
+    def _set_error(self, error: Exception) -> None:
+        match error:
+            case ConnectionRefusedError():
+                self._error = self.SocketError.ConnectionRefusedError
+            case ConnectionResetError() | BrokenPipeError():
+                self._error = self.SocketError.RemoteHostClosedError
+            case TimeoutError():
+                self._error = self.SocketError.SocketTimeoutError
+            case gaierror():
+                self._error = self.SocketError.HostNotFoundError
+            case _:
+                self._error = self.SocketError.NetworkError
+
+        self._error_string = str(error) or error.__class__.__name__
+        self.errorOccurred.emit(self._error)
+
+    def _set_decoder_config(self, config: Config) -> None:
+        self._frame_decoder.header_length = config.host.header_length if config.host.header_length_exists else int()
+        self._frame_decoder.header_format = config.host.header_format
+
+    def _in_loop_thread(self) -> bool:
+        try:
+            return get_running_loop() is self.loop
+        except RuntimeError:
+            return False
@@ -1,114 +1,172 @@
-from binascii import b2a_hex, a2b_hex
-from collections import OrderedDict
+from binascii import a2b_hex
 from common.lib.core.EpaySpecification import EpaySpecification
 from common.lib.enums.MessageLength import MessageLength
 
 
-class Bitmap:
-    _supported_types: tuple = (hex, bin, dict, bytes)
-    _spec: EpaySpecification = EpaySpecification()
+"""
 
-    @property
-    def spec(self):
-        return self._spec
+ ISO bitmap backed by a 128-bit integer
 
-    def __init__(self, bitmap, bitmap_type=dict):
-        self.bitmap: OrderedDict = self._parse_bitmap(bitmap, bitmap_type)
-        sorted_bitmap = OrderedDict()
+ The most significant bit stands for the field 1 (secondary bitmap), the least significant one for the field 128. The
+ primary bitmap of 64 bits is stored in the upper half of the integer, so the fields numbers do not depend on the
+ bitmap length
 
-        for bit in sorted(self.bitmap.keys(), key=int):
-            sorted_bitmap[bit] = self.bitmap[bit]
+ Presence test and iteration over the set bits are done by bit operations, the fields are iterated in ascending order.
+ The dict, hex, bin and the other views of the get_bitmap are built on demand, when the GUI or the dump needs them
 
-        self.bitmap = sorted_bitmap.copy()
-        self.first_bitmap: dict = dict()
-        self.second_bitmap = dict()
+ Usage example
 
-        for bit, exists in self.bitmap.items():
-            first_bitmap_capacity = MessageLength.FIRST_BITMAP_CAPACITY + 1
-            second_bitmap_capacity = MessageLength.SECOND_BITMAP_CAPACITY + 1
+ Bitmap.from_fields(transaction.data_fields).to_bytes()  # Encode the bitmap of the transaction
 
-            match int(bit):
-                case bit if bit in range(1, first_bitmap_capacity):
-                    self.first_bitmap[bit] = exists
+ for field in Bitmap.from_bytes(data):  # Iterate over the fields of the incoming message
+     ...
 
-                case bit if bit in range(first_bitmap_capacity, second_bitmap_capacity):
-                    self.second_bitmap[bit] = exists
+"""
 
-                case _:
-                    raise ValueError("Broken bitmap!")
 
-    def _parse_bitmap(self, bitmap, bitmap_type):
-        parsed_bitmap = {self.spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY: False}
-        parsed_bitmap.update(dict.fromkeys(self.spec.fields.keys(), False))
+class Bitmap:
+    _supported_types: tuple = (hex, bin, dict, bytes)
+    _spec: EpaySpecification = EpaySpecification()
+    _fields: tuple[str, ...] = tuple(str(field) for field in range(MessageLength.SECOND_BITMAP_CAPACITY + 1))
+    _capacity: int = MessageLength.SECOND_BITMAP_CAPACITY
+    _secondary: int = 1 << (MessageLength.SECOND_BITMAP_CAPACITY - 1)
+    _value: int = int()
+
+    @property
+    def spec(self):
+        return self._spec
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def __init__(self, bitmap=None, bitmap_type=dict):
+        if bitmap is None:
+            return
 
         if bitmap_type not in self._supported_types:
             raise TypeError("Wrong bitmap type")
 
         if bitmap_type is dict:
-            for bit, value in bitmap.items():
-                parsed_bitmap[bit] = bool(value)
-
-                if int(bit) > MessageLength.FIRST_BITMAP_CAPACITY:
-                    parsed_bitmap[self.spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY] = True
-
-            return parsed_bitmap
+            self._value = self._parse_fields(bitmap)
 
         if bitmap_type is bytes:
-            return self._parse_bitmap(b2a_hex(bitmap), hex)
+            self._value = self._parse_bytes(bitmap)
 
         if bitmap_type is hex:
             if len(bitmap) not in (MessageLength.FIRST_BITMAP_LENGTH_HEX, MessageLength.SECOND_BITMAP_LENGTH_HEX):
                 raise ValueError("Invalid bitmap length")
 
-            bitmap = bin(int(bitmap, 16))[2:]
-
-            if len(bitmap) < MessageLength.FIRST_BITMAP_CAPACITY:
-                bitmap = bitmap.zfill(MessageLength.FIRST_BITMAP_CAPACITY)
+            self._value = self._parse_bytes(a2b_hex(bitmap))
 
         if bitmap_type is bin:
             if len(bitmap) not in (MessageLength.FIRST_BITMAP_CAPACITY, MessageLength.SECOND_BITMAP_CAPACITY):
                 raise ValueError("Invalid bitmap length")
 
-        for pos, bit in enumerate(bitmap, start=1):
-            parsed_bitmap[str(pos)] = bool(int(bit))
+            self._value = int(bitmap, 2) << (self._capacity - len(bitmap))
+
+    @classmethod
+    def from_bytes(cls, bitmap: bytes) -> "Bitmap":
+        instance: Bitmap = cls()
+        instance._value = cls._parse_bytes(bitmap)
+        return instance
+
+    @classmethod
+    def from_fields(cls, fields) -> "Bitmap":
+        instance: Bitmap = cls()
+        instance._value = cls._parse_fields(fields)
+        return instance
+
+    @classmethod
+    def _parse_bytes(cls, bitmap: bytes) -> int:
+        match len(bitmap):
+            case MessageLength.BITMAP_LENGTH:
+                return int.from_bytes(bitmap, "big") << MessageLength.FIRST_BITMAP_CAPACITY
+
+            case length if length == MessageLength.BITMAP_LENGTH * 2:
+                return int.from_bytes(bitmap, "big")
+
+            case _:
+                raise ValueError("Invalid bitmap length")
+
+    @classmethod
+    def _parse_fields(cls, fields) -> int:
+        value: int = int()
+        capacity: int = cls._capacity
+
+        for field, field_data in fields.items():
+            if not field_data:
+                continue
+
+            if not 0 < (field_number := int(field)) <= capacity:
+                raise ValueError("Broken bitmap!")
+
+            value |= 1 << (capacity - field_number)
+
+        if value & ((1 << MessageLength.FIRST_BITMAP_CAPACITY) - 1):
+            value |= cls._secondary
+
+        return value
+
+    def __contains__(self, field) -> bool:
+        try:
+            return bool(self._value >> (self._capacity - int(field)) & 1)
+
+        except ValueError:  # The field is not a number or out of the bitmap
+            return False
+
+    def __iter__(self):  # Set bits from the field 1 to the field 128
+        value: int = self._value
+
+        while value:
+            bit: int = value.bit_length() - 1
+            value ^= 1 << bit
+            yield self._fields[self._capacity - bit]
 
-        return parsed_bitmap
+    def __len__(self) -> int:
+        return self._value.bit_count()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+
+        return self._value == other._value
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.get_bitmap(str)})"
+
+    def to_bytes(self) -> bytes:
+        if self.second_bitmap_exists():
+            return self._value.to_bytes(MessageLength.BITMAP_LENGTH * 2, "big")
+
+        return (self._value >> MessageLength.FIRST_BITMAP_CAPACITY).to_bytes(MessageLength.BITMAP_LENGTH, "big")
 
     def get_bitmap(self, bitmap_type: callable = dict, has_data: bool = None):
         result = None
-        bitmap = self.bitmap.copy()
-
-        if isinstance(has_data, bool):
-            bitmap = {key: val for key, val in bitmap.items() if val is has_data}
 
         if bitmap_type is dict:
-            result = bitmap
+            result = {field: field in self for field in self.get_field_set()}
+
+            if isinstance(has_data, bool):
+                result = {field: exists for field, exists in result.items() if exists is has_data}
 
         if bitmap_type is str:
-            result = [str(field) for field, exists in bitmap.items() if exists]
-            result = ", ".join(result)
+            result = ", ".join(self)
 
         if bitmap_type is bin:
-            result = [str(int(exists)) for exists in bitmap.values()]
-            result = "".join(result)
+            result = format(self._value, f"0{self._capacity}b")
 
             if not self.second_bitmap_exists():
                 result = result[:MessageLength.FIRST_BITMAP_CAPACITY]
 
         if bitmap_type is hex:
-            result = self.get_bitmap(bin)
-            result = hex(int(result, 2))[2:].upper()
-            result = result.zfill(MessageLength.BITMAP_LENGTH)
-
-            if not self.second_bitmap_exists():
-                result = result[:MessageLength.FIRST_BITMAP_LENGTH_HEX]
+            result = self.to_bytes().hex().upper()
 
         if bitmap_type is list:
             result = self.get_field_set(filled=True)
 
         if bitmap_type is bytes:
-            result = self.get_bitmap(hex)
-            result = a2b_hex(result)
+            result = self.to_bytes()
 
         if result is None:
             raise TypeError("Wrong bitmap type")
@@ -116,10 +174,16 @@ class Bitmap:
         return result
 
     def second_bitmap_exists(self):
-        return bool(self.bitmap.get(self.spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY))
+        return bool(self._value & self._secondary)
 
     def get_field_set(self, filled=None):
+        if filled is True:
+            return list(self)
+
+        fields: set[str] = {self.spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY, *self.spec.fields.keys(), *self}
+        fields: list[str] = sorted(fields, key=int)
+
         if filled is None:
-            return list(self.bitmap.keys())
+            return fields
 
-        return [field for field, has_data in self.bitmap.items() if has_data is filled]
+        return [field for field in fields if (field in self) is filled]
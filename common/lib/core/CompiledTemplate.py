@@ -0,0 +1,192 @@
+from typing import Callable
+from dataclasses import dataclass
+from common.lib.core.Parser import Parser
+from common.lib.core.FieldsGenerator import FieldsGenerator
+from common.lib.core.EpaySpecification import EpaySpecification
+from common.lib.data_models.Transaction import Transaction, generate_trans_id
+from common.lib.data_models.TransactionRecord import TransactionRecord
+from common.lib.data_models.Types import FieldPath
+
+
+"""
+
+ Compiled template of the repeated transaction
+
+ The repeat and load runs send the same message again and again, only the generated fields (STAN, DE007 and DE012
+ dates, amount, etc.) and the transaction ID in DE047.072 change. The template encodes the message once and records the
+ byte offsets of these slots. Each new message is a copy of the encoded skeleton with the slots overwritten, the data
+ fields are not sorted, joined and encoded again
+
+ The generated values have the fixed length, so the slots never move. A value of the other length can't be patched,
+ the template raises ValueError, build the message by the regular way in this case. The template follows the
+ specification of the compilation time, compile it again when the specification changes
+
+ The built record carries the message in its wire_data, the transaction queue sends it as is
+
+ Usage example
+
+ template = CompiledTemplate(transaction)
+ record = template.build()
+ trans_queue.put_transaction(record)
+ records = template.build_many(100_000)  # Prepared in advance, e.g. for a soak test
+
+"""
+
+
+@dataclass(slots=True)
+class TemplateSlot:
+    field_path: FieldPath
+    offset: int  # Of the value in the message bytes
+    length: int
+    generate: Callable[[], str] | None = None  # None for the transaction ID slot
+
+
+class CompiledTemplate:
+    SENTINEL_FIRST_CHAR: int = 1  # The slots are found in the encoded message by the control character runs
+    spec: EpaySpecification = EpaySpecification()
+    _transaction: Transaction
+    _skeleton: bytes
+    _slots: list[TemplateSlot]
+    _trans_id_slot: TemplateSlot | None = None
+
+    @property
+    def transaction(self) -> Transaction:
+        return self._transaction
+
+    @property
+    def slots(self) -> list[FieldPath]:
+        field_paths: list[FieldPath] = [slot.field_path for slot in self._slots]
+
+        if self._trans_id_slot:
+            field_paths.append(self._trans_id_slot.field_path)
+
+        return field_paths
+
+    def __init__(self, transaction: Transaction, set_trans_id: bool = True):
+        generator: FieldsGenerator = FieldsGenerator()
+        template: Transaction = transaction.model_copy(deep=True)
+        template.trans_id = generate_trans_id()  # The slot length is the length of the generated transaction ID
+
+        if set_trans_id:
+            template = generator.set_trans_id(template)
+
+        if template.generate_fields:
+            template = generator.set_generated_fields(template)
+
+        generators: dict[str, Callable[[], str]] = {
+            field: generator.get_field_generator(field, max_amount=template.max_amount)
+            for field in template.generate_fields
+            if template.data_fields.get(field) and self.spec.can_be_generated([field])
+        }
+
+        has_trans_id: bool = set_trans_id and self._get_trans_id_field_data(template) is not None
+        sentinels: dict[str, str] = dict()
+        marked: Transaction = template.model_copy(deep=True)
+
+        for number, field in enumerate(generators):
+            sentinels[field] = self._get_sentinel(number, len(template.data_fields[field]))
+            marked.data_fields[field] = sentinels[field]
+
+        if has_trans_id:
+            trans_id_sentinel: str = self._get_sentinel(len(sentinels), len(template.trans_id))
+            marked.data_fields[self.spec.FIELD_SET.FIELD_047_PROPRIETARY_FIELD] = self._set_trans_id_field_data(
+                marked, trans_id_sentinel
+            )
+
+        self._skeleton = Parser.create_dump(template)
+        marked_dump: bytes = Parser.create_dump(marked)
+
+        if len(marked_dump) != len(self._skeleton):
+            raise ValueError("Cannot compile the template, the generated fields change the message length")
+
+        self._slots = [
+            TemplateSlot([field], self._find_slot(marked_dump, sentinel), len(sentinel), generators[field])
+            for field, sentinel in sentinels.items()
+        ]
+
+        if has_trans_id:
+            field_path: FieldPath = [self.spec.FIELD_SET.FIELD_047_PROPRIETARY_FIELD, "072"]
+            offset: int = self._find_slot(marked_dump, trans_id_sentinel)
+            self._trans_id_slot = TemplateSlot(field_path, offset, len(trans_id_sentinel))
+
+        self._transaction = template
+
+    def build(self, trans_id: str | None = None) -> TransactionRecord:
+        if trans_id is None:
+            trans_id = generate_trans_id()
+
+        return self._build([slot.generate() for slot in self._slots], trans_id)
+
+    def build_many(self, number: int) -> list[TransactionRecord]:  # The generated fields are made by NumPy at once
+        if not self._slots:
+            return [self.build() for _ in range(number)]
+
+        columns: list[list[str]] = [
+            FieldsGenerator.generate_field_bulk(slot.field_path[0], number, max_amount=self._transaction.max_amount)
+            for slot in self._slots
+        ]
+
+        return [self._build(values, generate_trans_id()) for values in zip(*columns)]
+
+    def _build(self, values: list[str] | tuple[str, ...], trans_id: str) -> TransactionRecord:
+        template: Transaction = self._transaction
+        message: bytearray = bytearray(self._skeleton)
+        data_fields: dict = dict(template.data_fields)
+
+        for slot, value in zip(self._slots, values):
+            self._patch(message, slot, value)
+            data_fields[slot.field_path[0]] = value
+
+        if self._trans_id_slot:
+            self._patch(message, self._trans_id_slot, trans_id)
+            data_fields[self.spec.FIELD_SET.FIELD_047_PROPRIETARY_FIELD] = self._set_trans_id_field_data(
+                template, trans_id
+            )
+
+        return TransactionRecord(
+            message_type=template.message_type,
+            data_fields=data_fields,
+            trans_id=trans_id,
+            max_amount=template.max_amount,
+            generate_fields=list(template.generate_fields),
+            json_fields=list(template.json_fields),
+            is_keep_alive=template.is_keep_alive,
+            wire_data=bytes(message),
+        )
+
+    @staticmethod
+    def _patch(message: bytearray, slot: TemplateSlot, value: str) -> None:
+        if len(encoded := value.encode()) != slot.length:
+            raise ValueError(f"Field {'.'.join(slot.field_path)} length changed, the template cannot be patched")
+
+        message[slot.offset:slot.offset + slot.length] = encoded
+
+    def _get_sentinel(self, number: int, length: int) -> str:
+        return chr(self.SENTINEL_FIRST_CHAR + number) * length
+
+    @staticmethod
+    def _find_slot(message: bytes, sentinel: str) -> int:
+        encoded: bytes = sentinel.encode()
+
+        if (offset := message.find(encoded)) < int() or message.find(encoded, offset + 1) >= int():
+            raise ValueError("Cannot compile the template, the generated field is not found in the message")
+
+        return offset
+
+    def _get_trans_id_field_data(self, transaction: Transaction) -> str | None:
+        if not (de047 := transaction.data_fields.get(self.spec.FIELD_SET.FIELD_047_PROPRIETARY_FIELD)):
+            return
+
+        if isinstance(de047, dict):
+            return de047.get("072")
+
+        if isinstance(de047, str) and de047.endswith(transaction.trans_id):  # Appended by FieldsGenerator.set_trans_id
+            return transaction.trans_id
+
+    def _set_trans_id_field_data(self, transaction: Transaction, trans_id: str) -> str | dict:
+        de047: str | dict = transaction.data_fields[self.spec.FIELD_SET.FIELD_047_PROPRIETARY_FIELD]
+
+        if isinstance(de047, dict):
+            return de047 | {"072": trans_id}
+
+        return f"{de047[:-len(trans_id)]}{trans_id}"
@@ -0,0 +1,306 @@
+from asyncio import AbstractEventLoop
+from dataclasses import dataclass
+from itertools import count
+from loguru import logger
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QTcpSocket
+from common.lib.data_models.Config import Config
+from common.lib.core.Connector import Connector
+from common.lib.core.AsyncConnector import AsyncConnector
+from common.lib.enums.ConnectorType import ConnectorType
+from common.lib.enums.BalancingStrategy import BalancingStrategy
+from common.lib.interfaces.MetaClasses import QObjectAbcMeta
+from common.lib.interfaces.ConnectorInterface import ConnectionInterface
+
+
+"""
+
+ Pool of the parallel connections to the host
+
+ The pool keeps pool.size connections of the host.connector_type and looks like a single connector for the terminal.
+ The connections are spread over the host from the config and the additional pool.hosts, one by one. Each request is
+ sent by one of the connected connections, chosen by the balancing strategy
+
+ round_robin        The connections take the requests in turn
+ least_in_flight    The connection with the minimal number of the requests waiting for the response
+
+ The responses of all the connections are emitted by the same incoming_transaction_data signal, the transaction queue
+ matches them regardless of the socket they came from. The queue reports the finished requests by
+ release_transaction, that is how the pool counts the requests in flight. The requests in flight of a dropped
+ connection are reported by sending_error, so the queue frees them at once instead of waiting for their timeouts
+
+ The health check runs each pool.health_check_interval_seconds and reconnects the dropped connections until the pool
+ is disconnected by disconnect_sv. The pool is connected when at least one of its connections is connected
+
+ Usage example
+
+ pool = ConnectionPool(config)
+ pool.connect_sv()
+ pool.send_transaction_data(trans_id, frame)
+ pool.release_transaction(trans_id)
+
+"""
+
+
+@dataclass(slots=True)
+class PoolConnection:
+    connector: Connector | AsyncConnector
+    host: str
+    port: int
+    in_flight: int = int()
+    sent: int = int()
+    received: int = int()
+    reconnects: int = int()
+    state: QTcpSocket.SocketState = QTcpSocket.SocketState.UnconnectedState
+
+    def is_connected(self) -> bool:
+        return self.state == QTcpSocket.SocketState.ConnectedState
+
+
+class ConnectionPool(QObject, ConnectionInterface, metaclass=QObjectAbcMeta):
+    incoming_transaction_data: pyqtSignal = pyqtSignal(list)
+    transaction_sent: pyqtSignal = pyqtSignal(str)
+    got_remote_spec: pyqtSignal = pyqtSignal(str)
+    sending_error: pyqtSignal = pyqtSignal(str, str)
+    connected: pyqtSignal = pyqtSignal()
+    disconnected: pyqtSignal = pyqtSignal()
+    errorOccurred: pyqtSignal = pyqtSignal(QTcpSocket.SocketError)
+    stateChanged: pyqtSignal = pyqtSignal(QTcpSocket.SocketState)
+    SocketState = QTcpSocket.SocketState
+    _config: Config
+    _connections: list[PoolConnection]
+    _owners: dict[str, PoolConnection]  # The requests in flight by trans_id
+    _health_check_timer: QTimer
+    _loop: AbstractEventLoop | None = None
+    _turn: count
+    _state: QTcpSocket.SocketState = QTcpSocket.SocketState.UnconnectedState
+    _error_connection: PoolConnection | None = None
+    _active: bool = False  # Reconnect the dropped connections
+
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, config: Config):
+        self._config = config
+
+        for connection in self._connections:
+            connection.connector.config = config
+
+        self._health_check_timer.setInterval(config.pool.health_check_interval_seconds * 1000)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._owners)
+
+    def __init__(self, config: Config):
+        QObject.__init__(self)
+        self._connections = list()
+        self._owners = dict()
+        self._turn = count()
+        self._health_check_timer = QTimer()
+        self._health_check_timer.timeout.connect(self.check_health)
+        self.config = config
+
+        if config.host.connector_type == ConnectorType.ASYNCIO:
+            self._loop = AsyncConnector.create_loop()  # The connections share one loop thread
+
+        for _ in range(config.pool.size):
+            self._add_connection()
+
+    def get_connections(self) -> list[PoolConnection]:
+        return list(self._connections)
+
+    def get_endpoints(self) -> list[tuple[str, int]]:
+        endpoints: list[tuple[str, int]] = [(self.config.host.host, int(self.config.host.port))]
+
+        for address in self.config.pool.hosts:
+            host, _, port = address.rpartition(":")
+            endpoints.append((host, int(port)))
+
+        return endpoints
+
+    def state(self) -> QTcpSocket.SocketState:
+        return self._state
+
+    def error(self) -> QTcpSocket.SocketError:
+        if self._error_connection is None:
+            return QTcpSocket.SocketError.UnknownSocketError
+
+        return self._error_connection.connector.error()
+
+    def errorString(self) -> str:
+        if self._error_connection is None:
+            return str()
+
+        return self._error_connection.connector.errorString()
+
+    def is_connected(self) -> bool:
+        return self._state == self.SocketState.ConnectedState
+
+    def connection_in_progress(self) -> bool:
+        return self._state == self.SocketState.ConnectingState
+
+    def get_connected_host(self) -> str:
+        for connection in self._connections:
+            if connection.is_connected():
+                return connection.connector.get_connected_host()
+
+        return str()
+
+    def get_connected_port(self) -> int:
+        for connection in self._connections:
+            if connection.is_connected():
+                return connection.connector.get_connected_port()
+
+        return int()
+
+    def get_remote_spec(self):
+        self._connections[0].connector.get_remote_spec()
+
+    def wait_for_events(self, seconds: float) -> None:
+        connected: list[PoolConnection] = [connection for connection in self._connections if connection.is_connected()]
+        (connected or self._connections)[int()].connector.wait_for_events(seconds)
+
+    def send_transaction_data(self, trans_id: str, frame: bytes | bytearray):
+        connection: PoolConnection = self.choose_connection()
+        connection.in_flight += 1
+        connection.sent += 1
+        self._owners[trans_id] = connection
+        connection.connector.send_transaction_data(trans_id, frame)
+
+    def get_connections_number(self) -> int:
+        return len(self._connections)
+
+    def release_transaction(self, trans_id: str) -> None:
+        if connection := self._owners.pop(trans_id, None):
+            connection.in_flight -= 1
+
+    def choose_connection(self) -> PoolConnection:
+        turn: int = next(self._turn) % len(self._connections)
+        connections: list[PoolConnection] = self._connections[turn:] + self._connections[:turn]
+
+        if not (healthy := [connection for connection in connections if connection.is_connected()]):
+            return connections[0]  # The connector will try to reconnect or report the sending error
+
+        if max_in_flight := self.config.pool.max_in_flight:  # Prefer the connections with the free window slots
+            healthy = [connection for connection in healthy if connection.in_flight < max_in_flight] or healthy
+
+        if self.config.pool.balancing == BalancingStrategy.LEAST_IN_FLIGHT:
+            return min(healthy, key=lambda connection: connection.in_flight)
+
+        return healthy[0]
+
+    def connect_sv(self, host: str | None = None, port: int | None = None):
+        self._active = True
+
+        for connection, (target_host, target_port) in zip(self._connections, self._get_targets(host, port)):
+            connection.host, connection.port = target_host, target_port
+            connection.connector.connect_sv(target_host, target_port)
+
+        self._health_check_timer.start()
+
+        if not self.is_connected():
+            return self.error()
+
+    def disconnect_sv(self):
+        self._active = False
+        self._health_check_timer.stop()
+
+        for connection in self._connections:
+            connection.connector.disconnect_sv()
+
+    def reconnect_sv(self, host: str | None = None, port: str | None = None):
+        self.disconnect_sv()
+
+        try:
+            self.connect_sv(host, port)
+
+        except Exception as connection_error:
+            logger.error(f"SV connection error: {connection_error}")
+
+    def check_health(self) -> None:
+        if not self._active:
+            return
+
+        for number, connection in enumerate(self._connections, start=1):
+            if connection.is_connected() or connection.connector.connection_in_progress():
+                continue
+
+            logger.warning(f"Pool connection {number} to {connection.host}:{connection.port} is lost, reconnecting")
+
+            connection.reconnects += 1
+
+            try:
+                connection.connector.reconnect_sv(connection.host, connection.port)
+            except Exception as connection_error:
+                logger.error(f"Pool connection {number} error: {connection_error}")
+
+    def _add_connection(self) -> None:
+        if self._loop is not None:
+            connector: AsyncConnector = AsyncConnector(self.config, loop=self._loop)
+        else:
+            connector: Connector = Connector(self.config)
+            connector.setParent(self)  # The sockets are deleted along with the pool
+            self.destroyed.connect(lambda: connector.blockSignals(True))  # Closing socket doesn't call the pool
+
+        connection: PoolConnection = PoolConnection(connector, self.config.host.host, int(self.config.host.port))
+
+        connector.incoming_transaction_data.connect(lambda frames: self._process_frames(connection, frames))
+        connector.errorOccurred.connect(lambda *args: self._process_error(connection))
+        connector.stateChanged.connect(lambda state: self._update_state(connection, state))
+        connector.disconnected.connect(lambda: self._drop_in_flight(connection))
+        connector.transaction_sent.connect(self.transaction_sent.emit)
+        connector.sending_error.connect(self.sending_error.emit)
+        connector.got_remote_spec.connect(self.got_remote_spec.emit)
+
+        self._connections.append(connection)
+
+    def _get_targets(self, host: str | None, port: int | None) -> list[tuple[str, int]]:
+        endpoints: list[tuple[str, int]] = self.get_endpoints()
+
+        if host is not None and port is not None and (host, int(port)) not in endpoints:
+            endpoints = [(host, int(port))]  # Explicit host out of the config, all the connections go there
+
+        return [endpoints[number % len(endpoints)] for number in range(len(self._connections))]
+
+    def _process_frames(self, connection: PoolConnection, frames: list) -> None:
+        connection.received += len(frames)
+        self.incoming_transaction_data.emit(frames)
+
+    def _process_error(self, connection: PoolConnection) -> None:
+        self._error_connection = connection
+        self.errorOccurred.emit(connection.connector.error())
+
+    def _drop_in_flight(self, connection: PoolConnection) -> None:  # The responses won't come by the closed socket
+        for trans_id in [trans_id for trans_id, owner in self._owners.items() if owner is connection]:
+            self.release_transaction(trans_id)
+            self.sending_error.emit(trans_id, f"Connection to {connection.host}:{connection.port} is lost")
+
+    def _update_state(self, connection: PoolConnection, connection_state: QTcpSocket.SocketState) -> None:
+        connection.state = connection_state
+        states: set[QTcpSocket.SocketState] = {connection.state for connection in self._connections}
+
+        if self.SocketState.ConnectedState in states:
+            state = self.SocketState.ConnectedState
+        elif states & {self.SocketState.HostLookupState, self.SocketState.ConnectingState}:
+            state = self.SocketState.ConnectingState
+        else:
+            state = self.SocketState.UnconnectedState
+
+        if state == self._state:
+            return
+
+        previous_state, self._state = self._state, state
+
+        if state == self.SocketState.ConnectedState:
+            self._error_connection = None
+
+        self.stateChanged.emit(state)
+
+        if state == self.SocketState.ConnectedState:
+            self.connected.emit()
+
+        elif previous_state == self.SocketState.ConnectedState:
+            self.disconnected.emit()
@@ -1,12 +1,12 @@
-from struct import pack
 from http import HTTPStatus
 from http.client import HTTPResponse
 from urllib.request import urlopen
 from loguru import logger
 from pydantic import ValidationError
 from PyQt6.QtNetwork import QTcpSocket
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import pyqtSignal, QTimer, Qt
 from common.lib.data_models.Config import Config
+from common.lib.core.FrameDecoder import FrameDecoder
 from common.lib.interfaces.MetaClasses import QObjectAbcMeta
 from common.lib.interfaces.ConnectorInterface import ConnectionInterface
 from common.lib.core.validators.DataValidator import DataValidator
@@ -14,11 +14,16 @@ from common.lib.exceptions.exceptions import DataValidationError, DataValidation
 
 
 class Connector(QTcpSocket, ConnectionInterface, metaclass=QObjectAbcMeta):
-    incoming_transaction_data: pyqtSignal = pyqtSignal(bytes)
+    incoming_transaction_data: pyqtSignal = pyqtSignal(list)
     transaction_sent: pyqtSignal = pyqtSignal(str)
     got_remote_spec: pyqtSignal = pyqtSignal(str)
     sending_error: pyqtSignal = pyqtSignal(str, str)
     _config: Config = None
+    _frame_decoder: FrameDecoder = None
+    _write_buffer: bytearray
+    _buffered_ids: list[str]
+    _flush_timer: QTimer
+    MAX_WRITE_BUFFER: int = 64 * 1024  # The gathered messages are written at once when the buffer reaches the size
 
     @property
     def config(self):
@@ -27,12 +32,24 @@ class Connector(QTcpSocket, ConnectionInterface, metaclass=QObjectAbcMeta):
     @config.setter
     def config(self, config):
         self._config = config
+        self._frame_decoder.header_length = config.host.header_length if config.host.header_length_exists else int()
+        self._frame_decoder.header_format = config.host.header_format
+        self._flush_timer.setInterval(config.host.write_coalescing_budget_us // 1000)  # Zero is the next loop tick
+
+    def set_config(self, config: Config):  # Slot of the config change made from another thread
+        self.config = config
 
     def __init__(self, config: Config):
         QTcpSocket.__init__(self)
+        self._frame_decoder = FrameDecoder()
+        self._write_buffer = bytearray()
+        self._buffered_ids = list()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._flush_timer.timeout.connect(self.flush_write_buffer)
         self.config = config
         self.readyRead.connect(self.read_transaction_data)
-        self._recv_buffer = bytes()
 
     def connection_in_progress(self):
         return self.state() == self.SocketState.ConnectingState
@@ -43,7 +60,7 @@ class Connector(QTcpSocket, ConnectionInterface, metaclass=QObjectAbcMeta):
     def get_connected_port(self) -> int:
         return self.peerPort()
 
-    def send_transaction_data(self, trans_id: str, transaction_data: bytes):
+    def send_transaction_data(self, trans_id: str, frame: bytes | bytearray):  # The message with the header
         if not self.state() == self.SocketState.ConnectedState:
             logger.warning("Host disconnected. Trying to establish the connection")
 
@@ -57,11 +74,11 @@ class Connector(QTcpSocket, ConnectionInterface, metaclass=QObjectAbcMeta):
             self.sending_error.emit(trans_id, "Cannot connect to host")
             return
 
-        transaction_header = pack("!H", len(transaction_data))
-        transaction_data = transaction_header + transaction_data
-        bytes_sent = self.write(transaction_data)
+        if self.config.host.write_coalescing:
+            self.buffer_transaction_data(trans_id, frame)
+            return
 
-        if bytes_sent == int():
+        if (bytes_sent := self.write(frame)) != len(frame):  # The header and the body are written by one call
             self.sending_error.emit(trans_id, "Cannot send transaction data")
             return
 
@@ -71,20 +88,42 @@ class Connector(QTcpSocket, ConnectionInterface, metaclass=QObjectAbcMeta):
 
         self.transaction_sent.emit(trans_id)
 
-    def read_transaction_data(self):
-        self._recv_buffer += self.readAll().data()
+    def buffer_transaction_data(self, trans_id: str, frame: bytes | bytearray):
+        self._write_buffer += frame
+        self._buffered_ids.append(trans_id)
+
+        if len(self._write_buffer) >= self.MAX_WRITE_BUFFER:
+            self.flush_write_buffer()
+            return
 
-        header_len = self.config.host.header_length if self.config.host.header_length_exists else int()
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
 
-        while len(self._recv_buffer) >= header_len:
-            msg_len = int.from_bytes(self._recv_buffer[:header_len], 'big')
+    def flush_write_buffer(self):  # All the gathered messages are written and flushed at once
+        self._flush_timer.stop()
 
-            if len(self._recv_buffer) < header_len + msg_len:
-                break
+        if not self._buffered_ids:
+            return
 
-            message = self._recv_buffer[:header_len + msg_len]
-            self._recv_buffer = self._recv_buffer[header_len + msg_len:]
-            self.incoming_transaction_data.emit(message)
+        data, self._write_buffer = self._write_buffer, bytearray()
+        trans_ids, self._buffered_ids = self._buffered_ids, list()
+
+        if self.state() != self.SocketState.ConnectedState or self.write(data) != len(data):
+            for trans_id in trans_ids:
+                self.sending_error.emit(trans_id, "Cannot send transaction data")
+
+            return
+
+        logger.debug(f"bytes sent {len(data)}, messages {len(trans_ids)}")
+
+        self.flush()
+
+        for trans_id in trans_ids:
+            self.transaction_sent.emit(trans_id)
+
+    def read_transaction_data(self):
+        if frames := self._frame_decoder.decode(self.readAll().data()):  # All the frames of the read at once
+            self.incoming_transaction_data.emit(frames)
 
     def connect_sv(self, host: str | None = None, port: int | None = None):
         if host is None:
@@ -103,6 +142,8 @@ class Connector(QTcpSocket, ConnectionInterface, metaclass=QObjectAbcMeta):
 
         logger.info(f"Connecting to {host}:{port}")
 
+        self._frame_decoder.reset()
+
         self.connectToHost(host, port)
 
         self.waitForConnected(msecs=10000)
@@ -117,6 +158,8 @@ class Connector(QTcpSocket, ConnectionInterface, metaclass=QObjectAbcMeta):
         if not self.state() == QTcpSocket.SocketState.ConnectedState:
             return
 
+        self.flush_write_buffer()
+
         self.disconnectFromHost()
 
         if not self.state() == QTcpSocket.SocketState.UnconnectedState:
@@ -1,4 +1,3 @@
-from copy import deepcopy
 from loguru import logger
 from contextlib import suppress
 from dataclasses import asdict
@@ -11,6 +10,8 @@ from common.lib.data_models.Dictionaries import Dictionaries
 from common.lib.data_models.Currencies import Currencies
 from common.lib.data_models.Countries import Countries
 from common.lib.data_models.MerchCategories import MerchantCategoryCodes
+from common.lib.core.WireCodec import WireCodec
+from common.lib.core.SpecIndex import SpecIndex
 from common.lib.enums.TermFilesPath import TermFilesPath
 
 
@@ -18,6 +19,7 @@ from common.lib.enums.TermFilesPath import TermFilesPath
 class EpaySpecification(EpaySpecificationData):
     _specification_model: EpaySpecModel = None
     _dictionary: Dictionaries = Dictionaries()
+    _index: SpecIndex = None
 
     def __init__(self, filename: FilePath | None = None):
         if filename is None:
@@ -29,6 +31,7 @@ class EpaySpecification(EpaySpecificationData):
             self._specification_model: EpaySpecModel = EpaySpecModel.model_validate_json(json_file.read())
 
         self._dictionary = self.create_dictionary()
+        self.build_index()
 
     @property
     def utrnno_path(self):
@@ -52,10 +55,31 @@ class EpaySpecification(EpaySpecificationData):
     def spec(self) -> EpaySpecModel:
         return self._specification_model
 
+    @property
+    def codec(self) -> WireCodec:
+        return self._index.codec
+
     @property
     def mti(self) -> list[Mti]:
         return self.spec.mti
 
+    @mti.setter
+    def mti(self, mti: list[Mti]):
+        self.spec.mti = mti
+        self.build_index()
+
+    @property
+    def mti_codes(self) -> frozenset[str]:
+        return self._index.mti_codes
+
+    @property
+    def match_fields(self) -> tuple[str, ...]:
+        return self._index.match_fields
+
+    @property
+    def reversal_fields(self) -> tuple[str, ...]:
+        return self._index.reversal_fields
+
     @property
     def name(self):
         return self.spec.name
@@ -67,6 +91,10 @@ class EpaySpecification(EpaySpecificationData):
     @fields.setter
     def fields(self, fields):
         self.spec.fields = fields
+        self.build_index()
+
+    def build_index(self):  # Call each time the specification fields change
+        self._index = SpecIndex.from_spec(self.spec)
 
     @staticmethod
     def create_dictionary() -> Dictionaries:
@@ -114,24 +142,13 @@ class EpaySpecification(EpaySpecificationData):
         self.reload_spec(self._specification_model, commit=False)
 
     def is_secret(self, path: FieldPath) -> bool:
-        spec = self.spec
-
-        for field in path:
-            if not (spec := spec.fields.get(field)):
-                return False
-
-        return spec.is_secret
+        return tuple(path) in self._index.secret_fields
 
     def get_generated_fields_dict(self):
         return {field.description: field.field_number for field in self.spec.fields.values() if field.generate}
 
     def get_reversal_mti(self, original_mti: str):
-        for mti in self.spec.mti:
-            if not (mti.reversal_mti and mti.is_reversible):
-                continue
-
-            if mti.request == original_mti:
-                return mti.reversal_mti
+        return self._index.reversal_mti.get(original_mti)
 
     def get_fields_to_generate(self):
         return [field for field in self.spec.fields if self.spec.fields.get(field).generate]
@@ -143,41 +160,21 @@ class EpaySpecification(EpaySpecificationData):
         return field_spec.generate
 
     def get_field_description(self, field_path: FieldPath, string: bool = False) -> str | FieldPath:
-        description: list[str] = list()
-        spec_fields: FieldSet = deepcopy(self.spec.fields)
-
-        for field in field_path:
-            if not (field_spec := spec_fields.get(field)):
-                break
+        path: tuple[str, ...] = tuple(field_path)
 
-            description.append(field_spec.description)
-
-            if not (spec_fields := field_spec.fields):
-                break
+        while path and path not in self._index.descriptions:  # The descriptions of the known part of the path
+            path = path[:-1]
 
         if not string:
-            return description
+            return list(self._index.descriptions.get(path, tuple()))
 
-        return ' / '.join(description)
+        return self._index.description_strings.get(path, str())
 
     def get_mti_codes(self) -> list[str]:
-        message_type_identifiers: set[str] = set()
-
-        message_type: Mti
-
-        for message_type in self.spec.mti:
-            [message_type_identifiers.add(mti) for mti in (message_type.request, message_type.response)]
-
-        message_type_identifiers: list[str] = list(message_type_identifiers)
-
-        return message_type_identifiers
+        return list(self._index.mti_codes)
 
     def get_resp_mti(self, request_mti):
-        for message_type_identifier in self.spec.mti:
-            if message_type_identifier.request != request_mti:
-                continue
-
-            return message_type_identifier.response
+        return self._index.response_mti.get(request_mti)
 
     def get_mti_list(self) -> list[str]:
         message_type_desc: list[str] = []
@@ -195,6 +192,8 @@ class EpaySpecification(EpaySpecificationData):
         with suppress(KeyError, AttributeError):
             self.spec.fields[self.FIELD_SET.FIELD_002_PRIMARY_ACCOUNT_NUMBER].is_secret = True
 
+        self.build_index()
+
         if not commit:
             return
 
@@ -202,60 +201,46 @@ class EpaySpecification(EpaySpecificationData):
             spec_file.write(self.spec.model_dump_json(indent=4))
 
     def get_reversal_fields(self):
-        return (field for field, value in self.fields.items() if value.reversal)
+        return iter(self._index.reversal_fields)
 
     def get_match_fields(self):
-        return [field for field, field_data in self.fields.items() if field_data.matching]
+        return list(self._index.match_fields)
 
     def is_request(self, transaction):
         if not transaction.message_type:
             return False
 
-        for mti in self.mti:
-            if transaction.message_type == mti.request:
-                return True
+        return self._index.mti_directions.get(transaction.message_type, False)
 
-            if transaction.message_type == mti.response:
-                return False
+    def set_field_spec(self, field_spec: IsoField) -> bool | None:
+        field_path: tuple[str, ...] = tuple(field_spec.field_path)
 
-        return False
-
-    def set_field_spec(self, field_spec: IsoField, parent: FieldSet | None = None) -> bool | None:
-        if parent is None:
-            parent = self.fields
+        if field_path not in self._index.fields:
+            return
 
-        for field, field_data in parent.items():
-            if field_data.field_path != self.utrnno_path:
+        for path, field_data in self._index.fields.items():
+            if field_data.is_utrnno and list(path) != self.utrnno_path:
                 field_data.is_utrnno = False
 
-            if field_data.field_path == field_spec.field_path:
-                parent[field_spec.field_number] = field_spec
-                return True
+        if len(field_path) > 1:
+            parent: FieldSet = self._index.fields[field_path[:-1]].fields
+        else:
+            parent: FieldSet = self.fields
 
-            if not field_data.fields:
-                continue
-
-            if self.set_field_spec(field_spec=field_spec, parent=field_data.fields):
-                return
-
-    def get_field_validations(self, field_path: FieldPath, parent=None):
-        if parent is None:
-            parent = self.spec.fields
+        parent[field_spec.field_number] = field_spec
+        self.build_index()
 
-        field: str
-        field_data: IsoField
+        return True
 
-        for field, field_data in parent.items():
-            if field_data.field_path == field_path:
-                return field_data.validators
+    def get_field_validations(self, field_path: FieldPath):
+        if not (field_spec := self._index.fields.get(tuple(field_path))):
+            return
 
-            if field_data.fields:
-                if validation := self.get_field_validations(field_path=field_path, parent=field_data.fields):
-                    return validation
+        return field_spec.validators
 
     def get_field_spec(self, path: FieldPath, spec=None) -> IsoField | None:
         if spec is None:
-            spec = self.spec
+            return self._index.fields.get(tuple(map(str, path)))
 
         spec_data = None
 
@@ -274,10 +259,7 @@ class EpaySpecification(EpaySpecificationData):
         return [EpaySpecificationData.FIELD_SET.FIELD_047_PROPRIETARY_FIELD, "072"]
 
     def is_field_complex(self, field_path: FieldPath):
-        if not (field_spec := self.get_field_spec(field_path)):
-            return False
-
-        return bool(field_spec.fields)
+        return tuple(field_path) in self._index.complex_fields
 
     def get_field_length_var(self, field) -> int:
         field_spec = self.get_field_spec([field])
@@ -0,0 +1,158 @@
+from loguru import logger
+from typing import Iterator
+from common.lib.enums.HeaderFormat import HeaderFormat
+from common.lib.enums.MessageLength import MessageLength
+
+
+"""
+
+ Streaming decoder of the incoming TCP frames
+
+ The received data is appended to one bytearray, the frames are read by a cursor, so the buffer is not resliced for
+ each message. Each frame is handed out as a memoryview of the message body, the header is cut. The header is the
+ length of the message body, as a big-endian binary number of 2 or 4 bytes or as ASCII decimal digits
+
+ When the frame header is not valid or the message doesn't start with MTI digits the decoder skips the data byte by
+ byte until the next valid frame is found, so the garbage in the stream doesn't break the following messages
+
+ With no header length set the whole received data is handed out as one message
+
+ The memoryview frames of the frames call are meant to be used before the next portion of the data. The decode call
+ copies the frames out of the buffer, the connectors use it because the frames are kept by the transaction records.
+ So the buffer is not exported by the time of the next read and the consumed data is cut in place. When the buffer
+ cannot be resized because of the frames in use the decoder moves the incomplete data to a new buffer, the handed out
+ frames stay intact
+
+ Usage example
+
+ decoder = FrameDecoder(header_length=2)
+ decoder.feed(data)
+
+ for frame in decoder.frames():
+     transaction = Parser.parse_dump(frame)
+
+ frames = decoder.decode(data)  # The copies, which can be kept
+
+"""
+
+
+class FrameDecoder:
+    MIN_FRAME_LENGTH: int = MessageLength.MESSAGE_TYPE_LENGTH + MessageLength.BITMAP_LENGTH
+    _header_length: int = 2
+    _header_format: HeaderFormat = HeaderFormat.BINARY
+    _max_frame_length: int = 65535
+    _buffer: bytearray
+    _position: int = int()
+    _skipped: int = int()
+
+    @property
+    def header_length(self) -> int:
+        return self._header_length
+
+    @header_length.setter
+    def header_length(self, header_length: int):
+        self._header_length = header_length
+
+    @property
+    def header_format(self) -> HeaderFormat:
+        return self._header_format
+
+    @header_format.setter
+    def header_format(self, header_format: HeaderFormat):
+        self._header_format = header_format
+
+    @property
+    def max_frame_length(self) -> int:
+        return self._max_frame_length
+
+    @max_frame_length.setter
+    def max_frame_length(self, max_frame_length: int):
+        self._max_frame_length = max_frame_length
+
+    @property
+    def pending(self) -> int:  # Bytes received, but not handed out yet
+        return len(self._buffer) - self._position
+
+    def __init__(self, header_length: int = 2, header_format: HeaderFormat = HeaderFormat.BINARY,
+                 max_frame_length: int = 65535):
+
+        self.header_length = header_length
+        self.header_format = header_format
+        self.max_frame_length = max_frame_length
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        try:
+            del self._buffer[:self._position]
+            self._buffer += data
+
+        except BufferError:  # The buffer is exported to the frames in use
+            self._buffer = self._buffer[self._position:] + data
+
+        self._position = int()
+
+    def frames(self) -> Iterator[memoryview]:
+        buffer: memoryview = memoryview(self._buffer)
+
+        if not self.header_length:
+            if self._position < len(buffer):
+                yield buffer[self._position:]
+
+            self._position = len(buffer)
+            return
+
+        while (frame_length := self.get_frame_length(buffer, self._position)) is not None:
+            if frame_length < int():
+                self._position += 1
+                self._skipped += 1
+                continue
+
+            if self._skipped:
+                logger.warning(f"{self._skipped} bytes of garbage were skipped in the incoming data")
+                self._skipped = int()
+
+            frame_start: int = self._position + self.header_length
+            self._position = frame_start + frame_length
+
+            yield buffer[frame_start:self._position]
+
+    def decode(self, data: bytes) -> list[bytes]:  # The frames are copied, the buffer is reused by the next read
+        self.feed(data)
+        return [bytes(frame) for frame in self.frames()]
+
+    def get_frame_length(self, buffer: memoryview, position: int) -> int | None:
+
+        # Returns the length of the message body at the position, -1 when there is no valid frame at the position or
+        # None when more data is needed to get the complete frame
+
+        frame_start: int = position + self.header_length
+
+        if len(buffer) < frame_start:
+            return
+
+        header: bytes = buffer[position:frame_start].tobytes()
+
+        if self.header_format == HeaderFormat.ASCII:
+            if not header.isdigit():
+                return -1
+
+            frame_length: int = int(header)
+
+        else:
+            frame_length: int = int.from_bytes(header, "big")
+
+        if not self.MIN_FRAME_LENGTH <= frame_length <= self.max_frame_length:
+            return -1
+
+        if not buffer[frame_start:frame_start + MessageLength.MESSAGE_TYPE_LENGTH].tobytes().isdigit():
+            return None if len(buffer) < frame_start + MessageLength.MESSAGE_TYPE_LENGTH else -1
+
+        if len(buffer) < frame_start + frame_length:
+            return
+
+        return frame_length
+
+    def reset(self) -> None:
+        self._buffer = bytearray()
+        self._position = int()
+        self._skipped = int()
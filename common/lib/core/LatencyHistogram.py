@@ -0,0 +1,196 @@
+from zlib import compress, decompress
+from struct import pack, unpack_from, calcsize
+import numpy as np
+from common.lib.data_models.LatencyReport import LatencyStats
+
+
+"""
+
+ Log-linear latency histogram, HDR histogram style
+
+ The values are recorded in microseconds. Each power of two range is split into 64 linear sub-buckets, so the value
+ is kept with the relative error below 1/64 (1.6%) in the whole range from 1 microsecond to 71 minutes. The counts are
+ a NumPy array of 1728 buckets, a percentile is a cumulative sum and a binary search
+
+ The recorded values are gathered in a list and added to the counts by one vectorized call, when the list is full or
+ before the histogram is read, so recording a value costs a list append
+
+ Two histograms are merged by adding the counts, so the histograms recorded by different threads or processes give
+ the same percentiles as if the values were recorded by one histogram. Use to_bytes and from_bytes to pass the
+ histogram between the processes
+
+ The percentile is reported by the upper bound of its bucket, never exceeding the max recorded value
+
+ Usage example
+
+ histogram = LatencyHistogram()
+ histogram.record(response.resp_time_seconds)
+ histogram.merge(other_histogram)
+ p99_ms = histogram.get_percentile(99) / 1000
+
+"""
+
+
+class LatencyHistogram:
+    SUB_BUCKET_BITS: int = 7
+    SUB_BUCKETS_HALF: int = 2 ** (SUB_BUCKET_BITS - 1)  # Linear sub-buckets of a power of two range
+    VALUE_BITS: int = 32
+    MAX_VALUE_US: int = 2 ** VALUE_BITS - 1  # The greater values are recorded as the max value
+    BUCKETS_NUMBER: int = (VALUE_BITS - SUB_BUCKET_BITS + 2) * SUB_BUCKETS_HALF
+    MICROSECONDS_IN_SECOND: int = 1_000_000
+    HEADER_FORMAT: str = "<QQQQ"  # Count, sum, min, max
+    PERCENTILES: dict[str, float] = {"p50_ms": 50, "p90_ms": 90, "p99_ms": 99, "p99_9_ms": 99.9}
+    FLUSH_SIZE: int = 1024
+    _upper_bounds: np.ndarray | None = None  # Shared by all the histograms
+    _counts: np.ndarray
+    _pending: list[float]  # Recorded seconds, not added to the counts yet
+    _count: int
+    _sum_us: int
+    _min_us: int
+    _max_us: int
+
+    @property
+    def count(self) -> int:
+        return self._count + len(self._pending)
+
+    @property
+    def max_us(self) -> int:
+        self.flush()
+        return self._max_us
+
+    @property
+    def min_us(self) -> int:
+        self.flush()
+        return self._min_us if self._count else int()
+
+    @property
+    def mean_us(self) -> float:
+        self.flush()
+        return self._sum_us / self._count if self._count else float()
+
+    def __init__(self):
+        self._counts = np.zeros(self.BUCKETS_NUMBER, dtype=np.int64)
+        self._pending = list()
+        self.reset()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def reset(self) -> None:
+        self._pending.clear()
+        self._counts.fill(int())
+        self._count = self._sum_us = self._max_us = int()
+        self._min_us = self.MAX_VALUE_US
+
+    @classmethod
+    def get_upper_bounds(cls) -> np.ndarray:  # Highest value of each bucket
+        if cls._upper_bounds is not None:
+            return cls._upper_bounds
+
+        indexes: np.ndarray = np.arange(cls.BUCKETS_NUMBER, dtype=np.int64)
+        shifts: np.ndarray = np.maximum(indexes // cls.SUB_BUCKETS_HALF - 1, int())
+        sub_buckets: np.ndarray = indexes - shifts * cls.SUB_BUCKETS_HALF
+        cls._upper_bounds = ((sub_buckets + 1) << shifts) - 1
+
+        return cls._upper_bounds
+
+    def record(self, seconds: float) -> None:
+        self._pending.append(seconds)
+
+        if len(self._pending) >= self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, list()
+        self.record_many(pending)
+
+    def record_many(self, seconds: np.ndarray | list[float]) -> None:
+        if not len(seconds):
+            return
+
+        values: np.ndarray = np.rint(np.asarray(seconds, dtype=np.float64) * self.MICROSECONDS_IN_SECOND)
+        values: np.ndarray = np.clip(values, 0, self.MAX_VALUE_US).astype(np.int64)
+        _, bit_lengths = np.frexp(values)  # The exponent is the bit length of the integer value
+        shifts: np.ndarray = np.maximum(bit_lengths - self.SUB_BUCKET_BITS, int())
+
+        self._counts += np.bincount(
+            shifts * self.SUB_BUCKETS_HALF + (values >> shifts), minlength=self.BUCKETS_NUMBER
+        )
+
+        self._count += len(values)
+        self._sum_us += int(values.sum())
+        self._max_us = max(self._max_us, int(values.max()))
+        self._min_us = min(self._min_us, int(values.min()))
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if not other.count:
+            return self
+
+        self.flush()
+        other.flush()
+
+        self._counts += other._counts
+        self._count += other._count
+        self._sum_us += other._sum_us
+        self._max_us = max(self._max_us, other._max_us)
+        self._min_us = min(self._min_us, other._min_us)
+
+        return self
+
+    def copy(self) -> "LatencyHistogram":
+        return LatencyHistogram().merge(self)
+
+    def get_percentiles(self, percentiles: list[float]) -> list[int]:  # Microseconds
+        self.flush()
+
+        if not self._count:
+            return [int() for _ in percentiles]
+
+        ranks: np.ndarray = np.ceil(np.asarray(percentiles, dtype=np.float64) / 100 * self._count)
+        ranks: np.ndarray = np.clip(ranks, 1, self._count)
+        indexes: np.ndarray = np.searchsorted(np.cumsum(self._counts), ranks)
+        values: np.ndarray = np.minimum(self.get_upper_bounds()[indexes], self._max_us)
+
+        return [int(value) for value in values]
+
+    def get_percentile(self, percentile: float) -> int:
+        return self.get_percentiles([percentile])[int()]
+
+    def get_stats(self) -> LatencyStats:
+        self.flush()
+        percentiles: list[int] = self.get_percentiles(list(self.PERCENTILES.values()))
+        stats: dict[str, float] = {name: value / 1000 for name, value in zip(self.PERCENTILES, percentiles)}
+
+        return LatencyStats(
+            count=self._count,
+            min_ms=self.min_us / 1000,
+            mean_ms=round(self.mean_us / 1000, 3),
+            max_ms=self._max_us / 1000,
+            **stats
+        )
+
+    def to_bytes(self) -> bytes:
+        self.flush()
+        header: bytes = pack(self.HEADER_FORMAT, self._count, self._sum_us, self.min_us, self._max_us)
+
+        return header + compress(self._counts.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LatencyHistogram":
+        histogram: LatencyHistogram = cls()
+        count, sum_us, min_us, max_us = unpack_from(cls.HEADER_FORMAT, data)
+        counts: np.ndarray = np.frombuffer(decompress(data[calcsize(cls.HEADER_FORMAT):]), dtype=np.int64)
+
+        if len(counts) != cls.BUCKETS_NUMBER:
+            raise ValueError("Incompatible latency histogram data")
+
+        histogram._counts += counts
+
+        if count:
+            histogram._count, histogram._sum_us, histogram._min_us, histogram._max_us = count, sum_us, min_us, max_us
+
+        return histogram
+
@@ -0,0 +1,157 @@
+from time import monotonic
+from threading import Lock
+from datetime import datetime
+from common.lib.core.LatencyHistogram import LatencyHistogram
+from common.lib.data_models.LatencyReport import LatencyReport
+
+
+"""
+
+ Latency recorder of the matched transactions
+
+ Keeps one latency histogram for all the transactions, one per request MTI and one per response code. The transaction
+ queue records the response time of each matched response, the CLI, the API and the GUI read the report with the
+ percentiles, see LatencyReport
+
+ The recorder counts the latencies by intervals. The interval is reset by the reset call or automatically when the
+ interval_seconds passed, zero interval_seconds means the interval is reset manually only. The report of the finished
+ interval is kept until the next reset, see get_previous_report
+
+ The calls are thread-safe. The recorders of different threads or processes are merged by merge, the recorder is
+ pickled by the compressed histograms
+
+ Usage example
+
+ recorder = LatencyRecorder(interval_seconds=60)
+ recorder.record("0200", "00", response.resp_time_seconds)
+ report = recorder.get_report()
+
+"""
+
+
+class LatencyRecorder:
+    _total: LatencyHistogram
+    _by_message_type: dict[str, LatencyHistogram]
+    _by_response_code: dict[str, LatencyHistogram]
+    _previous_report: LatencyReport | None = None
+    _interval_seconds: float
+    _interval_started: datetime
+    _interval_started_monotonic: float
+    _lock: Lock
+
+    @property
+    def interval_seconds(self) -> float:
+        return self._interval_seconds
+
+    @interval_seconds.setter
+    def interval_seconds(self, interval_seconds: float):
+        self._interval_seconds = max(interval_seconds, int())
+
+    @property
+    def count(self) -> int:
+        return self._total.count
+
+    def __init__(self, interval_seconds: float = 0):
+        self._lock = Lock()
+        self._total = LatencyHistogram()
+        self._by_message_type = dict()
+        self._by_response_code = dict()
+        self.interval_seconds = interval_seconds
+        self._start_interval()
+
+    def __getstate__(self) -> dict:
+        with self._lock:
+            return {
+                "interval_seconds": self._interval_seconds,
+                "interval_started": self._interval_started,
+                "total": self._total.to_bytes(),
+                "by_message_type": {key: value.to_bytes() for key, value in self._by_message_type.items()},
+                "by_response_code": {key: value.to_bytes() for key, value in self._by_response_code.items()},
+            }
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["interval_seconds"])
+        self._interval_started = state["interval_started"]
+        self._total = LatencyHistogram.from_bytes(state["total"])
+
+        for histograms, key in (self._by_message_type, "by_message_type"), (self._by_response_code, "by_response_code"):
+            histograms.update({name: LatencyHistogram.from_bytes(data) for name, data in state[key].items()})
+
+    def record(self, message_type: str | None, response_code: str | None, seconds: float | None) -> None:
+        if seconds is None:
+            return
+
+        with self._lock:
+            self._rotate_expired()
+            self._total.record(seconds)
+
+            for histograms, key in (self._by_message_type, message_type), (self._by_response_code, response_code):
+                if not (histogram := histograms.get(key := str(key))):
+                    histogram = histograms[key] = LatencyHistogram()
+
+                histogram.record(seconds)
+
+    def merge(self, other: "LatencyRecorder") -> "LatencyRecorder":
+        if other is self:
+            return self
+
+        with other._lock:
+            total: LatencyHistogram = other._total.copy()
+            by_message_type = {key: histogram.copy() for key, histogram in other._by_message_type.items()}
+            by_response_code = {key: histogram.copy() for key, histogram in other._by_response_code.items()}
+
+        with self._lock:
+            self._total.merge(total)
+
+            merging = (self._by_message_type, by_message_type), (self._by_response_code, by_response_code)
+
+            for histograms, others in merging:
+                for key, histogram in others.items():
+                    histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+
+        return self
+
+    def reset(self) -> LatencyReport:  # Returns the report of the finished interval
+        with self._lock:
+            return self._rotate()
+
+    def get_report(self) -> LatencyReport:
+        with self._lock:
+            self._rotate_expired()
+            return self._get_report()
+
+    def get_previous_report(self) -> LatencyReport | None:
+        with self._lock:
+            self._rotate_expired()
+            return self._previous_report
+
+    def _get_report(self) -> LatencyReport:
+        return LatencyReport(
+            interval_started=self._interval_started,
+            interval_seconds=round(monotonic() - self._interval_started_monotonic, 3),
+            total=self._total.get_stats(),
+            by_message_type={key: value.get_stats() for key, value in sorted(self._by_message_type.items())},
+            by_response_code={key: value.get_stats() for key, value in sorted(self._by_response_code.items())},
+        )
+
+    def _rotate_expired(self) -> None:
+        if not self._interval_seconds:
+            return
+
+        if monotonic() - self._interval_started_monotonic < self._interval_seconds:
+            return
+
+        self._rotate()
+
+    def _rotate(self) -> LatencyReport:
+        self._previous_report = self._get_report()
+        self._total.reset()
+        self._by_message_type.clear()
+        self._by_response_code.clear()
+        self._start_interval()
+
+        return self._previous_report
+
+    def _start_interval(self) -> None:
+        self._interval_started = datetime.now()
+        self._interval_started_monotonic = monotonic()
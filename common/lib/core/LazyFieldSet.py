@@ -0,0 +1,92 @@
+from copy import deepcopy
+from collections.abc import MutableMapping
+from common.lib.core.WireCodec import WireCodec
+from common.lib.data_models.EpaySpecificationModel import RawFieldSet
+
+
+"""
+
+ Lazy set of transaction data fields
+
+ Holds a memoryview of the incoming message body and the (offset, length) of each field, found by a single scan of the
+ message. The field is decoded only when it is accessed, then the value is cached. Assigned values are kept as is, the
+ deleted fields are dropped along with their offsets
+
+ Behaves as a regular dictionary of fields for reading and writing. Deep copy returns a regular dictionary with all the
+ fields decoded, so the copies of the transaction never refer to the incoming message buffer
+
+ Use Parser.parse_dump(data, lazy=True) to get the transaction with the lazy data fields
+
+"""
+
+
+class LazyFieldSet(MutableMapping):
+    _codec: WireCodec
+    _data: memoryview
+    _offsets: dict[str, tuple[int, int]]
+    _values: RawFieldSet
+    _order: list[str]
+    _split: bool
+
+    @property
+    def nbytes(self) -> int:  # Size of the message body the fields refer to
+        return self._data.nbytes
+
+    def __init__(self, codec: WireCodec, data: memoryview, offsets: dict[str, tuple[int, int]], split: bool = False):
+        self._codec = codec
+        self._data = data
+        self._offsets = offsets
+        self._values = dict()
+        self._order = list(offsets)
+        self._split = split
+
+    def __getitem__(self, field: str) -> str | RawFieldSet:
+        try:
+            return self._values[field]
+        except KeyError:
+            pass
+
+        offset, length = self._offsets[field]
+        field_data: str | RawFieldSet = self._data[offset:offset + length].tobytes().decode()
+
+        if self._split and self._codec.is_field_complex(field):
+            field_data = self._codec.split_complex_field(field, field_data)
+
+        self._values[field] = field_data
+
+        return field_data
+
+    def __setitem__(self, field: str, field_data: str | RawFieldSet) -> None:
+        if field not in self._values and field not in self._offsets:
+            self._order.append(field)
+
+        self._values[field] = field_data
+
+    def __delitem__(self, field: str) -> None:
+        if field not in self._values and field not in self._offsets:
+            raise KeyError(field)
+
+        self._values.pop(field, None)
+        self._offsets.pop(field, None)
+        self._order.remove(field)
+
+    def __contains__(self, field) -> bool:
+        return field in self._offsets or field in self._values
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.copy()})"
+
+    def __deepcopy__(self, memo: dict) -> RawFieldSet:
+        return deepcopy(self.copy(), memo)
+
+    def copy(self) -> RawFieldSet:
+        return {field: self[field] for field in self._order}
+
+    def is_decoded(self, field: str) -> bool:
+        return field in self._values
@@ -4,6 +4,7 @@ from common.lib.data_models.Transaction import Transaction, TypeFields
 from common.lib.core.EpaySpecification import EpaySpecification
 from common.lib.core.Parser import Parser
 from common.lib.data_models.Config import Config
+from common.lib.data_models.LatencyReport import LatencyReport, LatencyStats
 from common.lib.enums.TextConstants import TextConstants
 from common.lib.enums.ReleaseDefinition import ReleaseDefinition
 from PyQt6.QtCore import QObject
@@ -57,6 +58,26 @@ class LogPrinter(QObject):
 
         self.print_multi_row(config_data, level=level)
 
+    def print_latency_report(self, report: LatencyReport, level=default_level):
+        if not report.total.count:
+            return
+
+        def get_row(name: str, stats: LatencyStats) -> str:
+            return (f"{name:<16}{stats.count:>10}{stats.p50_ms:>10.3f}{stats.p90_ms:>10.3f}{stats.p99_ms:>10.3f}"
+                    f"{stats.p99_9_ms:>10.3f}{stats.max_ms:>10.3f}")
+
+        rows: list[str] = [
+            f"## Latency ms, {report.interval_seconds:.0f} seconds since {report.interval_started:%d/%m/%Y %T} ##",
+            "",
+            f"{'':<16}{'count':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}",
+            get_row("Total", report.total),
+        ]
+
+        rows.extend(get_row(f"MTI {mti}", stats) for mti, stats in report.by_message_type.items())
+        rows.extend(get_row(f"Resp code {code}", stats) for code, stats in report.by_response_code.items())
+
+        self.print_multi_row("\n".join(rows), level=level)
+
     def print_dump(self, transaction: Transaction, level=logger.debug):
         if not (dump := Parser.create_sv_dump(transaction)):
             return
@@ -81,7 +102,9 @@ class LogPrinter(QObject):
         if transaction.is_keep_alive:
             return
 
-        transaction: Transaction = transaction.model_copy(deep=True)
+        # The fields are changed in place below, copying the top level of the fields is enough to keep the original
+
+        transaction: Transaction = transaction.model_copy(update={"data_fields": dict(transaction.data_fields)})
         transaction: Transaction = Parser.parse_complex_fields(transaction, split=False)
 
         if self.config.fields.hide_secrets:
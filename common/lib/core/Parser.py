@@ -1,26 +1,30 @@
 from loguru import logger
 from json import loads
+from struct import Struct
 from io import StringIO
 from pathlib import Path
 from pydantic import FilePath
-from binascii import hexlify, unhexlify, b2a_hex
+from binascii import hexlify, unhexlify
 from configparser import ConfigParser, NoSectionError, NoOptionError
 from common.lib.toolkit.toolkit import mask_secret, mask_pan
 from common.lib.core.EpaySpecification import EpaySpecification
 from common.lib.core.Bitmap import Bitmap
+from common.lib.core.WireCodec import WireCodec
+from common.lib.core.LazyFieldSet import LazyFieldSet
 from common.lib.data_models.Config import Config
-from common.lib.data_models.EpaySpecificationModel import IsoField, FieldSet, RawFieldSet
+from common.lib.data_models.EpaySpecificationModel import FieldSet, RawFieldSet
 from common.lib.data_models.Transaction import TypeFields, Transaction
+from common.lib.data_models.TransactionRecord import TransactionRecord
 from common.lib.core.JsonConverter import JsonConverter
 from common.lib.enums.DataFormats import DataFormats
 from common.lib.enums.DumpDefinition import DumpLength, DumpFillers
 from common.lib.enums.IniMessageDefinition import IniMessageDefinition
 from common.lib.enums.MessageLength import MessageLength
-from common.lib.enums.TermFilesPath import TermFilesPath
 from common.lib.data_models.Types import FieldPath
 
 
 class Parser:
+    FRAME_HEADER: Struct = Struct("!H")  # Length of the message body, the frame header of the outgoing messages
     _spec: EpaySpecification = EpaySpecification()
     _config: Config
 
@@ -41,10 +45,10 @@ class Parser:
 
     @staticmethod
     def parse_complex_fields(transaction: Transaction, split: bool = False) -> Transaction:
-        spec: EpaySpecification = EpaySpecification()
+        codec: WireCodec = EpaySpecification().codec
 
         for field, field_data in transaction.data_fields.items():
-            if not spec.is_field_complex([field]):
+            if not codec.is_field_complex(field):
                 continue
 
             if not split:
@@ -93,34 +97,50 @@ class Parser:
 
     @staticmethod
     def create_dump(transaction: Transaction, body: bool = False) -> bytes | str:
-        spec: EpaySpecification = EpaySpecification()
-        msg_type: bytes = transaction.message_type.encode()
-        bitmap: Bitmap = Bitmap(transaction.data_fields)
-        bitmap: bytes = bitmap.get_bitmap(bytes)
+        buffer: bytearray = bytearray()
+
+        Parser.create_dump_into(transaction, buffer, body=body)
+
+        if body:
+            return buffer.decode()
+
+        return bytes(buffer)
+
+    @staticmethod
+    def create_dump_into(transaction: Transaction, buffer: bytearray, body: bool = False) -> int:
+        # Appends the message to the end of the buffer, returns the number of bytes written
 
-        msg_body: bytes = bytes()
+        codec: WireCodec = EpaySpecification().codec
+        start: int = len(buffer)
+
+        if not body:
+            buffer += transaction.message_type.encode()
+            buffer += Bitmap.from_fields(transaction.data_fields).to_bytes()
 
         for field in sorted(transaction.data_fields.keys(), key=int):
             if not (text := transaction.data_fields.get(field)):
                 logger.warning(f"No value for field {field}. IsoField was ignored")
                 continue
 
-            if isinstance(text, dict):
-                text = Parser.join_complex_field(field, text)
+            codec.encode_field_into(field, text, buffer)
+
+        return len(buffer) - start
 
-            field_length_var = spec.get_field_length_var(field)
+    @staticmethod
+    def create_frame(transaction: Transaction) -> bytearray:
+        # The message with the header. The body is written after the reserved header bytes, then the header is filled,
+        # so the connector writes the frame by one call with no concatenation
 
-            if field_length_var:
-                text_length = str(len(text)).zfill(field_length_var)
-                text = f"{text_length}{text}"
+        frame: bytearray = bytearray(Parser.FRAME_HEADER.size)
+        Parser.create_dump_into(transaction, frame)
 
-            if text is not None:
-                msg_body: bytes = msg_body + text.encode()
+        return Parser.set_frame_header(frame)
 
-        if body:
-            return msg_body.decode()
+    @staticmethod
+    def set_frame_header(frame: bytearray) -> bytearray:  # Fills the reserved header bytes by the body length
+        Parser.FRAME_HEADER.pack_into(frame, int(), len(frame) - Parser.FRAME_HEADER.size)
 
-        return msg_type + bitmap + msg_body
+        return frame
 
     @staticmethod
     def create_sv_dump(transaction: Transaction) -> str | None:
@@ -157,7 +177,7 @@ class Parser:
 
     @staticmethod
     def join_complex_field(field, field_data, path=None, hide_secrets: bool = False) -> str:
-        spec: EpaySpecification = EpaySpecification()
+        codec: WireCodec = EpaySpecification().codec
 
         if not isinstance(field_data, dict):
             return field_data
@@ -166,36 +186,7 @@ class Parser:
         if path is None:
             path = [field]
 
-        result: str = str()
-        subfield_data: str | FieldSet
-        subfield: str
-
-        for subfield, subfield_data in field_data.items():
-            path.append(subfield)
-
-            subfield_spec = spec.get_field_spec(path)
-
-            if not subfield_spec:
-                raise ValueError(f"Lost specification for field {'.'.join(path)}")
-
-            if subfield_spec.fields:
-                result += Parser.join_complex_field(subfield, subfield_data, path, hide_secrets=hide_secrets)
-
-            else:
-                if subfield_spec.is_secret and hide_secrets:
-                    subfield_data = mask_secret(subfield_data)
-
-                length = str(len(subfield_data))
-                length = length.zfill(subfield_spec.var_length)
-                result = f"{result}{subfield}{length}{subfield_data}"
-
-            path.pop()
-
-        if len(path) > 1:
-            field_spec: IsoField = spec.get_field_spec(path)
-            result = f"{field}{len(result):0{field_spec.var_length}}{result}"
-
-        return result
+        return codec.join_complex_field(path, field_data, mask=mask_secret if hide_secrets else None)
 
     def join_complex_item(self, parent):
         if not parent.field_number:
@@ -257,92 +248,19 @@ class Parser:
         return result
 
     @staticmethod
-    def parse_raw_data(raw_data: bytes, flat=False) -> list[Transaction]:
-        with open(TermFilesPath.CONFIG) as json_file:
-            config: Config = Config.model_validate_json(json_file.read())
-
-        header_length = config.host.header_length if config.host.header_length_exists else int()
-
-        messages = list()
-
-        while raw_data:  # Loop for multi messages processing
-            try:
-                if len(raw_data) < header_length:
-                    raise IndexError
-
-                message_length: bytes = raw_data[:header_length]
-                message_length: int = int(b2a_hex(message_length).decode(), 16)
-                raw_data = raw_data[header_length:]
-
-                if len(raw_data) < message_length:
-                    raise IndexError
-
-                if len(message_data := raw_data[:message_length]) < message_length:
-                    raise IndexError
+    def parse_dump(data, flat: bool = False, lazy: bool = False) -> Transaction:
 
-                raw_data = raw_data[message_length:]
+        # In the lazy mode the transaction is built from the record with no model validation, see parse_record. The
+        # message body is expected in a single-byte encoding, as the fields offsets are counted in bytes
 
-            except (ValueError, IndexError):
-                if not config.host.header_length_exists:
-                    logger.warning("No message header length set, ordinary header length is 2 or 4. Check the settings")
+        if lazy:
+            return Parser.parse_record(data, flat=flat, lazy=not flat).to_transaction()
 
-                if config.host.header_length_exists and config.host.header_length not in (2, 4):
-                    logger.warning(f"Unusual message header length {config.host.header_length}, "
-                                   f"ordinary it is 2 or 4. Check the settings")
-
-                raise ValueError("Invalid incoming message length")
-
-            try:
-                transaction: Transaction = Parser.parse_dump(message_data, flat=flat)
-
-            except ValueError:
-                message = "Cannot parse incoming message due to format error."
-                message = f"{message} Change log level to DEBUG to see raw message"
-                raise ValueError(message)
-
-            messages.append(transaction)
-
-        return messages
-
-    @staticmethod
-    def parse_dump(data, flat: bool = False) -> Transaction:
         spec: EpaySpecification = EpaySpecification()
-        fields: RawFieldSet = {}
-        position = int()
-        message_type_indicator = data[position:MessageLength.MESSAGE_TYPE_LENGTH].decode()
-        position += MessageLength.MESSAGE_TYPE_LENGTH
-        bitmap: str = data[position: position + MessageLength.BITMAP_LENGTH]
-        position += len(bitmap)
-        second_bitmap_exists = Bitmap(bitmap, bytes).second_bitmap_exists()
-
-        if second_bitmap_exists:
-            length = len(bitmap)
-            bitmap += data[position: position + length]
-            position += length
-
-        data = data[position:].decode()
-        position = 0
-        bitmap: Bitmap = Bitmap(bitmap, bytes)
-        bitmap: dict[str, bool] = bitmap.get_bitmap(dict)
-
-        for field, exists in bitmap.items():
-            if not exists:
-                continue
-
-            if field == spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY:
-                continue
-
-            length_var = spec.get_field_length_var(field)
+        message_type_indicator, data_fields, position = Parser.read_message_header(data)
 
-            if length_var > 0:
-                length = int(data[position:position + length_var])
-                position += length_var
-                fields[field] = data[position:position + length]
-            else:
-                length = spec.get_field_length(field)
-                fields[field] = data[position:position + length]
-
-            position += length
+        data = bytes(data[position:]).decode()
+        fields: RawFieldSet = spec.codec.decode_fields(data, data_fields)
 
         transaction: Transaction = Transaction(
             message_type=message_type_indicator,
@@ -353,7 +271,7 @@ class Parser:
             return transaction
 
         for field, field_data in fields.items():
-            if not spec.is_field_complex([field]):
+            if not spec.codec.is_field_complex(field):
                 continue
             try:
                 fields[field]: RawFieldSet = Parser.split_complex_field(field, field_data)
@@ -365,45 +283,57 @@ class Parser:
         return transaction
 
     @staticmethod
-    def split_complex_field(field: str, field_data: str, spec: dict | None = None) -> RawFieldSet | None:
-        complex_field_data: RawFieldSet = dict()
+    def parse_record(data, flat: bool = True, lazy: bool = True) -> TransactionRecord:  # The record of the hot path
+        # No model validation. Not lazy record gets the fields decoded at once, as the flat fields are cheaper to decode
+        # than to scan and read through the LazyFieldSet
+
+        spec: EpaySpecification = EpaySpecification()
+        message_type_indicator, data_fields, position = Parser.read_message_header(data)
+        data: memoryview = memoryview(data)[position:]
 
-        if spec is None:  # First entry
-            epay_spec: EpaySpecification = EpaySpecification()
-            spec: IsoField = epay_spec.get_field_spec([field])
+        message_type_indicator: str = Transaction.valid_mti(message_type_indicator)
 
-            if not epay_spec.is_field_complex(spec.field_path):
-                return field_data
+        if lazy:
+            offsets: dict[str, tuple[int, int]] = spec.codec.scan_fields(data, data_fields)
+            fields: LazyFieldSet = LazyFieldSet(spec.codec, data, offsets, split=not flat)
 
-        while field_data:
-            tag_number = field_data[:spec.tag_length]
-            field_data = field_data[spec.tag_length:]
-            field_spec = spec.fields.get(tag_number)
+            return TransactionRecord(message_type=message_type_indicator, data_fields=fields)
 
-            try:
-                var_length = spec.tag_length
+        fields: RawFieldSet = spec.codec.decode_fields(data.tobytes().decode(), data_fields)
 
-                if not var_length:
-                    raise ValueError("Lost variable length")
+        if not flat:
+            for field in fields:
+                if spec.codec.is_field_complex(field):
+                    fields[field] = spec.codec.split_complex_field(field, fields[field])
 
-            except (AttributeError, ValueError):
-                logger.error(f"Lost specification for field {field}")
-                logger.error("The field and corresponding sub fields were absent")
-                return {}
+        return TransactionRecord(message_type=message_type_indicator, data_fields=fields)
 
-            var_length = spec.tag_length
-            val_length = field_data[:var_length]
-            val_length = int(val_length)
-            field_data = field_data[var_length:]
-            value_data = field_data[:val_length]
-            field_data = field_data[val_length:]
+    @staticmethod
+    def read_message_header(data) -> tuple[str, list[str], int]:  # MTI, fields of the bitmap, position of the fields
+        spec: EpaySpecification = EpaySpecification()
+        position = int()
+        message_type_indicator = bytes(data[position:MessageLength.MESSAGE_TYPE_LENGTH]).decode()
+        position += MessageLength.MESSAGE_TYPE_LENGTH
+        bitmap_length: int = MessageLength.BITMAP_LENGTH
+        bitmap: Bitmap = Bitmap.from_bytes(bytes(data[position: position + bitmap_length]))
 
-            if field_spec and field_spec.fields:
-                value_data = Parser.split_complex_field(tag_number, value_data, field_spec)
+        if bitmap.second_bitmap_exists():
+            bitmap_length *= 2
+            bitmap: Bitmap = Bitmap.from_bytes(bytes(data[position: position + bitmap_length]))
 
-            complex_field_data[tag_number] = value_data
+        position += bitmap_length
 
-        return complex_field_data
+        data_fields: list[str] = list(bitmap)
+
+        if bitmap.second_bitmap_exists():
+            data_fields.remove(spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY)
+
+        return message_type_indicator, data_fields, position
+
+    @staticmethod
+    def split_complex_field(field: str, field_data: str) -> RawFieldSet | None:
+        codec: WireCodec = EpaySpecification().codec
+        return codec.split_complex_field(field, field_data)
 
     def transaction_to_ini_string(self, transaction: Transaction):
         generate_fields: list[str] = sorted(transaction.generate_fields, key=int)
@@ -489,7 +419,12 @@ class Parser:
 
     @staticmethod
     def get_field_data(fields: FieldSet, field_path: FieldPath):
-        for field_number, field_data in fields.items():
+        if not field_path or field_path[int()] not in fields:
+            return
+
+        field_number: str = field_path[int()]
+
+        if isinstance(field_data := fields[field_number], str):  # Only the field on the path is split
             fields[field_number] = Parser.split_complex_field(field_number, field_data)
 
         field_data = fields
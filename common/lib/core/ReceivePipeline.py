@@ -0,0 +1,60 @@
+from loguru import logger
+from typing import Iterable
+from common.lib.core.Parser import Parser
+from common.lib.data_models.Config import Config
+from common.lib.data_models.TransactionRecord import TransactionRecord
+
+
+"""
+
+ Receive pipeline turns the incoming message bodies into the transaction records, see TransactionRecord
+
+ The pipeline parses all the frames of the read in a single call and returns the list of records. The frames are cut
+ by the connector's FrameDecoder, the framing and the header settings live in the connector only
+
+ The pipeline owns the parsing mode. It is taken from the terminal.lazy_parsing param of the live Config and follows
+ the config changes in memory. The eager mode validates the Transaction model of each message. The lazy one builds the
+ record with no validation, the complex fields are split only when read, see Parser.parse_record. The flat fields
+ are decoded at once, the lazy scan of the flat message is slower than the decoding
+
+ The incorrect frame is logged and skipped, it doesn't affect the other frames of the batch
+
+"""
+
+
+class ReceivePipeline:
+    _config: Config
+    flat: bool
+    lazy: bool
+
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, config: Config):
+        self._config = config
+        self.lazy = config.terminal.lazy_parsing
+
+    def __init__(self, config: Config, flat: bool = True):
+        self.flat = flat
+        self.config = config
+
+    def parse_frames(self, frames: Iterable[bytes | memoryview]) -> list[TransactionRecord]:
+        transactions: list[TransactionRecord] = list()
+
+        for frame in frames:
+            try:
+                transactions.append(self.parse_frame(frame))
+
+            except Exception as parsing_error:
+                logger.error(f"Incoming transaction parsing error: {parsing_error}")
+                logger.debug(f"Raw message: {bytes(frame)}")
+
+        return transactions
+
+    def parse_frame(self, frame: bytes | memoryview) -> TransactionRecord:
+        if self.lazy:
+            return Parser.parse_record(frame, flat=self.flat, lazy=not self.flat)
+
+        return TransactionRecord.from_transaction(Parser.parse_dump(frame, flat=self.flat))
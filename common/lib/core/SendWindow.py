@@ -0,0 +1,112 @@
+from collections import deque
+from common.lib.data_models.TransactionRecord import TransactionRecord
+from common.lib.data_models.WindowState import WindowState
+
+
+"""
+
+ In-flight window of the outgoing requests
+
+ Bounds the number of the requests sent and waiting for the response. When the window is full the next requests wait
+ in the pending queue, they are sent one by one as the slots are released. A slot is released when the request gets
+ the response, times out or fails to be sent
+
+ The capacity is a number of the slots, zero means an unlimited window. The pending queue is bounded by max_pending,
+ the request which doesn't fit the queue is rejected
+
+ Usage example
+
+ window = SendWindow(capacity=64)
+
+ if window.acquire(request.trans_id):
+     send(request)
+ else:
+     window.push(request)
+
+ window.release(response.match_id)
+ request = window.pop()
+
+"""
+
+
+class SendWindow:
+    _capacity: int
+    _max_pending: int
+    _in_flight: set[str]
+    _pending: deque[TransactionRecord]
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int):
+        self._capacity = max(capacity, int())
+
+    @property
+    def max_pending(self) -> int:
+        return self._max_pending
+
+    @max_pending.setter
+    def max_pending(self, max_pending: int):
+        self._max_pending = max(max_pending, int())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def __init__(self, capacity: int = 0, max_pending: int = 10000):
+        self._in_flight = set()
+        self._pending = deque()
+        self.capacity = capacity
+        self.max_pending = max_pending
+
+    def __contains__(self, trans_id: str) -> bool:
+        return trans_id in self._in_flight
+
+    def is_full(self) -> bool:
+        return bool(self.capacity) and len(self._in_flight) >= self.capacity
+
+    def can_send(self) -> bool:  # A new request doesn't overtake the pending ones
+        return not self._pending and not self.is_full()
+
+    def acquire(self, trans_id: str) -> bool:
+        if self.is_full():
+            return False
+
+        self._in_flight.add(trans_id)
+
+        return True
+
+    def release(self, trans_id: str) -> bool:
+        if trans_id not in self._in_flight:
+            return False
+
+        self._in_flight.discard(trans_id)
+
+        return True
+
+    def push(self, request: TransactionRecord) -> bool:
+        if len(self._pending) >= self.max_pending:
+            return False
+
+        self._pending.append(request)
+
+        return True
+
+    def pop(self) -> TransactionRecord | None:
+        if not self._pending or self.is_full():
+            return
+
+        return self._pending.popleft()
+
+    def clear(self) -> None:
+        self._in_flight.clear()
+        self._pending.clear()
+
+    def get_state(self) -> WindowState:
+        return WindowState(capacity=self.capacity, in_flight=self.in_flight, pending=self.pending)
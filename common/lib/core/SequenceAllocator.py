@@ -0,0 +1,133 @@
+from random import randint
+from threading import Lock
+
+
+"""
+
+ Sequence allocator of the unique field values, STAN, RRN and the transaction ID suffix
+
+ The values are taken one by one from the range, zero-padded to the width. After the last value of the range the
+ sequence wraps around to the first one. The first value of a session is chosen randomly, so a restarted session
+ doesn't repeat the values of the previous one
+
+ The values of the requests in flight are reserved by the transaction queue and released when the request is matched,
+ timed out or failed. The allocator skips the reserved values after the wrap-around, so a value is never given to two
+ requests in flight at once. Reserving a value which is already in flight returns False, it is a collision
+
+ The calls are thread-safe, the threads of one process share the allocator. Parallel processes split the range into
+ partitions, each process takes its own one by set_partition, so the processes never produce the same value
+
+ Usage example
+
+ stan_allocator = SequenceAllocator(width=6)
+ stan_allocator.set_partition(index=0, count=4)
+ stan = stan_allocator.allocate()
+ stan_allocator.reserve(stan, owner=request.trans_id)
+ stan_allocator.release(request.trans_id)
+
+"""
+
+
+class SequenceAllocator:
+    _width: int
+    _first: int
+    _last: int
+    _partition_first: int
+    _partition_last: int
+    _next: int
+    _in_flight: dict[str, str]  # Reserved value: owner
+    _owners: dict[str, str]  # Owner: reserved value
+    _random_start: bool  # The first value of the session is random
+    _lock: Lock
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def capacity(self) -> int:
+        return self._partition_last - self._partition_first + 1
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def __init__(self, width: int, first: int = 1, last: int | None = None, random_start: bool = True):
+        if width < 1:
+            raise ValueError("Sequence width must be at least 1")
+
+        if last is None:
+            last = 10 ** width - 1
+
+        if not int() <= first <= last < 10 ** width:
+            raise ValueError(f"Wrong sequence range {first}-{last} for the width {width}")
+
+        self._lock = Lock()
+        self._width = width
+        self._first = first
+        self._last = last
+        self._in_flight = dict()
+        self._owners = dict()
+        self._random_start = random_start
+        self.set_partition(index=0, count=1)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._in_flight
+
+    def set_partition(self, index: int, count: int) -> None:
+        if count < 1 or index not in range(count):
+            raise ValueError(f"Wrong sequence partition {index} of {count}")
+
+        size: int = (self._last - self._first + 1) // count
+
+        if size < 1:
+            raise ValueError(f"The sequence range is too small for {count} partitions")
+
+        with self._lock:
+            self._partition_first = self._first + index * size
+            self._partition_last = self._partition_first + size - 1 if index < count - 1 else self._last
+            self._next = self._partition_first
+
+            if self._random_start:
+                self._next = randint(self._partition_first, self._partition_last)
+
+    def allocate(self) -> str:
+        with self._lock:
+            return self._allocate()
+
+    def allocate_many(self, number: int) -> list[str]:  # The next number values, at once for the bulk generation
+        with self._lock:
+            return [self._allocate() for _ in range(number)]
+
+    def _allocate(self) -> str:
+        for _ in range(self.capacity):
+            value: str = str(self._next).zfill(self._width)
+            self._next = self._next + 1 if self._next < self._partition_last else self._partition_first
+
+            if value not in self._in_flight:
+                return value
+
+        raise OverflowError(f"All {self.capacity} sequence values are in flight")
+
+    def reserve(self, value: str, owner: str) -> bool:  # False when the value is already used by another owner
+        with self._lock:
+            if (current_owner := self._in_flight.get(value)) is not None and current_owner != owner:
+                return False
+
+            if (previous_value := self._owners.get(owner)) is not None:
+                self._in_flight.pop(previous_value, None)
+
+            self._in_flight[value] = owner
+            self._owners[owner] = value
+
+            return True
+
+    def release(self, owner: str) -> None:
+        with self._lock:
+            if (value := self._owners.pop(owner, None)) is not None:
+                self._in_flight.pop(value, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._in_flight.clear()
+            self._owners.clear()
@@ -0,0 +1,86 @@
+from types import MappingProxyType
+from dataclasses import dataclass, field as dataclass_field
+from common.lib.core.WireCodec import WireCodec
+from common.lib.data_models.EpaySpecificationModel import EpaySpecModel, IsoField, FieldSet
+
+
+"""
+
+ Lookup index of the ISO specification
+
+ Keeps everything derived from the specification model to answer the frequent questions in O(1): the field spec by
+ the field path, is the field complex or secret, the descriptions of the fields along the path, the matching and the
+ reversal fields and the wire codec. The path is a tuple of the field numbers, e.g. ("47", "064")
+
+ The MTI section is compiled to the read-only tables: request to response, request to reversal, MTI to direction
+ (True for request) and the set of all known MTI. When an MTI is set more than once the first one wins, the same as
+ the list scan did
+
+ The index is immutable. EpaySpecification builds a new one each time the specification changes and replaces the old
+ one by a single assignment, so the readers never see a half-built index
+
+ Do not build the index directly, use the EpaySpecification methods
+
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class SpecIndex:
+    codec: WireCodec
+    fields: dict[tuple[str, ...], IsoField] = dataclass_field(default_factory=dict)
+    complex_fields: frozenset[tuple[str, ...]] = frozenset()
+    secret_fields: frozenset[tuple[str, ...]] = frozenset()
+    descriptions: dict[tuple[str, ...], tuple[str, ...]] = dataclass_field(default_factory=dict)
+    description_strings: dict[tuple[str, ...], str] = dataclass_field(default_factory=dict)
+    response_mti: MappingProxyType[str, str] = dataclass_field(default_factory=lambda: MappingProxyType(dict()))
+    reversal_mti: MappingProxyType[str, str] = dataclass_field(default_factory=lambda: MappingProxyType(dict()))
+    mti_directions: MappingProxyType[str, bool] = dataclass_field(default_factory=lambda: MappingProxyType(dict()))
+    mti_codes: frozenset[str] = frozenset()
+    match_fields: tuple[str, ...] = tuple()
+    reversal_fields: tuple[str, ...] = tuple()
+
+    @classmethod
+    def from_spec(cls, spec: EpaySpecModel) -> "SpecIndex":
+        fields: dict[tuple[str, ...], IsoField] = dict()
+        descriptions: dict[tuple[str, ...], tuple[str, ...]] = dict()
+
+        cls._index_fields(spec.fields, tuple(), fields)
+
+        for path, field_spec in fields.items():  # Parents go before their subfields
+            descriptions[path] = (*descriptions.get(path[:-1], tuple()), field_spec.description)
+
+        response_mti: dict[str, str] = dict()
+        reversal_mti: dict[str, str] = dict()
+        mti_directions: dict[str, bool] = dict()
+
+        for mti in spec.mti:
+            response_mti.setdefault(mti.request, mti.response)
+            mti_directions.setdefault(mti.request, True)
+            mti_directions.setdefault(mti.response, False)
+
+            if mti.reversal_mti and mti.is_reversible:
+                reversal_mti.setdefault(mti.request, mti.reversal_mti)
+
+        return cls(
+            codec=WireCodec(spec),
+            fields=fields,
+            complex_fields=frozenset(path for path, field_spec in fields.items() if field_spec.fields),
+            secret_fields=frozenset(path for path, field_spec in fields.items() if field_spec.is_secret),
+            descriptions=descriptions,
+            description_strings={path: " / ".join(description) for path, description in descriptions.items()},
+            response_mti=MappingProxyType(response_mti),
+            reversal_mti=MappingProxyType(reversal_mti),
+            mti_directions=MappingProxyType(mti_directions),
+            mti_codes=frozenset(mti_directions),
+            match_fields=tuple(field for field, field_spec in spec.fields.items() if field_spec.matching),
+            reversal_fields=tuple(field for field, field_spec in spec.fields.items() if field_spec.reversal),
+        )
+
+    @classmethod
+    def _index_fields(cls, spec_fields: FieldSet, parent_path: tuple[str, ...], fields: dict) -> None:
+        for field, field_spec in spec_fields.items():
+            path: tuple[str, ...] = (*parent_path, field)
+            fields[path] = field_spec
+
+            if field_spec.fields:
+                cls._index_fields(field_spec.fields, path, fields)
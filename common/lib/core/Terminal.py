@@ -16,6 +16,8 @@ from common.lib.core.validators.DataValidator import DataValidator
 from common.lib.data_models.Config import Config
 from common.lib.data_models.Transaction import Transaction
 from common.lib.core.Connector import Connector
+from common.lib.core.AsyncConnector import AsyncConnector
+from common.lib.core.ConnectionPool import ConnectionPool
 from common.lib.core.LogPrinter import LogPrinter
 from common.lib.core.TransTimer import TransactionTimer
 from common.lib.data_models.Currencies import Currencies
@@ -25,6 +27,7 @@ from common.lib.enums import KeepAlive
 from common.lib.enums.TermFilesPath import TermFilesPath
 from common.lib.data_models.License import LicenseInfo
 from common.lib.enums.ConnectionStatus import ConnectionStatus
+from common.lib.enums.ConnectorType import ConnectorType
 
 
 class Terminal(QObject):
@@ -43,7 +46,7 @@ class Terminal(QObject):
         self.config: Config = config
 
         if connector is None:
-            connector: Connector = Connector(self.config)
+            connector: ConnectionInterface = self.create_connector()
 
         self.trans_validator = TransValidator(self.config)
         self.data_validator = DataValidator(self.config)
@@ -52,10 +55,22 @@ class Terminal(QObject):
         self.parser: Parser = Parser(self.config)
         self.generator: FieldsGenerator = FieldsGenerator()
         self.logger: Logger = Logger(self.config)
-        self.trans_queue: TransactionQueue = TransactionQueue(self.connector)
+        self.trans_queue: TransactionQueue = TransactionQueue(self.connector, self.config)
         self.spec: EpaySpecification = EpaySpecification(Path(TermFilesPath.SPECIFICATION))
         self.connect_interfaces()
 
+        if self.config.storage.journal_enabled:
+            self.trans_queue.replay_journal()
+
+    def create_connector(self) -> ConnectionInterface:
+        if self.config.pool.size > 1 or self.config.pool.hosts:
+            return ConnectionPool(self.config)
+
+        if self.config.host.connector_type == ConnectorType.ASYNCIO:
+            return AsyncConnector(self.config)
+
+        return Connector(self.config)
+
     def run_application(self) -> int:
         self.pyqt_application.setStyle(QStyleFactory.create("windowsvista"))
         status: int = self.pyqt_application.exec()
@@ -70,6 +85,7 @@ class Terminal(QObject):
         self.trans_queue.outgoing_transaction.connect(self.transaction_sent)
         self.trans_queue.transaction_timeout.connect(self.got_timeout)
         self.keep_alive_timer.send_transaction.connect(self.keep_alive)
+        self.pyqt_application.aboutToQuit.connect(self.trans_queue.journal.close)
 
     @staticmethod
     def sort_transaction_fields(transaction: Transaction) -> Transaction:
@@ -145,6 +161,7 @@ class Terminal(QObject):
             self.logger,
             self.log_printer,
             self.parser,
+            self.trans_queue,
             self.trans_validator,
             self.data_validator,
         ):
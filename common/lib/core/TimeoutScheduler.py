@@ -0,0 +1,151 @@
+from heapq import heappush, heappop, heapify
+from time import perf_counter_ns
+from dataclasses import dataclass
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from common.lib.data_models.TransactionRecord import TransactionRecord
+
+
+"""
+
+ Timeout scheduler of the requests waiting for the response
+
+ All the requests share one heap of deadlines and one single-shot QTimer, armed to the nearest deadline. Starting and
+ stopping a request timer costs O(log n), so the memory and CPU usage don't depend on the number of the requests in
+ flight, there are no QTimer objects per request
+
+ The stopped request is removed from the entries at once, its heap item is dropped lazily when it comes to the top of
+ the heap. When the stale items outnumber the live ones the heap is rebuilt, so it doesn't grow in the long sessions
+
+ The timestamps are taken by perf_counter_ns, the response time is measured with the nanosecond resolution
+
+ Usage example
+
+ scheduler = TimeoutScheduler()
+ scheduler.expired.connect(process_timeout)
+ scheduler.start(request, timeout=60)
+ response_time_seconds = scheduler.stop(request.trans_id)
+
+"""
+
+
+@dataclass(slots=True)
+class TimeoutEntry:
+    transaction: TransactionRecord
+    started_ns: int
+    deadline_ns: int
+    timeout: float
+    sequence: int
+
+
+class TimeoutScheduler(QObject):
+    NANOSECONDS_IN_SECOND: int = 1_000_000_000
+    NANOSECONDS_IN_MILLISECOND: int = 1_000_000
+    expired: pyqtSignal = pyqtSignal(object, float)  # TransactionRecord, timeout seconds
+    _timer: QTimer
+    _entries: dict[str, TimeoutEntry]
+    _deadlines: list[tuple[int, int, str]]  # Heap of (deadline_ns, sequence, trans_id)
+    _sequence: int = int()
+    _armed_deadline_ns: int | None = None
+
+    def __init__(self):
+        super().__init__()
+        self._entries = dict()
+        self._deadlines = list()
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.process_expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, trans_id: str) -> bool:
+        return trans_id in self._entries
+
+    def start(self, transaction: TransactionRecord, timeout: float = 60) -> None:
+        self._sequence += 1
+
+        started_ns: int = perf_counter_ns()
+        deadline_ns: int = started_ns + int(timeout * self.NANOSECONDS_IN_SECOND)
+
+        entry: TimeoutEntry = TimeoutEntry(transaction, started_ns, deadline_ns, timeout, self._sequence)
+        self._entries[transaction.trans_id] = entry
+
+        heappush(self._deadlines, (deadline_ns, self._sequence, transaction.trans_id))
+
+        if self._armed_deadline_ns is None or deadline_ns < self._armed_deadline_ns:
+            self._arm()
+
+    def stop(self, trans_id: str) -> float | None:  # Returns the seconds passed since the start
+        if not (entry := self._entries.pop(trans_id, None)):
+            return
+
+        self._compact()
+
+        return (perf_counter_ns() - entry.started_ns) / self.NANOSECONDS_IN_SECOND
+
+    def cancel(self, transaction: TransactionRecord) -> None:
+        if not (entry := self._entries.get(transaction.trans_id)):
+            return
+
+        if entry.transaction is not transaction:  # The trans_id was reused by another transaction
+            return
+
+        self.stop(transaction.trans_id)
+
+    def elapsed(self, trans_id: str) -> float | None:
+        if not (entry := self._entries.get(trans_id)):
+            return
+
+        return (perf_counter_ns() - entry.started_ns) / self.NANOSECONDS_IN_SECOND
+
+    def clear(self) -> None:
+        self._timer.stop()
+        self._entries.clear()
+        self._deadlines.clear()
+        self._armed_deadline_ns = None
+
+    def process_expired(self) -> None:
+        self._armed_deadline_ns = None
+        now_ns: int = perf_counter_ns()
+        expired: list[TimeoutEntry] = list()
+
+        while self._deadlines and self._deadlines[0][0] <= now_ns:
+            deadline_ns, sequence, trans_id = heappop(self._deadlines)
+
+            if not (entry := self._entries.get(trans_id)) or entry.sequence != sequence:
+                continue  # Stale item of the stopped or restarted timer
+
+            del self._entries[trans_id]
+            expired.append(entry)
+
+        self._arm()
+
+        for entry in expired:
+            self.expired.emit(entry.transaction, entry.timeout)
+
+    def _arm(self) -> None:
+        while self._deadlines:
+            deadline_ns, sequence, trans_id = self._deadlines[0]
+
+            if (entry := self._entries.get(trans_id)) and entry.sequence == sequence:
+                break
+
+            heappop(self._deadlines)
+
+        if not self._deadlines:
+            self._timer.stop()
+            self._armed_deadline_ns = None
+            return
+
+        deadline_ns: int = self._deadlines[0][0]
+        interval_ns: int = max(deadline_ns - perf_counter_ns(), int())
+
+        self._armed_deadline_ns = deadline_ns
+        self._timer.start(-(-interval_ns // self.NANOSECONDS_IN_MILLISECOND))  # Round up, don't wake up too early
+
+    def _compact(self) -> None:
+        if len(self._deadlines) <= 2 * len(self._entries) + 1024:
+            return
+
+        self._deadlines = [(entry.deadline_ns, entry.sequence, trans_id) for trans_id, entry in self._entries.items()]
+        heapify(self._deadlines)
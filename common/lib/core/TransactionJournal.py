@@ -0,0 +1,216 @@
+from os import fsync
+from time import time_ns, perf_counter
+from enum import IntEnum
+from pathlib import Path
+from struct import Struct
+from zlib import crc32
+from typing import Iterator, BinaryIO
+from dataclasses import dataclass
+from loguru import logger
+
+
+"""
+
+ Append-only journal of the transaction frames
+
+ Each outgoing and incoming message body is appended to the journal as a binary record. The records are written to the
+ segment files journal_000001.bin, journal_000002.bin, etc. A new segment is started when the current one reaches
+ the segment size, the oldest segments are removed when their number exceeds max_segments
+
+ Record format, little-endian
+
+ crc32         4 bytes   CRC32 of the rest of the record
+ record type   1 byte    RecordType, outgoing or incoming
+ timestamp     8 bytes   Unix time in nanoseconds
+ body length   4 bytes
+ id length     2 bytes
+ trans_id      id length bytes, UTF-8, empty for the incoming messages
+ body          body length bytes, the message body with no header
+
+ Each record is handed to the OS right away, so it survives the crash of the application. The fsync is batched, it is
+ called when fsync_interval seconds passed since the previous one, on the segment rotation and on close
+
+ The replay reads the segments record by record, the segment is never loaded whole. A broken or incomplete record
+ means the journal was interrupted in the middle of writing, the rest of the segment is skipped
+
+ Usage example
+
+ journal = TransactionJournal("common/data/journal")
+ journal.write(RecordType.OUTGOING, transaction.trans_id, dump)
+
+ for record in journal.replay():
+     ...
+
+"""
+
+
+class RecordType(IntEnum):
+    OUTGOING = 1
+    INCOMING = 2
+
+
+@dataclass(frozen=True, slots=True)
+class JournalRecord:
+    record_type: RecordType
+    timestamp_ns: int
+    trans_id: str
+    body: bytes
+
+
+class TransactionJournal:
+    SEGMENT_PREFIX: str = "journal_"
+    SEGMENT_SUFFIX: str = ".bin"
+    HEADER: Struct = Struct("<IBqIH")
+    CRC: Struct = Struct("<I")
+    _directory: Path
+    _segment_size: int
+    _max_segments: int
+    _fsync_interval: float
+    _file: BinaryIO | None = None
+    _segment_number: int = int()
+    _last_sync: float = float()
+    _unsynced: int = int()
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def segment_size(self) -> int:
+        return self._segment_size
+
+    @segment_size.setter
+    def segment_size(self, segment_size: int):
+        self._segment_size = segment_size
+
+    @property
+    def max_segments(self) -> int:
+        return self._max_segments
+
+    @max_segments.setter
+    def max_segments(self, max_segments: int):
+        self._max_segments = max_segments
+
+    @property
+    def fsync_interval(self) -> float:
+        return self._fsync_interval
+
+    @fsync_interval.setter
+    def fsync_interval(self, fsync_interval: float):
+        self._fsync_interval = fsync_interval
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def __init__(self, directory: str | Path, segment_size: int = 64 * 1024 * 1024, max_segments: int = 10,
+                 fsync_interval: float = 1.0):
+
+        self._directory = Path(directory)
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.fsync_interval = fsync_interval
+
+    def get_segments(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return list()
+
+        return sorted(self.directory.glob(f"{self.SEGMENT_PREFIX}*{self.SEGMENT_SUFFIX}"))
+
+    def open(self) -> None:
+        if self.is_open:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        if segments := self.get_segments():
+            self._segment_number = int(segments[-1].stem.removeprefix(self.SEGMENT_PREFIX))
+
+        self._open_segment(self._segment_number + 1)  # Never append to the segment, possibly broken by a crash
+
+    def close(self) -> None:
+        if not self.is_open:
+            return
+
+        self.sync()
+        self._file.close()
+
+        if not Path(self._file.name).stat().st_size:  # Don't leave the empty segments behind
+            Path(self._file.name).unlink(missing_ok=True)
+
+        self._file = None
+
+    def write(self, record_type: RecordType, trans_id: str | None, body: bytes | memoryview) -> None:
+        if not self.is_open:
+            return
+
+        trans_id: bytes = (trans_id or str()).encode()
+        header: bytes = self.HEADER.pack(int(), record_type, time_ns(), len(body), len(trans_id))[self.CRC.size:]
+        checksum: int = crc32(body, crc32(trans_id, crc32(header)))
+
+        self._file.write(self.CRC.pack(checksum) + header + trans_id)
+        self._file.write(body)
+        self._file.flush()
+        self._unsynced += 1
+
+        if self._file.tell() >= self.segment_size:
+            self._open_segment(self._segment_number + 1)
+            return
+
+        if perf_counter() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        if not self.is_open or not self._unsynced:
+            return
+
+        self._file.flush()
+        fsync(self._file.fileno())
+        self._last_sync = perf_counter()
+        self._unsynced = int()
+
+    def replay(self) -> Iterator[JournalRecord]:
+        for segment in self.get_segments():
+            if self._file is not None and segment.name == Path(self._file.name).name:
+                continue  # The segment is being written right now
+
+            with open(segment, "rb") as segment_file:
+                yield from self._read_segment(segment_file, segment)
+
+    def _read_segment(self, segment_file: BinaryIO, segment: Path) -> Iterator[JournalRecord]:
+        while header := segment_file.read(self.HEADER.size):
+            if len(header) < self.HEADER.size:
+                logger.warning(f"Incomplete journal record in {segment.name}, the rest of the segment is skipped")
+                return
+
+            checksum, record_type, timestamp_ns, body_length, id_length = self.HEADER.unpack(header)
+            trans_id: bytes = segment_file.read(id_length)
+            body: bytes = segment_file.read(body_length)
+
+            if len(trans_id) < id_length or len(body) < body_length:
+                logger.warning(f"Incomplete journal record in {segment.name}, the rest of the segment is skipped")
+                return
+
+            if crc32(body, crc32(trans_id, crc32(header[self.CRC.size:]))) != checksum:
+                logger.warning(f"Broken journal record in {segment.name}, the rest of the segment is skipped")
+                return
+
+            try:
+                record_type: RecordType = RecordType(record_type)
+            except ValueError:
+                logger.warning(f"Unknown journal record type {record_type} in {segment.name}, the record is skipped")
+                continue
+
+            yield JournalRecord(record_type, timestamp_ns, trans_id.decode(), body)
+
+    def _open_segment(self, segment_number: int) -> None:
+        if self.is_open:
+            self.sync()
+            self._file.close()
+
+        self._segment_number = segment_number
+        self._file = open(self.directory / f"{self.SEGMENT_PREFIX}{segment_number:06}{self.SEGMENT_SUFFIX}", "ab")
+        self._last_sync = perf_counter()
+
+        for segment in self.get_segments()[:-self.max_segments]:
+            segment.unlink(missing_ok=True)
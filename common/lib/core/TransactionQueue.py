@@ -1,115 +1,294 @@
 from loguru import logger
-from collections import deque
 from datetime import datetime, timedelta
 from PyQt6.QtCore import QObject, pyqtSignal
-from PyQt6.QtCore import QTimer
 from common.lib.core.EpaySpecification import EpaySpecification
 from common.lib.data_models.Transaction import Transaction
+from common.lib.data_models.TransactionRecord import TransactionRecord
 from common.lib.core.Parser import Parser
+from common.lib.core.ReceivePipeline import ReceivePipeline
+from common.lib.core.TransactionStore import TransactionStore
+from common.lib.core.TimeoutScheduler import TimeoutScheduler
+from common.lib.core.TransactionJournal import TransactionJournal, RecordType
+from common.lib.core.SendWindow import SendWindow
+from common.lib.core.LatencyRecorder import LatencyRecorder
+from common.lib.core.FieldsGenerator import FieldsGenerator
+from common.lib.core.SequenceAllocator import SequenceAllocator
+from common.lib.data_models.WindowState import WindowState
+from common.lib.data_models.LatencyReport import LatencyReport
+from common.lib.enums.TermFilesPath import TermDirs
+from common.lib.data_models.Config import Config
 from common.lib.interfaces.ConnectorInterface import ConnectionInterface
 
 
 class TransactionQueue(QObject):
     spec: EpaySpecification = EpaySpecification()
-    queue: deque[Transaction] = None
+    queue: TransactionStore = None
     incoming_transaction: pyqtSignal = pyqtSignal(Transaction)
     outgoing_transaction: pyqtSignal = pyqtSignal(Transaction)
     transaction_timeout: pyqtSignal = pyqtSignal(Transaction, float)
-    ready_to_send: pyqtSignal = pyqtSignal(str, bytes)
+    ready_to_send: pyqtSignal = pyqtSignal(str, bytearray)  # The message with the frame header
     socket_error: pyqtSignal = pyqtSignal(Transaction)
-
-    def __init__(self, connector: ConnectionInterface):
+    transaction_evicted: pyqtSignal = pyqtSignal(Transaction, int)  # Evicted transaction, evictions counter
+    receive_pipeline: ReceivePipeline
+    timeout_scheduler: TimeoutScheduler
+    journal: TransactionJournal
+    window: SendWindow
+    latency: LatencyRecorder
+    sequences: dict[str, SequenceAllocator]  # STAN and RRN of the requests in flight
+    _sending_pending: bool = False
+
+    @property
+    def config(self):
+        return self.receive_pipeline.config
+
+    @config.setter
+    def config(self, config: Config):
+        self.receive_pipeline.config = config
+        self.queue.maxlen = config.storage.max_transactions
+        self.queue.memory_budget = config.storage.memory_budget_mb * 1024 * 1024
+        self.queue.retention_policy = config.storage.retention_policy
+        self.journal.segment_size = config.storage.journal_segment_size_mb * 1024 * 1024
+        self.journal.max_segments = config.storage.journal_max_segments
+        self.journal.fsync_interval = config.storage.journal_fsync_interval_ms / 1000
+        self.window.capacity = config.pool.max_in_flight * self.connector.get_connections_number()
+        self.window.max_pending = config.pool.max_pending
+        self.latency.interval_seconds = config.metrics.latency_interval_seconds
+
+        if config.fields:
+            FieldsGenerator.set_sequence_partition(config.fields.sequence_partition, config.fields.sequence_partitions)
+
+        if config.storage.journal_enabled:
+            self.journal.open()
+        else:
+            self.journal.close()
+
+        self.send_pending()  # The window could grow
+
+    @property
+    def evictions(self) -> int:
+        return self.queue.evictions
+
+    def __init__(self, connector: ConnectionInterface, config: Config, store: TransactionStore | None = None):
         QObject.__init__(self)
         self.connector = connector
-        self.timers: dict[str, QTimer] = {}
-        self.queue = deque(maxlen=10000)
+        self.timeout_scheduler = TimeoutScheduler()
+        self.timeout_scheduler.expired.connect(self.process_timeout)
+        self.queue = store if store is not None else TransactionStore()
+        self.queue.on_remove = self.timeout_scheduler.cancel
+        self.queue.on_evict = self.process_eviction
+        self.journal = TransactionJournal(TermDirs.JOURNAL_DIR)
+        self.window = SendWindow()
+        self.latency = LatencyRecorder()
+        self.sequences = FieldsGenerator.get_sequences()
+        self.receive_pipeline = ReceivePipeline(config, flat=True)
+        self.config = config
         self.ready_to_send.connect(self.connector.send_transaction_data)
         self.connector.incoming_transaction_data.connect(self.receive_transaction_data)
         self.connector.transaction_sent.connect(self.request_was_sent)
         self.connector.sending_error.connect(self.set_sending_error)
 
     def set_sending_error(self, trans_id, error_message):
-        if not (transaction := self.get_transaction(trans_id)):
+        if not (transaction := self.get_record(trans_id)):
             logger.error(error_message)
+            self.release_sequences(trans_id)  # The record could be removed before the error came
             return
 
         transaction.success = False
         transaction.error = error_message
-        self.socket_error.emit(transaction)
+        self.timeout_scheduler.cancel(transaction)  # Sent before the error, e.g. the pool connection is lost
+        self.queue.release(transaction)
+        self.socket_error.emit(transaction.to_transaction())
         logger.error(error_message)
+        self.release_transaction(trans_id)
 
-    def send_transaction_data(self, request: Transaction):
+    def send_transaction_data(self, request: TransactionRecord):
         if not request.is_request:
             request.success = False
             request.error = "Wrong MTI"
             raise TypeError(request.error)
 
+        if not self.window.acquire(request.trans_id):  # The caller didn't check the window, the request waits
+            self.put_pending(request)
+            return
+
         try:
-            transaction_dump: bytes = Parser.create_dump(request)
-        except (ValueError, TypeError) as parsing_error:
-            request.success = False
-            request.error = f"Parsing error: {parsing_error}"
-            logger.error(request.error)
+            frame: bytearray = self.get_transaction_frame(request)
+        except (ValueError, TypeError) as parsing_error:  # Released as not sent, so it doesn't stay in flight
+            self.set_sending_error(request.trans_id, f"Parsing error: {parsing_error}")
             return
 
-        self.ready_to_send.emit(request.trans_id, transaction_dump)
+        self.journal.write(RecordType.OUTGOING, request.trans_id, memoryview(frame)[Parser.FRAME_HEADER.size:])
+        self.ready_to_send.emit(request.trans_id, frame)
 
-    def receive_transaction_data(self, transaction_data: bytes):
-        try:
-            transactions: list[Transaction] = Parser.parse_raw_data(transaction_data, flat=True)
+    @staticmethod
+    def get_transaction_frame(request: TransactionRecord) -> bytearray:
+        if request.wire_data is None:
+            return Parser.create_frame(request)
 
-        except Exception as parsing_error:
-            logger.error(f"Incoming transaction parsing error: {parsing_error}")
+        frame: bytearray = bytearray(Parser.FRAME_HEADER.size)
+        frame += request.wire_data  # Compiled template, the message is ready
+        request.wire_data = None
+
+        return Parser.set_frame_header(frame)
+
+    def send_request(self, request: TransactionRecord):
+        if not self.window.can_send():
+            self.put_pending(request)
             return
 
-        for transaction in transactions:
-            self.put_transaction(transaction)
+        request.sending_time = datetime.now()
+        self.send_transaction_data(request)
+
+    def put_pending(self, request: TransactionRecord):
+        if not self.window.push(request):
+            self.set_sending_error(request.trans_id, "The in-flight window queue is full, the request is not sent")
+            return
+
+        logger.debug(f"In-flight window is full, transaction [{request.trans_id}] waits for a free slot")
+
+    def send_pending(self):
+        if self._sending_pending:  # The slot released by the sending error of a pending request
+            return
+
+        self._sending_pending = True
+
+        try:
+            while request := self.window.pop():
+                if self.queue.get(request.trans_id) is not request:  # Removed or rewritten while waiting
+                    continue
+
+                request.sending_time = datetime.now()
+                self.send_transaction_data(request)
 
-    def put_transaction(self, transaction, send=True):
-        transactions_to_delete = []
+        finally:
+            self._sending_pending = False
 
-        for old_transaction in self.queue:
-            if transaction.trans_id not in (old_transaction.trans_id, old_transaction.match_id):
+    def release_transaction(self, trans_id: str):  # The request got the response, timed out or failed to be sent
+        self.connector.release_transaction(trans_id)
+        self.release_sequences(trans_id)
+
+        if self.window.release(trans_id):
+            self.send_pending()
+
+    def reserve_sequences(self, request: TransactionRecord):
+        for field, sequence in self.sequences.items():
+            if not isinstance(value := request.data_fields.get(field), str):
                 continue
 
-            if transaction.trans_id == old_transaction.trans_id:
-                logger.warning(f"Transaction with ID [{transaction.trans_id}] already exists. "
-                               f"The transaction will be rewritten")
+            if sequence.reserve(value, owner=request.trans_id):
+                continue
+
+            if field in request.generate_fields:  # The fixed values are repeated on purpose
+                logger.warning(f"Transaction [{request.trans_id}] field {field} value {value} is already used by "
+                               f"another request in flight")
+
+    def release_sequences(self, trans_id: str):
+        for sequence in self.sequences.values():
+            sequence.release(trans_id)
 
-            if transaction.trans_id == old_transaction.match_id:
-                logger.warning(f"Transaction with match ID [{transaction.trans_id}] already exists. The transaction "
-                               f"will be rewritten")
+    def get_window_state(self) -> WindowState:
+        return self.window.get_state()
 
-            transactions_to_delete.append(old_transaction)
+    def record_latency(self, request: TransactionRecord, response: TransactionRecord):
+        response_code = response.data_fields.get(self.spec.FIELD_SET.FIELD_039_AUTHORIZATION_RESPONSE_CODE)
+        self.latency.record(request.message_type, response_code, response.resp_time_seconds)
+
+    def get_latency_report(self) -> LatencyReport:
+        return self.latency.get_report()
+
+    def receive_transaction_data(self, frames: list[bytes]):  # Message bodies, the headers are cut by connector
+        for frame in frames:
+            self.journal.write(RecordType.INCOMING, None, frame)
+
+        for transaction in self.receive_pipeline.parse_frames(frames):
+            self.put_transaction(transaction)
 
-        for old_transaction in transactions_to_delete:
-            self.remove_from_queue(old_transaction)
+    def put_transaction(self, transaction: Transaction | TransactionRecord, send=True):
+        if not isinstance(transaction, TransactionRecord):  # The queue works with the records, see TransactionRecord
+            transaction: TransactionRecord = TransactionRecord.from_transaction(transaction)
+
+        if self.queue.get(transaction.trans_id):
+            logger.warning(f"Transaction with ID [{transaction.trans_id}] already exists. "
+                           f"The transaction will be rewritten")
+
+        if self.queue.get_by_match_id(transaction.trans_id):
+            logger.warning(f"Transaction with match ID [{transaction.trans_id}] already exists. The transaction "
+                           f"will be rewritten")
+
+        self.remove_from_queue(transaction)
 
         transaction.is_request = self.spec.is_request(transaction)
         self.queue.append(transaction)
 
         if send and transaction.is_request:
-            transaction.sending_time = datetime.now()
-            self.send_transaction_data(transaction)
+            self.reserve_sequences(transaction)
+            self.send_request(transaction)
             return
 
         self.put_response(transaction)
 
-    def put_response(self, response: Transaction):
+    def put_response(self, response: TransactionRecord):
         if response.is_request:
             raise TypeError("Wrong MTI")
 
         if not self.match_transaction(response):
-            self.incoming_transaction.emit(response)
+            self.incoming_transaction.emit(response.to_transaction())
             return
 
         response.utrnno = Parser.get_field_data(response.data_fields, self.spec.utrnno_path)
         response.resp_time_seconds = self.stop_transaction_timer(response)
-        request = self.get_transaction(response.match_id)
+        request = self.get_record(response.match_id)
         self.merge_trans_data(request, response)
-        self.incoming_transaction.emit(response)
+        self.record_latency(request, response)
+        self.incoming_transaction.emit(response.to_transaction())
+        self.queue.retain(request, response)
+        self.release_transaction(response.match_id)
+
+    def replay_journal(self) -> int:  # Rebuilds the queue from the journal of the previous sessions
+        restored: int = int()
+
+        for record in self.journal.replay():
+            try:
+                transaction: TransactionRecord = Parser.parse_record(record.body, flat=True)
+            except Exception as parsing_error:
+                logger.debug(f"Journal record parsing error: {parsing_error}")
+                continue
+
+            if record.trans_id:
+                transaction.trans_id = record.trans_id
+
+            self.restore_transaction(transaction, datetime.fromtimestamp(record.timestamp_ns / 1_000_000_000))
+            restored += 1
+
+        if restored:
+            logger.info(f"{restored} transactions restored from the journal")
+
+        return restored
 
-    def add_logical_fields(self, transaction: Transaction) -> Transaction:
+    def restore_transaction(self, transaction: TransactionRecord, timestamp: datetime):
+        self.add_logical_fields(transaction)
+
+        if transaction.is_request:
+            transaction.sending_time = timestamp
+            self.queue.append(transaction)
+            self.queue.release(transaction)  # Not in flight, the previous session doesn't wait for the response
+            return
+
+        self.queue.append(transaction)
+
+        if not self.match_transaction(transaction):
+            return
+
+        request: TransactionRecord = self.get_record(transaction.match_id)
+        transaction.utrnno = Parser.get_field_data(transaction.data_fields, self.spec.utrnno_path)
+
+        if request.sending_time:
+            transaction.resp_time_seconds = round((timestamp - request.sending_time).total_seconds(), 3)
+
+        self.merge_trans_data(request, transaction)
+        self.queue.retain(request, transaction)
+
+    def add_logical_fields(self, transaction: TransactionRecord) -> TransactionRecord:
         transaction.is_request = self.spec.is_request(transaction)
         transaction.is_reversal = self.spec.is_reversal(transaction.message_type)
 
@@ -121,7 +300,7 @@ class TransactionQueue(QObject):
 
         return transaction
 
-    def merge_trans_data(self, request: Transaction, response: Transaction):
+    def merge_trans_data(self, request: TransactionRecord, response: TransactionRecord):
         for message in (request, response):
             self.add_logical_fields(message)
 
@@ -132,51 +311,39 @@ class TransactionQueue(QObject):
         response.is_keep_alive = request.is_keep_alive
         response.is_reversal = request.is_reversal
 
-    def start_transaction_timer(self, transaction: Transaction, timeout=60):
-        timer: QTimer = QTimer()
-        timer.timeout.connect(lambda: self.process_timeout(transaction))
-        self.timers[transaction.trans_id] = timer
-        timer.start(timeout * 1000)
+    def start_transaction_timer(self, transaction: TransactionRecord, timeout=60):
+        self.timeout_scheduler.start(transaction, timeout)
 
     def stop_transaction_timer(self, response):
-        timer: QTimer
+        if (time_spend := self.timeout_scheduler.stop(response.match_id)) is not None:
+            return round(time_spend, 6)
 
-        if not (timer := self.timers.get(response.match_id)):
+        if not (request := self.get_record(response.match_id)):  # The response came after the timeout
             return
 
-        if not timer.isActive():
-            if not (request := self.get_transaction(response.match_id)):
-                return
-
-            if not request.sending_time:
-                return
-
-            time_spend: timedelta = datetime.now() - request.sending_time
-            time_spend: float = round(time_spend.total_seconds(), 3)
-
-            return time_spend
+        if not request.sending_time:
+            return
 
-        time_spend = (timer.interval() - timer.remainingTime()) / 1000
-        timer.stop()
+        time_spend: timedelta = datetime.now() - request.sending_time
+        time_spend: float = round(time_spend.total_seconds(), 3)
 
         return time_spend
 
-    def process_timeout(self, transaction):
-        timer: QTimer
-
-        if not (timer := self.timers.get(transaction.trans_id)):
-            return
+    def process_timeout(self, transaction: TransactionRecord, timeout_secs):
+        self.queue.release(transaction)
+        self.transaction_timeout.emit(transaction.to_transaction(), timeout_secs)
+        self.release_transaction(transaction.trans_id)
 
-        timeout_secs = int(timer.interval() / 1000)
-        self.transaction_timeout.emit(transaction, timeout_secs)
-        timer.stop()
+    def process_eviction(self, transaction: TransactionRecord):
+        logger.debug(f"Transaction [{transaction.trans_id}] was evicted from the queue. Evictions: {self.evictions}")
+        self.transaction_evicted.emit(transaction.to_transaction(), self.evictions)
 
     def request_was_sent(self, trans_id):
-        if not (request := self.get_transaction(trans_id)):
+        if not (request := self.get_record(trans_id)):
             return
 
         self.start_transaction_timer(request)
-        self.outgoing_transaction.emit(request)
+        self.outgoing_transaction.emit(request.to_transaction())
 
     def get_last_reversible_transaction_id(self) -> str:
         if reversible_transactions := self.get_reversible_transactions():
@@ -185,65 +352,40 @@ class TransactionQueue(QObject):
     def get_reversible_transactions(self) -> list[Transaction]:
         transactions: list[Transaction] = []
 
-        transaction: Transaction
+        transaction: TransactionRecord
 
         for transaction in self.queue:
             if not self.spec.get_reversal_mti(transaction.message_type):
                 continue
 
-            transactions.append(transaction)
+            transactions.append(transaction.to_transaction())
 
         return transactions
 
     def remove_from_queue(self, transaction):
-        transactions_to_remove = [
-            trans for trans in self.queue if transaction.trans_id in (trans.trans_id, trans.match_id)
-        ]
-
-        for transaction in transactions_to_remove:
-            self.queue.remove(transaction)
+        for old_transaction in self.queue.get(transaction.trans_id), self.queue.get_by_match_id(transaction.trans_id):
+            if old_transaction:
+                self.queue.remove(old_transaction)  # Stops the timeout timer, see TransactionStore.on_remove
+                self.release_transaction(old_transaction.trans_id)
 
     def get_transaction(self, trans_id: str) -> Transaction | None:
-        transaction = None
+        if transaction := self.get_record(trans_id):
+            return transaction.to_transaction()
 
-        for trans in self.queue:
-            if trans_id == trans.trans_id:
-                transaction = trans
-                break
+    def get_transactions(self) -> list[Transaction]:
+        return [transaction.to_transaction() for transaction in self.queue]
 
-        return transaction
+    def get_record(self, trans_id: str) -> TransactionRecord | None:
+        return self.queue.get(trans_id)
 
-    def get_original_transaction(self, reversal: Transaction):
+    def get_original_transaction(self, reversal: Transaction | TransactionRecord) -> Transaction | None:
         if not reversal.is_reversal:
             return
 
-        reversal_fields: list[str] = list(self.spec.get_reversal_fields())
-        reversal_fields.sort()
-
-        for transaction in self.queue:
-            matched_fields = list()
-
-            if transaction.is_reversal:
-                continue
-
-            for field in reversal_fields:
-                if not (reversal_field := reversal.data_fields.get(field)):
-                    break
-
-                if not (transaction_field := transaction.data_fields.get(field)):
-                    break
+        if original := self.queue.find_original(reversal):
+            return original.to_transaction()
 
-                if not reversal_field == transaction_field:
-                    break
-
-                matched_fields.append(field)
-
-            matched_fields.sort()
-
-            if matched_fields == reversal_fields:
-                return transaction
-
-    def is_matched(self, request: Transaction, response: Transaction) -> bool:
+    def is_matched(self, request: TransactionRecord, response: TransactionRecord) -> bool:
         if request.matched or response.matched:
             return False
 
@@ -256,22 +398,13 @@ class TransactionQueue(QObject):
 
         return True
 
-    def match_transaction(self, response: Transaction) -> bool:
-        matched_request: Transaction | None = None
-
-        for request in self.queue:
-            if not self.is_matched(request, response):
-                continue
-
-            matched_request = request
-            break
+    def match_transaction(self, response: TransactionRecord) -> bool:
+        if response.matched:
+            return False
 
-        if not matched_request:
+        if not (request := self.queue.find_request(response)):
             return False
 
-        matched_request.matched = True
-        response.matched = True
-        response.match_id = matched_request.trans_id
-        matched_request.match_id = response.trans_id
+        self.queue.set_matched(request, response)
 
         return True
@@ -0,0 +1,396 @@
+from loguru import logger
+from collections import defaultdict
+from typing import Iterator, Callable
+from common.lib.core.EpaySpecification import EpaySpecification
+from common.lib.core.LazyFieldSet import LazyFieldSet
+from common.lib.core.Parser import Parser
+from common.lib.data_models.TransactionRecord import TransactionRecord
+from common.lib.enums.RetentionPolicy import RetentionPolicy
+
+
+"""
+
+ TransactionRecord store of the TransactionQueue
+
+ Keeps the transactions in the order of adding, bounded by the number of transactions (maxlen) and by the memory
+ budget. Each lookup of the queue is served by an index instead of the scan of all the transactions
+
+ trans_id      -> transaction
+ match_id      -> transaction
+ match key     -> requests waiting for the response. The key is the expected response MTI and the values of the
+                  matching fields of the specification
+ reversal key  -> transactions, which could be reversed. The key is the values of the reversal fields
+
+ All the indexes are updated on adding, removal, matching and eviction. The match and the reversal keys are built from
+ the matching and reversal fields, set in the specification at the moment of adding. When the specification fields
+ change the keys are rebuilt on the next lookup
+
+ The request is in flight from adding until it is matched or released, e.g. by the timeout. The requests in flight are
+ never evicted, when they alone exceed the limits the store grows over the limits. The other transactions are evicted
+ in the order they left the flight, the oldest first. The number of the evicted transactions is counted, use it to
+ size the store
+
+ The memory usage is an estimation, the size of the fields data plus a constant overhead per transaction
+
+ The completed request-response pair is kept according to the retention policy
+
+ KEEP_ALL          - keep the transactions as is
+ DROP_AFTER_MATCH  - remove both transactions from the store
+ SUMMARY_ONLY      - keep the matching, the reversal and the result fields only
+ RAW_ONLY          - keep the message dump only, the fields are decoded on demand, see LazyFieldSet
+
+ The callbacks let the owner follow the store
+
+ on_remove  - called for each transaction leaving the store, e.g. to stop its timeout timer
+ on_evict   - called for each evicted transaction
+
+"""
+
+
+MatchKey = tuple[str | None, tuple[str | None, ...]]
+ReversalKey = tuple[str | None, ...]
+
+
+class TransactionStore:
+    TRANSACTION_OVERHEAD: int = 2048  # Estimated size of the transaction model without the fields data, bytes
+    FIELD_OVERHEAD: int = 64
+    spec: EpaySpecification = EpaySpecification()
+    _maxlen: int
+    _memory_budget: int
+    _retention_policy: RetentionPolicy
+    _memory_usage: int = int()
+    _evictions: int = int()
+    _transactions: dict[str, TransactionRecord]
+    _in_flight: dict[str, TransactionRecord]
+    _evictable: dict[str, TransactionRecord]  # The transactions out of flight in the order of eviction
+    _sizes: dict[str, int]
+    _match_ids: dict[str, TransactionRecord]
+    _pending: defaultdict[MatchKey, list[TransactionRecord]]
+    _reversible: defaultdict[ReversalKey, list[TransactionRecord]]
+    _keys: dict[str, tuple[MatchKey | None, ReversalKey | None]]
+    _match_fields: tuple[str, ...]
+    _reversal_fields: tuple[str, ...]
+    _on_remove: Callable[[TransactionRecord], None] | None
+    _on_evict: Callable[[TransactionRecord], None] | None
+
+    @property
+    def maxlen(self) -> int:
+        return self._maxlen
+
+    @maxlen.setter
+    def maxlen(self, maxlen: int):
+        self._maxlen = maxlen
+        self.evict()
+
+    @property
+    def memory_budget(self) -> int:  # Bytes
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, memory_budget: int):
+        self._memory_budget = memory_budget
+        self.evict()
+
+    @property
+    def retention_policy(self) -> RetentionPolicy:
+        return self._retention_policy
+
+    @retention_policy.setter
+    def retention_policy(self, retention_policy: RetentionPolicy):
+        self._retention_policy = RetentionPolicy(retention_policy)
+
+    @property
+    def on_remove(self) -> Callable[[TransactionRecord], None] | None:
+        return self._on_remove
+
+    @on_remove.setter
+    def on_remove(self, on_remove: Callable[[TransactionRecord], None] | None):
+        self._on_remove = on_remove
+
+    @property
+    def on_evict(self) -> Callable[[TransactionRecord], None] | None:
+        return self._on_evict
+
+    @on_evict.setter
+    def on_evict(self, on_evict: Callable[[TransactionRecord], None] | None):
+        self._on_evict = on_evict
+
+    @property
+    def memory_usage(self) -> int:  # Estimated bytes
+        return self._memory_usage
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def __init__(self, maxlen: int = 10000, memory_budget: int = 256 * 1024 * 1024,
+                 retention_policy: RetentionPolicy = RetentionPolicy.KEEP_ALL,
+                 on_remove: Callable[[TransactionRecord], None] | None = None,
+                 on_evict: Callable[[TransactionRecord], None] | None = None):
+
+        self._maxlen = maxlen
+        self._memory_budget = memory_budget
+        self.retention_policy = retention_policy
+        self._on_remove = on_remove
+        self._on_evict = on_evict
+        self.clear()
+
+    def clear(self) -> None:
+        self._transactions = dict()
+        self._in_flight = dict()
+        self._evictable = dict()
+        self._sizes = dict()
+        self._memory_usage = int()
+        self._match_ids = dict()
+        self._pending = defaultdict(list)
+        self._reversible = defaultdict(list)
+        self._keys = dict()
+        self._match_fields = self.spec.match_fields
+        self._reversal_fields = self.spec.reversal_fields
+
+    def __iter__(self) -> Iterator[TransactionRecord]:
+        return iter(list(self._transactions.values()))
+
+    def __len__(self) -> int:
+        return len(self._transactions)
+
+    def __contains__(self, transaction: TransactionRecord) -> bool:
+        return self._transactions.get(transaction.trans_id) is transaction
+
+    def append(self, transaction: TransactionRecord) -> None:
+        if self.get(transaction.trans_id):
+            self.remove(self.get(transaction.trans_id))
+
+        self._add(transaction)
+        self.evict()
+
+    def remove(self, transaction: TransactionRecord) -> None:
+        if transaction not in self:
+            return
+
+        self._drop(transaction)
+
+        if self._on_remove:
+            self._on_remove(transaction)
+
+    def release(self, transaction: TransactionRecord) -> None:  # The request is not in flight anymore, e.g. timed out
+        if self._in_flight.get(transaction.trans_id) is not transaction:
+            return
+
+        del self._in_flight[transaction.trans_id]
+        self._evictable[transaction.trans_id] = transaction
+        self.evict()
+
+    def evict(self) -> None:
+        while self._evictable and (len(self) > self.maxlen or self.memory_usage > self.memory_budget):
+            transaction: TransactionRecord = next(iter(self._evictable.values()))
+
+            self.remove(transaction)
+            self._evictions += 1
+
+            if self._on_evict:
+                self._on_evict(transaction)
+
+    def get(self, trans_id: str) -> TransactionRecord | None:
+        return self._transactions.get(trans_id)
+
+    def get_by_match_id(self, match_id: str) -> TransactionRecord | None:
+        return self._match_ids.get(match_id)
+
+    def set_matched(self, request: TransactionRecord, response: TransactionRecord) -> None:
+        if request in self:
+            match_key, reversal_key = self._keys[request.trans_id]
+            self._discard(self._pending, match_key, request)
+            self._keys[request.trans_id] = None, reversal_key
+
+        request.matched = True
+        response.matched = True
+        response.match_id = request.trans_id
+        request.match_id = response.trans_id
+
+        for transaction in request, response:
+            if transaction in self:
+                self._match_ids[transaction.match_id] = transaction
+
+        self.release(request)
+
+    def retain(self, request: TransactionRecord, response: TransactionRecord) -> None:  # Apply the retention policy
+        match self.retention_policy:
+            case RetentionPolicy.KEEP_ALL:
+                return
+
+            case RetentionPolicy.DROP_AFTER_MATCH:
+                self.remove(request)
+                self.remove(response)
+
+            case RetentionPolicy.SUMMARY_ONLY:
+                self._replace(request, self.get_summary)
+                self._replace(response, self.get_summary)
+
+            case RetentionPolicy.RAW_ONLY:
+                self._replace(request, self.get_raw)
+                self._replace(response, self.get_raw)
+
+    def find_request(self, response: TransactionRecord) -> TransactionRecord | None:
+        self.check_spec_fields()
+
+        key: MatchKey = (response.message_type, self._get_values(response, self._match_fields))
+
+        for request in self._pending.get(key, tuple()):
+            if not request.matched:
+                return request
+
+    def find_original(self, reversal: TransactionRecord) -> TransactionRecord | None:
+        self.check_spec_fields()
+
+        if (key := self.get_reversal_key(reversal)) is None:
+            return
+
+        for transaction in self._reversible.get(key, tuple()):
+            if not transaction.is_reversal:
+                return transaction
+
+    def get_request_match_key(self, request: TransactionRecord) -> MatchKey | None:
+        if not (response_mti := self.spec.get_resp_mti(request.message_type)):
+            return
+
+        return response_mti, self._get_values(request, self._match_fields)
+
+    def get_reversal_key(self, transaction: TransactionRecord) -> ReversalKey | None:
+        values: ReversalKey = self._get_values(transaction, self._reversal_fields)
+
+        if not all(values):
+            return
+
+        return values
+
+    def get_summary(self, transaction: TransactionRecord) -> TransactionRecord:
+        summary_fields: set[str] = {
+            *self._match_fields,
+            *self._reversal_fields,
+            self.spec.FIELD_SET.FIELD_004_TRANSACTION_AMOUNT,
+            self.spec.FIELD_SET.FIELD_038_AUTHORIZATION_ID_CODE,
+            self.spec.FIELD_SET.FIELD_039_AUTHORIZATION_RESPONSE_CODE,
+        }
+
+        data_fields = {field: data for field, data in transaction.data_fields.items() if field in summary_fields}
+
+        return transaction.copy(data_fields=data_fields)
+
+    @staticmethod
+    def get_raw(transaction: TransactionRecord) -> TransactionRecord:
+        try:
+            dump: bytes = Parser.create_dump(transaction)
+        except (ValueError, TypeError) as parsing_error:
+            logger.debug(f"Cannot keep transaction [{transaction.trans_id}] as raw message: {parsing_error}")
+            return transaction
+
+        return transaction.copy(data_fields=Parser.parse_record(dump, flat=True).data_fields)
+
+    def check_spec_fields(self) -> None:
+        if (self._match_fields, self._reversal_fields) == (self.spec.match_fields, self.spec.reversal_fields):
+            return
+
+        transactions: list[TransactionRecord] = list(self._transactions.values())
+        in_flight: set[str] = set(self._in_flight)
+
+        self.clear()
+
+        for transaction in transactions:
+            self._add(transaction, in_flight=transaction.trans_id in in_flight)
+
+    def estimate_size(self, transaction: TransactionRecord) -> int:
+        return self.TRANSACTION_OVERHEAD + self._get_fields_size(transaction.data_fields)
+
+    def _add(self, transaction: TransactionRecord, in_flight: bool | None = None) -> None:
+        if in_flight is None:
+            in_flight = bool(transaction.is_request and not transaction.matched)
+
+        self._transactions[transaction.trans_id] = transaction
+
+        if in_flight:
+            self._in_flight[transaction.trans_id] = transaction
+        else:
+            self._evictable[transaction.trans_id] = transaction
+
+        self._sizes[transaction.trans_id] = size = self.estimate_size(transaction)
+        self._memory_usage += size
+
+        if transaction.match_id:
+            self._match_ids[transaction.match_id] = transaction
+
+        match_key: MatchKey | None = None
+        reversal_key: ReversalKey | None = self.get_reversal_key(transaction)
+
+        if transaction.is_request and not transaction.matched:
+            match_key = self.get_request_match_key(transaction)
+
+        if match_key is not None:
+            self._pending[match_key].append(transaction)
+
+        if reversal_key is not None:
+            self._reversible[reversal_key].append(transaction)
+
+        self._keys[transaction.trans_id] = match_key, reversal_key
+
+    def _drop(self, transaction: TransactionRecord) -> None:
+        del self._transactions[transaction.trans_id]
+        self._in_flight.pop(transaction.trans_id, None)
+        self._evictable.pop(transaction.trans_id, None)
+        self._memory_usage -= self._sizes.pop(transaction.trans_id)
+        match_key, reversal_key = self._keys.pop(transaction.trans_id)
+
+        if transaction.match_id and self._match_ids.get(transaction.match_id) is transaction:
+            del self._match_ids[transaction.match_id]
+
+        self._discard(self._pending, match_key, transaction)
+        self._discard(self._reversible, reversal_key, transaction)
+
+    def _replace(self, transaction: TransactionRecord, convert: Callable[[TransactionRecord], TransactionRecord]):
+        if transaction not in self:
+            return
+
+        in_flight: bool = transaction.trans_id in self._in_flight
+
+        self._drop(transaction)
+        self._add(convert(transaction), in_flight=in_flight)
+
+    @classmethod
+    def _get_fields_size(cls, fields) -> int:
+        if isinstance(fields, LazyFieldSet):
+            return fields.nbytes + cls.FIELD_OVERHEAD * len(fields)
+
+        size: int = int()
+
+        for field_data in fields.values():
+            size += cls.FIELD_OVERHEAD
+
+            if isinstance(field_data, dict):
+                size += cls._get_fields_size(field_data)
+                continue
+
+            size += len(field_data)
+
+        return size
+
+    @staticmethod
+    def _get_values(transaction: TransactionRecord, fields: tuple[str, ...]) -> tuple[str | None, ...]:
+        data_fields = transaction.data_fields
+        return tuple(data_fields.get(field) for field in fields)
+
+    @staticmethod
+    def _discard(index: defaultdict, key, transaction: TransactionRecord) -> None:
+        if not (transactions := index.get(key)):
+            return
+
+        for position, item in enumerate(transactions):
+            if item is transaction:
+                del transactions[position]
+                break
+
+        if not transactions:
+            del index[key]
@@ -0,0 +1,248 @@
+from loguru import logger
+from typing import Callable
+from dataclasses import dataclass, field as dataclass_field
+from common.lib.data_models.EpaySpecificationModel import EpaySpecModel, IsoField, RawFieldSet
+from common.lib.data_models.Types import FieldPath
+from common.lib.enums.MessageLength import MessageLength
+
+
+"""
+
+ Compiled wire codec of the ISO specification
+
+ The codec is a flat table indexed by field number 1..128, each element holds everything the parser needs to encode or
+ decode the field: length prefix width, fixed length, complexity flag and the sub-codecs of the nested fields. The table
+ is built once from the EpaySpecModel and rebuilt by EpaySpecification each time the specification changes, so the
+ encoding and decoding do not walk the pydantic specification models for each field of each message
+
+ Do not build the codec directly, use EpaySpecification().codec to get the actual one
+
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class FieldCodec:
+    field_number: str
+    var_length: int = 0
+    max_length: int = 0
+    tag_length: int = 0
+    is_complex: bool = False
+    is_secret: bool = False
+    fields: dict[str, "FieldCodec"] = dataclass_field(default_factory=dict)
+
+    @classmethod
+    def from_spec(cls, field_spec: IsoField) -> "FieldCodec":
+        fields: dict[str, FieldCodec] = dict()
+
+        if field_spec.fields:
+            fields = {field: cls.from_spec(subfield_spec) for field, subfield_spec in field_spec.fields.items()}
+
+        return cls(
+            field_number=field_spec.field_number,
+            var_length=field_spec.var_length,
+            max_length=field_spec.max_length,
+            tag_length=field_spec.tag_length,
+            is_complex=bool(field_spec.fields),
+            is_secret=field_spec.is_secret,
+            fields=fields,
+        )
+
+
+VOID_FIELD: FieldCodec = FieldCodec(field_number=str())  # Stands for the fields, absent in the specification
+
+
+class WireCodec:
+    _table: tuple[FieldCodec | None, ...]
+    _fields: dict[str, FieldCodec]  # The same codecs by the field number string, no int conversion on each lookup
+
+    def __init__(self, spec: EpaySpecModel):
+        table: list[FieldCodec | None] = [None] * (MessageLength.SECOND_BITMAP_CAPACITY + 1)
+
+        for field, field_spec in spec.fields.items():
+            if not field.isdigit():
+                continue
+
+            if int(field) not in range(1, MessageLength.SECOND_BITMAP_CAPACITY + 1):
+                continue
+
+            table[int(field)] = FieldCodec.from_spec(field_spec)
+
+        self._table = tuple(table)
+        self._fields = {str(field): codec for field, codec in enumerate(table) if codec is not None}
+
+    def __getitem__(self, field_number: int) -> FieldCodec | None:
+        return self._table[field_number]
+
+    def get(self, field: str | int) -> FieldCodec | None:
+        if codec := self._fields.get(field):
+            return codec
+
+        try:
+            return self._table[int(field)]
+        except (ValueError, IndexError):
+            return
+
+    def get_field_codec(self, field_path: FieldPath) -> FieldCodec | None:
+        if not field_path:
+            return
+
+        if not (codec := self.get(field_path[int()])):
+            return
+
+        for field in field_path[1:]:
+            if not (codec := codec.fields.get(str(field))):
+                return
+
+        return codec
+
+    def is_field_complex(self, field: str | int) -> bool:
+        if not (codec := self.get(field)):
+            return False
+
+        return codec.is_complex
+
+    def encode_field(self, field: str, field_data: str | RawFieldSet) -> str:
+        codec: FieldCodec = self.get(field) or VOID_FIELD
+
+        if isinstance(field_data, dict):
+            field_data = self.join_complex_field([field], field_data)
+
+        if codec.var_length:
+            return f"{len(field_data):0{codec.var_length}}{field_data}"
+
+        return field_data
+
+    def encode_field_into(self, field: str, field_data: str | RawFieldSet, buffer: bytearray) -> None:
+        codec: FieldCodec = self.get(field) or VOID_FIELD
+
+        if isinstance(field_data, dict):
+            field_data = self.join_complex_field([field], field_data)
+
+        if codec.var_length:
+            field_data = str(len(field_data)).zfill(codec.var_length) + field_data
+
+        buffer += field_data.encode()
+
+    def decode_fields(self, data: str, fields) -> RawFieldSet:
+        decoded_fields: RawFieldSet = dict()
+        position: int = int()
+
+        for field in fields:
+            codec: FieldCodec = self._table[int(field)] or VOID_FIELD
+
+            if codec.var_length > 0:
+                length = int(data[position:position + codec.var_length])
+                position += codec.var_length
+            else:
+                length = codec.max_length
+
+            decoded_fields[field] = data[position:position + length]
+            position += length
+
+        return decoded_fields
+
+    def scan_fields(self, data: memoryview, fields) -> dict[str, tuple[int, int]]:
+        offsets: dict[str, tuple[int, int]] = dict()
+        position: int = int()
+
+        for field in fields:
+            codec: FieldCodec = self._table[int(field)] or VOID_FIELD
+
+            if codec.var_length > 0:
+                length = int(data[position:position + codec.var_length].tobytes())
+                position += codec.var_length
+            else:
+                length = codec.max_length
+
+            offsets[field] = (position, length)
+            position += length
+
+        return offsets
+
+    def join_complex_field(self, field_path: FieldPath, field_data: RawFieldSet, mask: Callable | None = None) -> str:
+        parts: list[str] = list()
+
+        self._join_into(self.get_field_codec(field_path), field_data, list(field_path), mask, parts)
+
+        return "".join(parts)
+
+    def _join_into(self, codec: FieldCodec | None, field_data: RawFieldSet, path: FieldPath, mask: Callable | None,
+                   parts: list[str]) -> int:
+
+        # Appends the subfields to the parts list, returns the length of the appended data. Nested fields reserve the
+        # slot of their header in the parts list and fill it in once their own length is known
+
+        subfields: dict[str, FieldCodec] = codec.fields if codec else dict()
+        length: int = int()
+        subfield_data: str | RawFieldSet
+        subfield: str
+
+        for subfield, subfield_data in field_data.items():
+            if not (subfield_codec := subfields.get(subfield)):
+                raise ValueError(f"Lost specification for field {'.'.join([*path, subfield])}")
+
+            if subfield_codec.is_complex and not isinstance(subfield_data, dict):
+                parts.append(subfield_data)
+                length += len(subfield_data)
+                continue
+
+            if subfield_codec.is_complex:
+                header_position: int = len(parts)
+                parts.append(str())
+                subfield_length: int = self._join_into(subfield_codec, subfield_data, [*path, subfield], mask, parts)
+                parts[header_position] = subfield + str(subfield_length).zfill(subfield_codec.var_length)
+                length += len(parts[header_position]) + subfield_length
+                continue
+
+            if subfield_codec.is_secret and mask is not None:
+                subfield_data = mask(subfield_data)
+
+            subfield_length: str = str(len(subfield_data)).zfill(subfield_codec.var_length)
+            parts += subfield, subfield_length, subfield_data
+            length += len(subfield) + len(subfield_length) + len(subfield_data)
+
+        return length
+
+    def split_complex_field(self, field: str, field_data: str) -> RawFieldSet | str:
+        if not ((codec := self.get(field)) and codec.is_complex and isinstance(field_data, str)):
+            return field_data
+
+        return self._split_from(codec, field, field_data, int(), len(field_data))
+
+    def _split_from(self, codec: FieldCodec, field: str, field_data: str, position: int, end: int) -> RawFieldSet:
+
+        # Reads the subfields from position to end of the field_data. The nested fields are split by the same cursor
+        # over the same string, so the field data is never resliced
+
+        complex_field_data: RawFieldSet = dict()
+
+        if position < end and not codec.tag_length:
+            logger.error(f"Lost specification for field {field}")
+            logger.error("The field and corresponding sub fields were absent")
+            return {}
+
+        tag_length: int = codec.tag_length
+        subfields: dict[str, FieldCodec] = codec.fields
+
+        while position < end:
+            if position + tag_length * 2 > end:
+                raise ValueError(f"Incomplete subfield header in field {field}")
+
+            tag_number: str = field_data[position:position + tag_length]
+            position += tag_length
+            val_length: int = int(field_data[position:position + tag_length])
+            position += tag_length
+            value_end: int = position + val_length
+
+            if value_end > end:
+                value_end = end
+
+            if (subfield_codec := subfields.get(tag_number)) and subfield_codec.is_complex:
+                complex_field_data[tag_number] = self._split_from(subfield_codec, tag_number, field_data, position,
+                                                                  value_end)
+            else:
+                complex_field_data[tag_number] = field_data[position:value_end]
+
+            position = value_end
+
+        return complex_field_data
@@ -52,7 +52,7 @@ class Validator:
     def validate_mti(self, mti, validation_result: ValidationResult):
         errors = validation_result.errors[ValidationTypes.MTI_VALIDATION]
 
-        if mti in self.spec.get_mti_codes():
+        if mti in self.spec.mti_codes:
             return validation_result
 
         errors.add(f"Unknown MTI: {mti}")
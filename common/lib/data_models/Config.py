@@ -1,5 +1,9 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, model_validator
 from common.lib.enums.Validation import ValidationMode
+from common.lib.enums.HeaderFormat import HeaderFormat
+from common.lib.enums.RetentionPolicy import RetentionPolicy
+from common.lib.enums.ConnectorType import ConnectorType
+from common.lib.enums.BalancingStrategy import BalancingStrategy
 
 
 class Host(BaseModel):
@@ -9,6 +13,10 @@ class Host(BaseModel):
     keep_alive_interval: int = 300
     header_length: int = 0
     header_length_exists: bool = True
+    header_format: HeaderFormat = HeaderFormat.BINARY
+    connector_type: ConnectorType = ConnectorType.QT
+    write_coalescing: bool = False  # Gather the outgoing messages and write them at once
+    write_coalescing_budget_us: int = 200  # The longest wait of a gathered message before the write
 
 
 class Terminal(BaseModel):
@@ -17,6 +25,7 @@ class Terminal(BaseModel):
     load_remote_spec: bool = False
     show_license_dialog: bool = True
     run_api: bool = False
+    lazy_parsing: bool = False  # The incoming records are not validated, complex fields are split when read
 
 
 class Debug(BaseModel):
@@ -52,6 +61,8 @@ class Fields(BaseModel):
     send_internal_id: bool = True
     json_mode: bool = True
     hide_secrets: bool = True
+    sequence_partition: int = 0  # Part of the STAN, RRN and transaction ID sequences used by this process
+    sequence_partitions: int = 1  # Parallel processes, each one uses its own partition
 
     @field_validator("max_amount", mode='before')
     @classmethod
@@ -61,6 +72,13 @@ class Fields(BaseModel):
 
         return int(max_amount)
 
+    @model_validator(mode="after")
+    def validate_sequence_partition(self):
+        if not int() <= self.sequence_partition < self.sequence_partitions:
+            raise ValueError("Sequence partition must be from zero to the number of the sequence partitions")
+
+        return self
+
 
 class Specification(BaseModel):
     rewrite_local_spec: bool = False
@@ -72,6 +90,37 @@ class Specification(BaseModel):
     backup_on_shutdown: bool = False
 
 
+class Storage(BaseModel):
+    max_transactions: int = 10000
+    memory_budget_mb: int = 256
+    retention_policy: RetentionPolicy = RetentionPolicy.KEEP_ALL
+    journal_enabled: bool = False
+    journal_segment_size_mb: int = 64
+    journal_max_segments: int = 10
+    journal_fsync_interval_ms: int = 1000
+
+
+class Pool(BaseModel):
+    size: int = 1
+    hosts: list[str] = list()  # Additional "host:port" addresses, the connections are spread over all the hosts
+    balancing: BalancingStrategy = BalancingStrategy.ROUND_ROBIN
+    health_check_interval_seconds: int = 5
+    max_in_flight: int = 0  # Requests waiting for the response per connection, zero is unlimited
+    max_pending: int = 10000  # Requests waiting for a free slot of the in-flight window
+
+    @field_validator("size", mode="after")
+    @classmethod
+    def validate_size(cls, size: int):
+        if size < 1:
+            raise ValueError("Connection pool size must be at least 1")
+
+        return size
+
+
+class Metrics(BaseModel):
+    latency_interval_seconds: int = 0  # The latency percentiles are reset each interval, zero is the manual reset only
+
+
 class ApiModel(BaseModel):
     address: str | None = "0.0.0.0"
     port: int = 7777
@@ -79,6 +128,7 @@ class ApiModel(BaseModel):
     waiting_timeout_seconds: int = 10
     hide_secrets: bool = False
     parse_subfields: bool = False
+    reject_when_window_full: bool = False  # Return HTTP 429 instead of queueing the request
 
     @field_validator("address", mode="before")
     @classmethod
@@ -97,6 +147,9 @@ class Config(BaseModel):
     fields: Fields | None = None
     specification: Specification = Specification()
     api: ApiModel = ApiModel()
+    storage: Storage = Storage()
+    pool: Pool = Pool()
+    metrics: Metrics = Metrics()
 
     @field_validator("host", "api", mode="after")
     @classmethod
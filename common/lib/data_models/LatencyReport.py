@@ -0,0 +1,21 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class LatencyStats(BaseModel):
+    count: int = 0
+    min_ms: float = float()
+    mean_ms: float = float()
+    p50_ms: float = float()
+    p90_ms: float = float()
+    p99_ms: float = float()
+    p99_9_ms: float = float()
+    max_ms: float = float()
+
+
+class LatencyReport(BaseModel):
+    interval_started: datetime | None = None
+    interval_seconds: float = float()  # Time passed since the interval start
+    total: LatencyStats = LatencyStats()
+    by_message_type: dict[str, LatencyStats] = dict()
+    by_response_code: dict[str, LatencyStats] = dict()
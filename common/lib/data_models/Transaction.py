@@ -1,18 +1,19 @@
-from random import randint
 from datetime import datetime
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, field_serializer, ConfigDict
 from pydantic_core import PydanticCustomError
 from common.lib.core.EpaySpecification import EpaySpecification
+from common.lib.core.SequenceAllocator import SequenceAllocator
 from common.lib.data_models.Enums import generated_field
 from common.lib.enums.MessageLength import MessageLength
 
 
 spec: EpaySpecification = EpaySpecification()
 TypeFields = dict[str, str | dict]
+trans_id_sequence: SequenceAllocator = SequenceAllocator(width=4, first=1000)  # The IDs of one microsecond differ
 
 
 def generate_trans_id():
-    return f"{datetime.now():%Y%m%d_%H%M%S_%f}{randint(1000, 9999)}"
+    return f"{datetime.now():%Y%m%d_%H%M%S_%f}{trans_id_sequence.allocate()}"
 
 
 class Transaction(BaseModel):
@@ -79,7 +80,7 @@ class Transaction(BaseModel):
         if not mti.isdigit():
             raise PydanticCustomError("Wrong MTI value", f"Wrong MTI value {mti}. MTI must contain digits only")
 
-        if mti not in spec.get_mti_codes():
+        if mti not in spec.mti_codes:
             raise PydanticCustomError("MTI does not exist",
                                       f"No specification for MTI {mti}. Correct MTI or set it in Specification Window")
 
@@ -104,6 +105,13 @@ class Transaction(BaseModel):
 
         return fields
 
+    @field_serializer("data_fields")
+    def serialize_data_fields(self, fields: TypeFields) -> TypeFields:
+        if isinstance(fields, dict):
+            return fields
+
+        return dict(fields)  # Lazy decoded fields, see Parser.parse_dump
+
 
 class OldTransaction(BaseModel):
     id: str = Field(default_factory=generate_trans_id)
@@ -0,0 +1,125 @@
+from datetime import datetime
+from common.lib.data_models.Transaction import Transaction, TypeFields, generate_trans_id
+
+
+"""
+
+ Internal transaction record of the hot path
+
+ A plain __slots__ object with the same attributes as the Transaction model. The parser, the receive pipeline, the
+ transaction queue and its store, scheduler and journal work with the records, so the status updates of the queue
+ (matched, match_id, success, utrnno, etc.) are simple attribute writes with no validation
+
+ The pydantic Transaction is materialized only at the boundaries: the queue signals, the API, the files and the GUI.
+ The Transaction is built the way of model_construct, the record data is not validated again. The data fields
+ dictionary is not copied, the record and the materialized transaction share it. The lazy fields are materialized to
+ a dictionary, so the consumers never get the LazyFieldSet and its message buffer
+
+ The wire_data is the ready message of the compiled template, see CompiledTemplate. The queue sends it as is instead
+ of encoding the data fields. It is not a Transaction attribute and is not materialized
+
+ Usage example
+
+ record = TransactionRecord.from_transaction(transaction)  # Validated at the boundary
+ record.matched = True
+ transaction = record.to_transaction()
+
+"""
+
+
+class TransactionRecord:
+    __slots__ = (
+        "trans_id",
+        "message_type",
+        "data_fields",
+        "max_amount",
+        "generate_fields",
+        "json_fields",
+        "match_id",
+        "utrnno",
+        "matched",
+        "success",
+        "error",
+        "resp_time_seconds",
+        "sending_time",
+        "is_request",
+        "is_reversal",
+        "is_keep_alive",
+        "wire_data",
+    )
+
+    TRANSACTION_ATTRIBUTES = __slots__[:-1]  # Shared with the Transaction model
+    FIELDS_SET = frozenset(TRANSACTION_ATTRIBUTES)
+
+    trans_id: str
+    message_type: str
+    data_fields: TypeFields
+    max_amount: int
+    generate_fields: list[str]
+    json_fields: list[str]
+    match_id: str | None
+    utrnno: str | None
+    matched: bool | None
+    success: bool | None
+    error: str | None
+    resp_time_seconds: float | None
+    sending_time: datetime | None
+    is_request: bool | None
+    is_reversal: bool | None
+    is_keep_alive: bool
+    wire_data: bytes | None
+
+    def __init__(self, message_type: str, data_fields: TypeFields, trans_id: str | None = None, max_amount: int = 100,
+                 generate_fields: list[str] | None = None, json_fields: list[str] | None = None,
+                 match_id: str | None = None, utrnno: str | None = None, matched: bool | None = None,
+                 success: bool | None = None, error: str | None = None, resp_time_seconds: float | None = None,
+                 sending_time: datetime | None = None, is_request: bool | None = None,
+                 is_reversal: bool | None = None, is_keep_alive: bool = False, wire_data: bytes | None = None):
+
+        self.trans_id = trans_id or generate_trans_id()
+        self.message_type = message_type
+        self.data_fields = data_fields
+        self.max_amount = max_amount
+        self.generate_fields = list() if generate_fields is None else generate_fields
+        self.json_fields = list() if json_fields is None else json_fields
+        self.match_id = match_id
+        self.utrnno = utrnno
+        self.matched = matched
+        self.success = success
+        self.error = error
+        self.resp_time_seconds = resp_time_seconds
+        self.sending_time = sending_time
+        self.is_request = is_request
+        self.is_reversal = is_reversal
+        self.is_keep_alive = is_keep_alive
+        self.wire_data = wire_data
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(trans_id={self.trans_id!r}, message_type={self.message_type!r})"
+
+    @classmethod
+    def from_transaction(cls, transaction: Transaction) -> "TransactionRecord":
+        return cls(**{attribute: getattr(transaction, attribute) for attribute in cls.TRANSACTION_ATTRIBUTES})
+
+    def to_transaction(self) -> Transaction:
+        # The same as Transaction.model_construct with all the fields set. The model has no extra and private
+        # attributes, so its state is the fields dictionary only, the per-field lookups of model_construct are skipped
+
+        fields: dict = self.as_dict()
+
+        if not isinstance(self.data_fields, dict):  # LazyFieldSet
+            fields["data_fields"] = dict(self.data_fields)
+
+        transaction: Transaction = Transaction.__new__(Transaction)
+        object.__setattr__(transaction, "__dict__", fields)
+        object.__setattr__(transaction, "__pydantic_fields_set__", set(self.FIELDS_SET))
+        object.__setattr__(transaction, "__pydantic_extra__", None)
+        object.__setattr__(transaction, "__pydantic_private__", None)
+
+        return transaction
+
+    def as_dict(self) -> dict:
+        return {attribute: getattr(self, attribute) for attribute in self.TRANSACTION_ATTRIBUTES}
+
+    def copy(self, **changes) -> "TransactionRecord":
+        return self.__class__(**(self.as_dict() | changes))
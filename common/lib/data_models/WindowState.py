@@ -0,0 +1,15 @@
+from pydantic import BaseModel, computed_field
+
+
+class WindowState(BaseModel):
+    capacity: int = 0  # Zero is an unlimited window
+    in_flight: int = 0
+    pending: int = 0
+
+    @computed_field
+    @property
+    def occupancy(self) -> float:  # Percent of the busy slots
+        if not self.capacity:
+            return float()
+
+        return round(self.in_flight / self.capacity * 100, 2)
@@ -0,0 +1,6 @@
+from enum import StrEnum
+
+
+class ConnectorType(StrEnum):
+    QT = "qt"
+    ASYNCIO = "asyncio"
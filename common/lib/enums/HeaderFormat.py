@@ -0,0 +1,6 @@
+from enum import StrEnum
+
+
+class HeaderFormat(StrEnum):
+    BINARY = "binary"
+    ASCII = "ascii"
@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class RetentionPolicy(StrEnum):
+    KEEP_ALL = "keep_all"
+    DROP_AFTER_MATCH = "drop_after_match"
+    SUMMARY_ONLY = "summary_only"
+    RAW_ONLY = "raw_only"
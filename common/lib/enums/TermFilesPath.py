@@ -13,6 +13,7 @@ class TermDirs(StrEnum):
     DICTIONARY_DIR = f"{DATA_DIR}/dictionary"
     API_TRANSACTIONS = f"{DATA_DIR}/api_transactions"
     POSTMAN = f"{DATA_DIR}/postman"
+    JOURNAL_DIR = f"{DATA_DIR}/journal"
 
 
 class TermFiles(StrEnum):
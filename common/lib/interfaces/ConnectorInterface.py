@@ -1,3 +1,4 @@
+from time import sleep
 from abc import abstractmethod, ABCMeta
 
 
@@ -68,3 +69,12 @@ class ConnectionInterface(metaclass=ABCMeta):
     @abstractmethod
     def is_connected(self):
         ...
+
+    def wait_for_events(self, seconds: float) -> None:  # The connectors with their own event loop run it meanwhile
+        sleep(seconds)
+
+    def release_transaction(self, trans_id: str) -> None:  # The request got the response, timed out or failed
+        ...
+
+    def get_connections_number(self) -> int:
+        return 1
@@ -0,0 +1,943 @@
+from sys import argv
+from socket import socket
+from threading import Thread, Event
+from time import perf_counter
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from copy import deepcopy
+from types import SimpleNamespace
+from loguru import logger
+from binascii import a2b_hex, b2a_hex
+from timeit import repeat
+from tracemalloc import start as start_tracing, stop as stop_tracing, reset_peak, get_traced_memory
+from typing import Callable
+from PyQt6.QtCore import QCoreApplication, QTimer, QThread, QEventLoop, QObject, pyqtSignal
+from common.lib.core.EpaySpecification import EpaySpecification
+from common.lib.core.Parser import Parser
+from common.lib.core.LogPrinter import LogPrinter
+from common.lib.core.WireCodec import FieldCodec
+from common.lib.core.Bitmap import Bitmap
+from common.lib.core.LazyFieldSet import LazyFieldSet
+from common.lib.core.FrameDecoder import FrameDecoder
+from common.lib.core.ReceivePipeline import ReceivePipeline
+from common.lib.core.TransactionStore import TransactionStore
+from common.lib.core.TimeoutScheduler import TimeoutScheduler
+from common.lib.core.TransactionJournal import TransactionJournal, RecordType
+from common.lib.core.Connector import Connector
+from common.lib.core.FieldsGenerator import FieldsGenerator
+from common.lib.core.CompiledTemplate import CompiledTemplate
+from common.gui.core.ConnectionThread import ConnectionThread
+from common.lib.data_models.Transaction import Transaction, generate_trans_id
+from common.lib.data_models.TransactionRecord import TransactionRecord
+from common.lib.data_models.Config import Config
+from common.lib.data_models.EpaySpecificationModel import RawFieldSet, FieldSet, IsoField
+from common.lib.enums.TermFilesPath import TermFilesPath
+from common.lib.enums.MessageLength import MessageLength
+
+
+"""
+Signal performance micro-benchmarks
+
+Each benchmark compares the legacy way of data processing with the current one and prints the time of one operation
+in microseconds. The legacy implementations are kept here as a reference only, do not use them in the application code
+
+
+How to run the benchmarks
+
+Run the command from the base directory, where signal.exe is
+
+python -m common.lib.toolkit.benchmark  # Run all the benchmarks
+
+python -m common.lib.toolkit.benchmark wire_codec  # Run the listed benchmarks only
+
+"""
+
+
+spec: EpaySpecification = EpaySpecification()
+
+
+def measure(function: Callable, number: int = 10_000) -> float:
+    return min(repeat(function, number=number, repeat=3)) / number
+
+
+def report(title: str, legacy: float | None, current: float) -> None:
+    if legacy is None:  # No legacy implementation to compare with
+        print(f"{title:<48} legacy {'-':>10}    | current {current * 1e6:10.2f} µs |")
+        return
+
+    print(f"{title:<48} legacy {legacy * 1e6:10.2f} µs | current {current * 1e6:10.2f} µs | x{legacy / current:.1f}")
+
+
+def load_transaction(filename: str = TermFilesPath.DEFAULT_FILE, flat: bool = True) -> Transaction:
+    with open(filename) as json_file:
+        transaction: Transaction = Transaction.model_validate_json(json_file.read())
+
+    transaction: Transaction = Parser.parse_complex_fields(transaction, split=False)
+
+    if flat:
+        return transaction
+
+    return Parser.parse_complex_fields(transaction, split=True)
+
+
+def build_complex_field(field: str, max_length: int = 999) -> RawFieldSet:  # Fill all the subfields up to max_length
+    field_data: RawFieldSet = dict()
+    length: int = int()
+
+    for subfield, subfield_spec in spec.get_field_spec([field]).fields.items():
+        if subfield_spec.fields:
+            continue
+
+        value: str = "9" * min(subfield_spec.max_length, 5)
+        length += len(subfield) + subfield_spec.var_length + len(value)
+
+        if length > max_length:
+            break
+
+        field_data[subfield] = value
+
+    return field_data
+
+
+def legacy_encode_body(fields: RawFieldSet) -> str:
+    body: str = str()
+
+    for field in sorted(fields, key=int):
+        text = fields[field]
+
+        if field_length_var := spec.get_field_length_var(field):
+            text = f"{str(len(text)).zfill(field_length_var)}{text}"
+
+        body = body + text
+
+    return body
+
+
+def legacy_decode_body(data: str, fields: list[str]) -> RawFieldSet:
+    decoded_fields: RawFieldSet = dict()
+    position: int = int()
+
+    for field in fields:
+        if (length_var := spec.get_field_length_var(field)) > 0:
+            length = int(data[position:position + length_var])
+            position += length_var
+        else:
+            length = spec.get_field_length(field)
+
+        decoded_fields[field] = data[position:position + length]
+        position += length
+
+    return decoded_fields
+
+
+def legacy_join_complex_field(field: str, field_data: RawFieldSet, path: list[str] | None = None) -> str:
+    if not isinstance(field_data, dict):
+        return field_data
+
+    if path is None:
+        path = [field]
+
+    result: str = str()
+
+    for subfield, subfield_data in field_data.items():
+        path.append(subfield)
+        subfield_spec = spec.get_field_spec(path)
+
+        if subfield_spec.fields:
+            result += legacy_join_complex_field(subfield, subfield_data, path)
+        else:
+            result = f"{result}{subfield}{str(len(subfield_data)).zfill(subfield_spec.var_length)}{subfield_data}"
+
+        path.pop()
+
+    if len(path) > 1:
+        result = f"{field}{len(result):0{spec.get_field_spec(path).var_length}}{result}"
+
+    return result
+
+
+def legacy_split_complex_field(field: str, field_data: str, field_spec: FieldCodec | None = None) -> RawFieldSet:
+    if field_spec is None:
+        field_spec = spec.codec.get(field)
+
+    complex_field_data: RawFieldSet = dict()
+
+    while field_data:
+        tag_number = field_data[:field_spec.tag_length]
+        field_data = field_data[field_spec.tag_length:]
+        val_length = int(field_data[:field_spec.tag_length])
+        field_data = field_data[field_spec.tag_length:]
+        value_data = field_data[:val_length]
+        field_data = field_data[val_length:]
+
+        if (subfield_spec := field_spec.fields.get(tag_number)) and subfield_spec.is_complex:
+            value_data = legacy_split_complex_field(tag_number, value_data, subfield_spec)
+
+        complex_field_data[tag_number] = value_data
+
+    return complex_field_data
+
+
+def legacy_create_dump(transaction: Transaction) -> bytes:
+    msg_body: bytes = bytes()
+
+    for field in sorted(transaction.data_fields.keys(), key=int):
+        text = legacy_join_complex_field(field, transaction.data_fields[field])
+
+        if field_length_var := spec.get_field_length_var(field):
+            text = f"{str(len(text)).zfill(field_length_var)}{text}"
+
+        msg_body = msg_body + text.encode()
+
+    return transaction.message_type.encode() + legacy_bitmap_encode(transaction.data_fields) + msg_body
+
+
+def legacy_bitmap_encode(fields: RawFieldSet) -> bytes:
+    bitmap: dict[str, bool] = {spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY: False, **dict.fromkeys(spec.fields, False)}
+
+    for field, field_data in fields.items():
+        bitmap[field] = bool(field_data)
+
+        if int(field) > MessageLength.FIRST_BITMAP_CAPACITY:
+            bitmap[spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY] = True
+
+    bitmap = {field: bitmap[field] for field in sorted(bitmap, key=int)}
+    bits: str = "".join(str(int(exists)) for exists in bitmap.values())
+
+    if not bitmap[spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY]:
+        bits = bits[:MessageLength.FIRST_BITMAP_CAPACITY]
+
+    return a2b_hex(hex(int(bits, 2))[2:].upper().zfill(len(bits) // 4))
+
+
+def legacy_bitmap_decode(bitmap_data: bytes) -> list[str]:
+    bits: str = bin(int(b2a_hex(bitmap_data), 16))[2:].zfill(len(bitmap_data) * 8)
+    bitmap: dict[str, bool] = {spec.FIELD_SET.FIELD_001_BITMAP_SECONDARY: False, **dict.fromkeys(spec.fields, False)}
+
+    for position, bit in enumerate(bits, start=1):
+        bitmap[str(position)] = bool(int(bit))
+
+    bitmap = {field: bitmap[field] for field in sorted(bitmap, key=int)}
+
+    return [field for field, exists in bitmap.items() if exists]
+
+
+def legacy_get_field_validations(field_path: list[str], parent=None):
+    if parent is None:
+        parent = spec.spec.fields
+
+    for field, field_data in parent.items():
+        if field_data.field_path == field_path:
+            return field_data.validators
+
+        if field_data.fields:
+            if validation := legacy_get_field_validations(field_path=field_path, parent=field_data.fields):
+                return validation
+
+
+def legacy_get_field_spec(field_path: list[str]) -> IsoField | None:
+    field_spec = spec.spec
+
+    for field in field_path:
+        try:
+            field_spec = field_spec.fields.get(str(field))
+        except AttributeError:
+            return
+
+    return field_spec
+
+
+def legacy_is_field_complex(field_path: list[str]) -> bool:
+    field_spec = spec.spec
+
+    for field in field_path:
+        if not (field_spec := field_spec.fields.get(str(field))):
+            return False
+
+    return bool(field_spec.fields)
+
+
+def legacy_get_field_description(field_path: list[str], string: bool = False) -> str | list[str]:
+    description: list[str] = list()
+    spec_fields: FieldSet = deepcopy(spec.spec.fields)
+
+    for field in field_path:
+        if not (field_spec := spec_fields.get(field)):
+            break
+
+        description.append(field_spec.description)
+
+        if not (spec_fields := field_spec.fields):
+            break
+
+    if not string:
+        return description
+
+    return " / ".join(description)
+
+
+def legacy_get_mti_codes() -> list[str]:
+    message_type_identifiers: set[str] = set()
+
+    for message_type in spec.spec.mti:
+        [message_type_identifiers.add(mti) for mti in (message_type.request, message_type.response)]
+
+    return list(message_type_identifiers)
+
+
+def legacy_get_resp_mti(request_mti: str) -> str | None:
+    for message_type_identifier in spec.spec.mti:
+        if message_type_identifier.request != request_mti:
+            continue
+
+        return message_type_identifier.response
+
+
+def legacy_read_frames(data: bytes, header_length: int = 2) -> list[bytes]:
+    frames: list[bytes] = list()
+
+    while len(data) >= header_length:
+        message_length = int.from_bytes(data[:header_length], "big")
+
+        if len(data) < header_length + message_length:
+            break
+
+        frames.append(data[:header_length + message_length])
+        data = data[header_length + message_length:]
+
+    return frames
+
+
+def bench_wire_codec() -> None:
+    fields: RawFieldSet = load_transaction().data_fields
+    field_numbers: list[str] = sorted(fields, key=int)
+    body: str = legacy_encode_body(fields)
+
+    def encode_body():
+        return "".join(spec.codec.encode_field(field, fields[field]) for field in field_numbers)
+
+    assert encode_body() == body
+    assert spec.codec.decode_fields(body, field_numbers) == legacy_decode_body(body, field_numbers)
+
+    report("Wire codec: encode message body", measure(lambda: legacy_encode_body(fields)), measure(encode_body))
+
+    report(
+        "Wire codec: decode message body",
+        measure(lambda: legacy_decode_body(body, field_numbers)),
+        measure(lambda: spec.codec.decode_fields(body, field_numbers))
+    )
+
+
+def bench_create_dump() -> None:
+    transaction: Transaction = load_transaction(flat=False)
+    buffer: bytearray = bytearray()
+
+    def create_dump_into():
+        buffer.clear()
+        return Parser.create_dump_into(transaction, buffer)
+
+    assert Parser.create_dump(transaction) == legacy_create_dump(transaction)
+
+    report("Create dump: whole message", measure(lambda: legacy_create_dump(transaction)), measure(create_dump_into))
+
+    report(
+        "Create dump: join complex field DE047",
+        measure(lambda: legacy_join_complex_field("47", transaction.data_fields["47"])),
+        measure(lambda: Parser.join_complex_field("47", transaction.data_fields["47"]))
+    )
+
+    de048: RawFieldSet = build_complex_field("48")
+
+    assert Parser.join_complex_field("48", de048) == legacy_join_complex_field("48", de048)
+
+    report(
+        f"Create dump: join {len(de048)} subfields of DE048",
+        measure(lambda: legacy_join_complex_field("48", de048)),
+        measure(lambda: Parser.join_complex_field("48", de048))
+    )
+
+
+def bench_lazy_parse_dump() -> None:
+    transaction: Transaction = load_transaction()
+    transaction.data_fields["48"] = Parser.join_complex_field("48", build_complex_field("48"))
+    dump: bytes = Parser.create_dump(transaction)
+    read_fields: list[str] = spec.get_match_fields() + [spec.FIELD_SET.FIELD_039_AUTHORIZATION_RESPONSE_CODE]
+    field_numbers: list[str] = sorted(transaction.data_fields, key=int)
+    body: memoryview = memoryview(Parser.create_dump(transaction, body=True).encode())
+
+    def read(fields):
+        [fields.get(field) for field in read_fields]
+        return Parser.get_field_data(fields, spec.utrnno_path)
+
+    def receive(lazy: bool, flat: bool = True):
+        return read(Parser.parse_dump(dump, flat=flat, lazy=lazy).data_fields)
+
+    def decode_body():  # The lazy scan is used for the split complex fields only, the flat ones are decoded at once
+        fields: RawFieldSet = spec.codec.decode_fields(bytes(body).decode(), field_numbers)
+
+        for field in fields:
+            if spec.codec.is_field_complex(field):
+                fields[field] = spec.codec.split_complex_field(field, fields[field])
+
+        return read(fields)
+
+    def scan_body():
+        return read(LazyFieldSet(spec.codec, body, spec.codec.scan_fields(body, field_numbers), split=True))
+
+    assert receive(lazy=False) == receive(lazy=True)
+    assert decode_body() == scan_body()
+
+    report("Parse dump: split body and receive path reads", measure(decode_body), measure(scan_body))
+    report(
+        "Parse dump: whole message and receive path reads",
+        measure(lambda: receive(lazy=False)),
+        measure(lambda: receive(lazy=True))
+    )
+
+    report(
+        "Parse dump: split complex fields and reads",
+        measure(lambda: receive(lazy=False, flat=False)),
+        measure(lambda: receive(lazy=True, flat=False))
+    )
+
+
+def bench_split_complex_field() -> None:
+    de047: str = Parser.join_complex_field("47", load_transaction(flat=False).data_fields["47"])
+
+    assert legacy_split_complex_field("47", de047) == Parser.split_complex_field("47", de047)
+
+    report(
+        f"Split complex field: DE047 {len(de047)} bytes",
+        measure(lambda: legacy_split_complex_field("47", de047)),
+        measure(lambda: Parser.split_complex_field("47", de047))
+    )
+
+    for field in "47", "48":
+        field_data: str = Parser.join_complex_field(field, build_complex_field(field))
+
+        assert legacy_split_complex_field(field, field_data) == Parser.split_complex_field(field, field_data)
+
+        report(
+            f"Split complex field: DE{field:0>3} {len(field_data)} bytes",
+            measure(lambda: legacy_split_complex_field(field, field_data)),
+            measure(lambda: Parser.split_complex_field(field, field_data))
+        )
+
+
+def bench_bitmap() -> None:  # The current bitmap is measured on 1M operations
+    fields: RawFieldSet = load_transaction().data_fields
+    bitmap_data: bytes = Bitmap.from_fields(fields).to_bytes()
+
+    assert legacy_bitmap_encode(fields) == bitmap_data
+    assert legacy_bitmap_decode(bitmap_data) == list(Bitmap.from_bytes(bitmap_data))
+
+    report(
+        "Bitmap: encode",
+        measure(lambda: legacy_bitmap_encode(fields)),
+        measure(lambda: Bitmap.from_fields(fields).to_bytes(), number=1_000_000)
+    )
+
+    report(
+        "Bitmap: decode",
+        measure(lambda: legacy_bitmap_decode(bitmap_data)),
+        measure(lambda: list(Bitmap.from_bytes(bitmap_data)), number=1_000_000)
+    )
+
+
+def bench_spec_index() -> None:
+    field_path: list[str] = spec.utrnno_path
+
+    assert legacy_get_field_validations(field_path) == spec.get_field_validations(field_path)
+    assert legacy_is_field_complex(field_path) == spec.is_field_complex(field_path)
+
+    report(
+        f"Spec index: field validations {'.'.join(field_path)}",
+        measure(lambda: legacy_get_field_validations(field_path)),
+        measure(lambda: spec.get_field_validations(field_path))
+    )
+
+    report(
+        f"Spec index: is field complex {'.'.join(field_path)}",
+        measure(lambda: legacy_is_field_complex(field_path)),
+        measure(lambda: spec.is_field_complex(field_path))
+    )
+
+
+def bench_field_description() -> None:
+    field_path: list[str] = spec.utrnno_path
+
+    assert legacy_get_field_description(field_path, string=True) == spec.get_field_description(field_path, string=True)
+
+    report(
+        f"Field description: {'.'.join(field_path)}",
+        measure(lambda: legacy_get_field_description(field_path, string=True), number=100),
+        measure(lambda: spec.get_field_description(field_path, string=True))
+    )
+
+    with open(TermFilesPath.CONFIG) as json_file:
+        config: Config = Config.model_validate_json(json_file.read())
+
+    config.debug.print_description = True
+    config.debug.parse_subfields = True
+    log_printer: LogPrinter = LogPrinter(config)
+    log_printer.config = config
+    transaction: Transaction = load_transaction()
+
+    legacy_spec = SimpleNamespace(get_field_spec=legacy_get_field_spec, is_field_complex=legacy_is_field_complex)
+
+    def print_transaction():
+        log_printer.print_transaction(transaction, level=lambda message: None)
+
+    logger.disable("common")  # Measure the printing, not the log output
+
+    try:
+        log_printer.spec = legacy_spec  # The same printer with the spec tree walks it used before the index
+        legacy: float = measure(print_transaction, number=1000)
+        del log_printer.spec
+
+        report("Log printer: print_transaction with descriptions", legacy, measure(print_transaction, number=1000))
+
+    finally:
+        vars(log_printer).pop("spec", None)
+        logger.enable("common")
+
+
+def bench_mti_tables() -> None:
+    request_mti: str = spec.spec.mti[-1].request
+
+    assert legacy_get_resp_mti(request_mti) == spec.get_resp_mti(request_mti)
+
+    report(
+        "MTI tables: MTI is known",
+        measure(lambda: request_mti in legacy_get_mti_codes()),
+        measure(lambda: request_mti in spec.mti_codes)
+    )
+
+    report(
+        f"MTI tables: response MTI for {request_mti}",
+        measure(lambda: legacy_get_resp_mti(request_mti)),
+        measure(lambda: spec.get_resp_mti(request_mti))
+    )
+
+
+def bench_frame_decoder() -> None:
+    body: bytes = Parser.create_dump(load_transaction())
+    data: bytes = (len(body).to_bytes(2, "big") + body) * 500
+
+    assert len(legacy_read_frames(data)) == len(FrameDecoder().decode(data)) == 500
+
+    report(
+        "Frame decoder: 500 pipelined frames",
+        measure(lambda: legacy_read_frames(data), number=100),
+        measure(lambda: FrameDecoder().decode(data), number=100)
+    )
+
+
+def bench_receive_pipeline() -> None:
+    body: bytes = Parser.create_dump(load_transaction())
+    data: bytes = len(body).to_bytes(2, "big") + body
+
+    with open(TermFilesPath.CONFIG) as json_file:
+        pipeline: ReceivePipeline = ReceivePipeline(Config.model_validate_json(json_file.read()))
+
+    frame_decoder: FrameDecoder = FrameDecoder()  # The connector's one
+
+    def legacy_receive():  # Each incoming message used to read the configuration file
+        with open(TermFilesPath.CONFIG) as config_file:
+            config: Config = Config.model_validate_json(config_file.read())
+
+        header_length: int = config.host.header_length if config.host.header_length_exists else int()
+
+        frames: list[bytes] = legacy_read_frames(data)
+
+        return [Parser.parse_dump(memoryview(frame)[header_length:], flat=True, lazy=True) for frame in frames]
+
+    def receive():
+        return pipeline.parse_frames(frame_decoder.decode(data))
+
+    assert len(legacy_receive()) == len(receive()) == 1
+
+    report("Receive pipeline: one message", measure(legacy_receive, number=1000), measure(receive, number=1000))
+
+    response: Transaction = load_transaction()
+    response.message_type = spec.get_resp_mti(response.message_type)
+    response.data_fields[spec.FIELD_SET.FIELD_039_AUTHORIZATION_RESPONSE_CODE] = "00"
+    frames: list[bytes] = [Parser.create_dump(response)]
+    read_fields: list[str] = spec.get_match_fields() + [spec.FIELD_SET.FIELD_039_AUTHORIZATION_RESPONSE_CODE]
+
+    def queue_receive(lazy: bool):  # The reads of the transaction queue, then the model of the incoming signal
+        pipeline.lazy = lazy
+        record: TransactionRecord = pipeline.parse_frames(frames)[int()]
+        [record.data_fields.get(field) for field in read_fields]
+        Parser.get_field_data(record.data_fields, spec.utrnno_path)
+
+        return record.to_transaction()
+
+    report(
+        "Receive pipeline: queue path, eager vs lazy",
+        measure(lambda: queue_receive(lazy=False), number=5000),
+        measure(lambda: queue_receive(lazy=True), number=5000)
+    )
+
+
+def legacy_find_request(queue: list[TransactionRecord], response: TransactionRecord) -> TransactionRecord | None:
+    for request in queue:
+        if request.matched or response.matched:
+            continue
+
+        if response.message_type != spec.get_resp_mti(request.message_type):
+            continue
+
+        if all(request.data_fields.get(field) == response.data_fields.get(field) for field in spec.get_match_fields()):
+            return request
+
+
+def bench_transaction_store() -> None:  # The response to the newest of 10k requests is the worst case of the scan
+    requests: list[TransactionRecord] = list()
+    store: TransactionStore = TransactionStore(maxlen=10_000)
+
+    for number in range(10_000):
+        request: TransactionRecord = TransactionRecord.from_transaction(load_transaction())
+        request.trans_id = f"request-{number}"
+        request.data_fields[spec.FIELD_SET.FIELD_011_SYSTEM_TRACE_AUDIT_NUMBER] = f"{number:06}"
+        request.is_request = True
+        requests.append(request)
+        store.append(request)
+
+    response: TransactionRecord = requests[-1].copy(
+        trans_id="response",
+        message_type=spec.get_resp_mti(requests[-1].message_type),
+        data_fields=dict(requests[-1].data_fields),
+    )
+
+    assert legacy_find_request(requests, response) is store.find_request(response) is requests[-1]
+
+    report(
+        "Transaction store: match in 10k requests",
+        measure(lambda: legacy_find_request(requests, response), number=10),
+        measure(lambda: store.find_request(response), number=10_000)
+    )
+
+    report(
+        "Transaction store: get by trans_id in 10k",
+        measure(lambda: next(trans for trans in requests if trans.trans_id == "request-9999"), number=100),
+        measure(lambda: store.get("request-9999"), number=10_000)
+    )
+
+
+def bench_timeout_scheduler() -> None:  # Start and stop the timer of one request with many requests in flight
+    application: QCoreApplication = QCoreApplication.instance() or QCoreApplication(list())
+    request: TransactionRecord = TransactionRecord.from_transaction(load_transaction())
+
+    def legacy_timer():  # One QTimer and lambda per request
+        timer: QTimer = QTimer()
+        timer.timeout.connect(lambda: request)
+        timer.start(60_000)
+        timer.stop()
+
+    for in_flight in 1_000, 100_000:
+        scheduler: TimeoutScheduler = TimeoutScheduler()
+
+        for number in range(in_flight):
+            scheduler.start(request.copy(trans_id=f"request-{number}"))
+
+        def start_stop():
+            scheduler.start(request)
+            scheduler.stop(request.trans_id)
+
+        report(f"Timeout scheduler: {in_flight} in flight", measure(legacy_timer), measure(start_stop))
+
+    application.processEvents()
+
+
+def bench_journal() -> None:
+    body: bytes = Parser.create_dump(load_transaction())
+
+    with TemporaryDirectory() as directory:
+        journal: TransactionJournal = TransactionJournal(directory)
+        journal.open()
+
+        report("Journal: write one record", None, measure(lambda: journal.write(RecordType.OUTGOING, "id", body)))
+
+        journal.close()
+
+        report("Journal: replay 30k records", None, measure(lambda: sum(1 for _ in journal.replay()), number=1))
+
+
+def measure_allocations(function: Callable, number: int = 1000) -> float:  # Peak of the traced memory per call, bytes
+    peaks: list[int] = list()
+    start_tracing()
+
+    for _ in range(number):
+        reset_peak()
+        current, _ = get_traced_memory()
+        function()
+        peaks.append(get_traced_memory()[1] - current)
+
+    stop_tracing()
+
+    return sum(peaks) / number
+
+
+def bench_transaction_record() -> None:  # Status updates of one send-receive cycle, the same as TransactionQueue does
+    request: Transaction = load_transaction()
+    response: Transaction = request.model_copy(deep=True)
+    response.message_type = spec.get_resp_mti(request.message_type)
+    response_dump: bytes = Parser.create_dump(response)
+
+    def update_status(request, response):
+        request.is_request = True
+        request.sending_time = datetime.now()
+        response.is_request = False
+        response.matched = request.matched = True
+        response.match_id = request.trans_id
+        request.match_id = response.trans_id
+        response.utrnno = request.utrnno = "123456"
+        response.resp_time_seconds = request.resp_time_seconds = 0.001
+        response.success = request.success = True
+
+    def legacy_cycle():  # The queue used to work with the pydantic models, each write is validated
+        outgoing: Transaction = request.model_copy()  # The transaction, sent by GUI or API
+        Parser.create_dump(outgoing)
+        incoming: Transaction = Parser.parse_dump(response_dump, flat=True, lazy=True)
+        update_status(outgoing, incoming)
+
+    def current_cycle():  # The records, the transactions are materialized once for each signal
+        outgoing: TransactionRecord = TransactionRecord.from_transaction(request.model_copy())
+        Parser.create_dump(outgoing)
+        incoming: TransactionRecord = Parser.parse_record(response_dump, flat=True, lazy=False)  # The receive pipeline
+        update_status(outgoing, incoming)
+        outgoing.to_transaction()
+        incoming.to_transaction()
+
+    report("Transaction record: send-receive cycle", measure(legacy_cycle), measure(current_cycle))
+
+    legacy_bytes: float = measure_allocations(legacy_cycle)
+    current_bytes: float = measure_allocations(current_cycle)
+
+    print(f"{'Transaction record: allocated per cycle':<48} legacy {legacy_bytes:10.0f} B  | "
+          f"current {current_bytes:10.0f} B  | x{legacy_bytes / current_bytes:.1f}")
+
+    def legacy_status():
+        update_status(outgoing_model, incoming_model)
+
+    def current_status():
+        update_status(outgoing_record, incoming_record)
+
+    outgoing_model, incoming_model = request.model_copy(), response.model_copy()
+    outgoing_record, incoming_record = TransactionRecord.from_transaction(request), Parser.parse_record(response_dump)
+
+    report("Transaction record: status updates only", measure(legacy_status), measure(current_status))
+
+
+def bench_compiled_template() -> None:  # The next message of the repeat or load run, ready to be sent
+    with open(TermFilesPath.CONFIG) as json_file:
+        config: Config = Config.model_validate_json(json_file.read())
+
+    parser: Parser = Parser(config)
+    generator: FieldsGenerator = FieldsGenerator()
+    transaction: Transaction = parser.parse_file(TermFilesPath.DEFAULT_FILE)
+    template: CompiledTemplate = CompiledTemplate(transaction)
+    record: TransactionRecord = template.build()
+
+    assert record.wire_data == Parser.create_dump(record)
+
+    def build_message(source: Transaction) -> bytes:  # The way of Terminal.send and TransactionQueue
+        source.trans_id = generate_trans_id()
+        source = generator.set_trans_id(source)
+        source = generator.set_generated_fields(source)
+
+        return Parser.create_dump(TransactionRecord.from_transaction(source))
+
+    report(
+        "Compiled template: message from the file",
+        measure(lambda: build_message(parser.parse_file(TermFilesPath.DEFAULT_FILE)), number=1000),
+        measure(template.build),
+    )
+
+    report(
+        "Compiled template: message from the model copy",
+        measure(lambda: build_message(transaction.model_copy(deep=True)), number=1000),
+        measure(template.build),
+    )
+
+
+def bench_fields_bulk() -> None:  # One message of the prepared batch, the time is divided by the batch size
+    generator: FieldsGenerator = FieldsGenerator()
+    transaction: Transaction = load_transaction()
+    template: CompiledTemplate = CompiledTemplate(transaction)
+    number: int = 100_000
+    legacy_number: int = 1000  # The legacy way is too slow for the whole batch
+    columns: dict[str, list[str]] = generator.generate_fields_bulk(transaction, number)
+
+    assert all(len(column) == number for column in columns.values())
+    assert all(record.wire_data == Parser.create_dump(record) for record in template.build_many(10))
+
+    def generate_fields() -> None:  # The way of set_generated_fields, field by field of each message
+        for _ in range(legacy_number):
+            for field in transaction.generate_fields:
+                generator.generate_field(field, max_amount=transaction.max_amount)
+
+    report(
+        "Bulk fields generation: fields of one message",
+        measure(generate_fields, number=1) / legacy_number,
+        measure(lambda: generator.generate_fields_bulk(transaction, number), number=1) / number,
+    )
+
+    report(
+        "Bulk fields generation: compiled template message",
+        measure(lambda: [template.build() for _ in range(number)], number=1) / number,
+        measure(lambda: template.build_many(number), number=1) / number,
+    )
+
+
+def send_over_loopback(config: Config, frame: bytearray, number: int = 20_000, burst: int = 100) -> float:
+    application: QCoreApplication = QCoreApplication.instance() or QCoreApplication(list())
+    expected: int = number * len(frame)
+    received: Event = Event()
+    server: socket = socket()
+    server.bind(("127.0.0.1", int()))
+    server.listen(1)
+
+    def receive():
+        client, _ = server.accept()
+        total: int = int()
+
+        while total < expected and (data := client.recv(1024 * 1024)):
+            total += len(data)
+
+        received.set()
+        client.close()
+
+    Thread(target=receive, daemon=True).start()
+    connector: Connector = Connector(config)
+    connector.connect_sv("127.0.0.1", server.getsockname()[1])
+    started: float = perf_counter()
+
+    for _ in range(number // burst):  # A burst of the messages is sent each event loop tick
+        for _ in range(burst):
+            connector.send_transaction_data("id", frame)
+
+        application.processEvents()
+
+    while not received.wait(0.001):
+        application.processEvents()
+
+    elapsed: float = perf_counter() - started
+    connector.disconnect_sv()
+    server.close()
+
+    return elapsed / number
+
+
+def bench_write_coalescing() -> None:  # The time of one message until it is received by the other side of loopback
+    frame: bytearray = Parser.create_frame(load_transaction())
+
+    with open(TermFilesPath.CONFIG) as json_file:
+        config: Config = Config.model_validate_json(json_file.read())
+
+    logger.disable("common")  # Measure the sending, not the debug log
+
+    config.host.write_coalescing = False
+    legacy: float = send_over_loopback(config, frame)
+
+    config.host.write_coalescing = True
+    current: float = send_over_loopback(config, frame)
+
+    logger.enable("common")
+
+    report("Write coalescing: loopback, burst of 100", legacy, current)
+
+
+class ConnectorCommands(QObject):  # The connector thread is driven by the signals only, the same as Terminal does
+    connect_host: pyqtSignal = pyqtSignal(str, str)
+    send: pyqtSignal = pyqtSignal(str, bytes)
+
+
+def bench_connection_thread() -> None:  # Round trip of one message to the local echo emulator through the GUI connector
+    application: QCoreApplication = QCoreApplication.instance() or QCoreApplication(list())
+    frame: bytes = bytes(Parser.create_frame(load_transaction()))
+    server: socket = socket()
+    server.bind(("127.0.0.1", int()))
+    server.listen(1)
+
+    def echo():  # The emulator returns each message as it is
+        client, _ = server.accept()
+
+        while data := client.recv(1024 * 1024):
+            client.sendall(data)
+
+    Thread(target=echo, daemon=True).start()
+
+    with open(TermFilesPath.CONFIG) as json_file:
+        config: Config = Config.model_validate_json(json_file.read())
+
+    logger.disable("common")
+
+    commands: ConnectorCommands = ConnectorCommands()
+    connection_thread: ConnectionThread = ConnectionThread(config)
+    commands.connect_host.connect(connection_thread.reconnect_sv)
+    commands.send.connect(connection_thread.send_transaction_data)
+    responses: list = list()
+    connection_thread.incoming_transaction_data.connect(responses.extend)
+    commands.connect_host.emit("127.0.0.1", str(server.getsockname()[1]))
+
+    while not connection_thread.is_connected():
+        application.processEvents()
+
+    def legacy_round_trip():  # The main thread used to be taken by the connector polling cycle
+        responses.clear()
+        commands.send.emit("id", frame)
+
+        while not responses:
+            application.processEvents()
+            QThread.msleep(10)
+
+    def current_round_trip():
+        responses.clear()
+        event_loop: QEventLoop = QEventLoop()
+        connection_thread.incoming_transaction_data.connect(event_loop.quit)
+        commands.send.emit("id", frame)
+        event_loop.exec()
+        connection_thread.incoming_transaction_data.disconnect(event_loop.quit)
+
+    report("Connection thread: round trip", measure(legacy_round_trip, number=100), measure(current_round_trip, 1000))
+
+    connection_thread.stop_thread()
+    server.close()
+    logger.enable("common")
+
+
+benchmarks: dict[str, Callable] = {
+    "wire_codec": bench_wire_codec,
+    "create_dump": bench_create_dump,
+    "lazy_parse_dump": bench_lazy_parse_dump,
+    "split_complex_field": bench_split_complex_field,
+    "frame_decoder": bench_frame_decoder,
+    "bitmap": bench_bitmap,
+    "spec_index": bench_spec_index,
+    "field_description": bench_field_description,
+    "mti_tables": bench_mti_tables,
+    "receive_pipeline": bench_receive_pipeline,
+    "transaction_store": bench_transaction_store,
+    "timeout_scheduler": bench_timeout_scheduler,
+    "journal": bench_journal,
+    "transaction_record": bench_transaction_record,
+    "write_coalescing": bench_write_coalescing,
+    "connection_thread": bench_connection_thread,
+    "compiled_template": bench_compiled_template,
+    "fields_bulk": bench_fields_bulk,
+}
+
+
+def run(names: list[str]) -> None:
+    for name in names or benchmarks:
+        if not (benchmark := benchmarks.get(name)):
+            print(f"Unknown benchmark {name}. Known benchmarks: {', '.join(benchmarks)}")
+            continue
+
+        benchmark()
+
+
+if __name__ == "__main__":
+    run(argv[1:])
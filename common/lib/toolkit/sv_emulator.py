@@ -1,7 +1,7 @@
 from time import sleep
 from datetime import datetime
 from copy import deepcopy
-from struct import pack
+from struct import pack_into
 from socket import socket
 from contextlib import suppress
 from string import digits, ascii_letters
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from common.lib.data_models.Config import Config
 from common.lib.data_models.Transaction import Transaction
 from common.lib.core.Parser import Parser
+from common.lib.core.FrameDecoder import FrameDecoder
 from common.lib.core.EpaySpecification import EpaySpecification
 from common.lib.enums.TermFilesPath import TermFilesPath
 from common.lib.enums.TextConstants import TextConstants
@@ -65,6 +66,7 @@ class IsoConfig:
 
 class SvEmulator:
     _stop: bool = False
+    header_length: int = 2
 
     @property
     def stop(self):
@@ -81,6 +83,7 @@ class SvEmulator:
         self.parser: Parser = Parser(self.config)
         self.spec: EpaySpecification = EpaySpecification()
         self.iso_config = iso_config
+        self.frame_decoder: FrameDecoder = FrameDecoder(header_length=self.header_length)
 
     def run(self, sleep_time: int | None = None):
         if sleep_time is None:
@@ -102,26 +105,27 @@ class SvEmulator:
 
                 if not data:
                     connection = self.get_connector(self.iso_config)
+                    self.frame_decoder.reset()
                     continue
 
                 print("\n", datetime.strftime(datetime.now(), date_format), " <<< ", data)
 
-                data = data[2:]  # Cut the header
+                for request_data in self.frame_decoder.decode(data):  # The header is cut by the frame decoder
+                    request: Transaction = self.parser.parse_dump(request_data, flat=True)
+                    response: Transaction = self.generate_resp(request)
+                    response.message_type = self.spec.get_resp_mti(request.message_type)
 
-                request: Transaction = self.parser.parse_dump(data, flat=True)
-                response: Transaction = self.generate_resp(request)
-                response.message_type = self.spec.get_resp_mti(request.message_type)
+                    print("\n", datetime.strftime(datetime.now(), date_format), " >>> ", response.data_fields)
 
-                print("\n", datetime.strftime(datetime.now(), date_format), " >>> ", response.data_fields)
+                    frame: bytearray = bytearray(self.header_length)
+                    body_length: int = self.parser.create_dump_into(response, frame)
+                    pack_into("!H", frame, int(), body_length)
 
-                response: bytes = self.parser.create_dump(response)
-                response: bytes = pack("!H", len(response)) + response
+                    print("\n", datetime.strftime(datetime.now(), date_format), " >>> ", bytes(frame))
 
-                print("\n", datetime.strftime(datetime.now(), date_format), " >>> ", response)
+                    sleep(sleep_time)
 
-                sleep(sleep_time)
-
-                connection.send(response)
+                    connection.send(frame)
 
             except KeyboardInterrupt:
                 with suppress(Exception):
@@ -134,6 +138,7 @@ class SvEmulator:
 
                 try:
                     connection = self.get_connector(self.iso_config)
+                    self.frame_decoder.reset()
 
                 except KeyboardInterrupt:
                     exit()